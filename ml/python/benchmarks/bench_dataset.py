@@ -0,0 +1,126 @@
+"""
+Training Data Format Benchmark
+Writes the same synthetic training rows as real_training_data.csv and as a
+columnar bundle (float32 features, int8 outcome, .npy + schema.json), then
+compares disk size, write time and load time
+
+Bundle loads are timed memory-mapped (lazy: pages are read on first touch),
+memory-mapped plus one full pass over the features, and read eagerly.
+
+Usage:
+    python benchmarks/bench_dataset.py                      # 100k and 1M rows
+    python benchmarks/bench_dataset.py --rows 250000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.match_features import TRAINING_FEATURES, add_strength_features
+from utils.training_dataset import load_training_data, write_training_csv, write_training_data
+
+
+def synthetic_rows(n_rows: int, seed: int = 42):
+    """Training rows with the value ranges data_extraction.py produces"""
+    rng = np.random.default_rng(seed)
+    home_elo = rng.normal(1500, 120, n_rows)
+    away_elo = rng.normal(1500, 120, n_rows)
+    home_xg = rng.gamma(3, 0.5, n_rows).round(2) * 5
+    away_xg = rng.gamma(2.5, 0.5, n_rows).round(2) * 5
+    columns = {
+        'home_elo': home_elo, 'away_elo': away_elo, 'elo_diff': home_elo - away_elo,
+        'home_form_last5': rng.integers(0, 16, n_rows) / 5, 'away_form_last5': rng.integers(0, 16, n_rows) / 5,
+        'home_goals_last5': np.floor(home_xg), 'away_goals_last5': np.floor(away_xg),
+        'home_xg_last5': home_xg, 'away_xg_last5': away_xg,
+        'h2h_home_wins': rng.integers(0, 4, n_rows), 'h2h_draws': rng.integers(0, 3, n_rows),
+        'h2h_away_wins': rng.integers(0, 4, n_rows),
+        'home_possession_avg': rng.integers(45, 56, n_rows), 'away_possession_avg': rng.integers(45, 56, n_rows),
+        'venue_advantage': np.ones(n_rows), 'stage_importance': np.full(n_rows, 8),
+        'home_rest_days': np.full(n_rows, 4), 'away_rest_days': np.full(n_rows, 4)
+    }
+    add_strength_features(columns)
+    X = np.column_stack([columns[name] for name in TRAINING_FEATURES]).astype(np.float32)
+    y_outcome = rng.choice(3, n_rows, p=[0.45, 0.27, 0.28]).astype(np.int8)
+    y_xg_home = rng.gamma(3, 0.5, n_rows).round(2).astype(np.float32)
+    y_xg_away = rng.gamma(2.5, 0.5, n_rows).round(2).astype(np.float32)
+    return X, y_outcome, y_xg_home, y_xg_away
+
+
+def disk_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - started, result
+
+
+def run(n_rows: int, directory: str) -> dict:
+    rows = synthetic_rows(n_rows)
+    csv_path = os.path.join(directory, f'rows_{n_rows}.csv')
+    bundle_path = os.path.join(directory, f'rows_{n_rows}')
+
+    csv_write, _ = timed(lambda: write_training_csv(csv_path, *rows))
+    bundle_write, _ = timed(lambda: write_training_data(bundle_path, *rows))
+
+    def load_csv():
+        df = pd.read_csv(csv_path)
+        return (df[TRAINING_FEATURES].to_numpy(dtype=np.float32), df['outcome'].to_numpy(dtype=np.int8),
+                df['home_xg'].to_numpy(dtype=np.float32), df['away_xg'].to_numpy(dtype=np.float32))
+
+    def load_and_scan():
+        X, y_outcome, _, _, _ = load_training_data(bundle_path)
+        X.sum(dtype=np.float64)
+        return X, y_outcome
+
+    csv_load, _ = timed(load_csv)
+    mmap_load, _ = timed(lambda: load_training_data(bundle_path))
+    mmap_scan, (X, y_outcome) = timed(load_and_scan)
+    eager_load, _ = timed(lambda: load_training_data(bundle_path, mmap=False))
+
+    return {
+        'rows': n_rows,
+        'csv_mb': disk_size(csv_path) / 2**20,
+        'bundle_mb': disk_size(bundle_path) / 2**20,
+        'csv_write_s': csv_write,
+        'bundle_write_s': bundle_write,
+        'csv_load_s': csv_load,
+        'mmap_load_s': mmap_load,
+        'mmap_scan_s': mmap_scan,
+        'eager_load_s': eager_load,
+        'bundle_exact': bool(np.array_equal(X, rows[0]) and np.array_equal(y_outcome, rows[1]))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CSV vs columnar training data files')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='bench-dataset-')
+    try:
+        print(f"{'rows':>9} {'CSV':>9} {'bundle':>9} {'CSV write':>10} {'bundle write':>13} "
+              f"{'CSV load':>9} {'mmap':>8} {'mmap+scan':>10} {'eager':>8}")
+        for n_rows in args.rows:
+            r = run(n_rows, directory)
+            print(f"{r['rows']:>9} {r['csv_mb']:>7.1f}MB {r['bundle_mb']:>7.1f}MB {r['csv_write_s']:>9.2f}s "
+                  f"{r['bundle_write_s']:>12.3f}s {r['csv_load_s']:>8.2f}s {r['mmap_load_s']:>7.4f}s "
+                  f"{r['mmap_scan_s']:>9.3f}s {r['eager_load_s']:>7.3f}s")
+            assert r['bundle_exact'], "bundle round trip changed the data"
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Extraction Memory Benchmark
+Builds the training rows from a synthetic matches table of growing size,
+once with the full-table read (fetch_matches + as-of join) and once
+streamed through a server-side cursor (iter_training_batches), and reports
+wall time and client peak RSS growth for each
+
+Each measurement runs in a fresh child process with its own connection. The
+child creates a TEMP table named matches, which shadows the real table for
+that session only, and fills it server-side with generate_series, so the
+database itself is never modified. The ELO snapshot goes to a temporary file.
+
+Needs DATABASE_URL and psycopg2.
+
+Usage:
+    python benchmarks/bench_extraction.py                         # 50k, 200k and 1M matches
+    python benchmarks/bench_extraction.py --rows 100000 --itersize 2000 10000
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Parameterized (the row count), so the modulo operators are written %%
+FILL_TABLE = """
+CREATE TEMP TABLE matches (
+    id varchar PRIMARY KEY,
+    "homeTeam" text NOT NULL,
+    "awayTeam" text NOT NULL,
+    "homeTeamCrest" text NOT NULL,
+    "awayTeamCrest" text NOT NULL,
+    date text NOT NULL,
+    venue text NOT NULL,
+    stage text NOT NULL,
+    status varchar(20) NOT NULL,
+    "homeWinProb" real NOT NULL,
+    "drawProb" real NOT NULL,
+    "awayWinProb" real NOT NULL,
+    "homeXg" real NOT NULL,
+    "awayXg" real NOT NULL
+);
+INSERT INTO matches
+SELECT
+    lpad(i::text, 9, '0'),
+    'Team ' || (i * 7919 %% 96),
+    'Team ' || ((i * 7919 %% 96 + 1 + i %% 95) %% 96),
+    'https://crests.example/' || (i * 7919 %% 96) || '.png',
+    'https://crests.example/' || ((i * 7919 %% 96 + 1 + i %% 95) %% 96) || '.png',
+    to_char(timestamp '2000-01-01' + (i / 4) * interval '6 hours', 'YYYY-MM-DD"T"HH24:MI:SS"Z"'),
+    'Stadium ' || (i * 7919 %% 96),
+    'League Phase',
+    'FINISHED',
+    (0.20 + (i * 37 %% 41) / 100.0)::real,
+    (0.10 + (i * 53 %% 21) / 100.0)::real,
+    (0.70 - (i * 37 %% 41) / 100.0 - (i * 53 %% 21) / 100.0)::real,
+    ((i * 31 %% 300) / 100.0)::real,
+    ((i * 17 %% 260) / 100.0)::real
+FROM generate_series(1, %s) AS i;
+ANALYZE matches;
+"""
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(mode: str, n_rows: int, itersize: int) -> dict:
+    """Runs in the child: fill the temp table, then time one extraction path"""
+    os.environ['ELO_SNAPSHOT_PATH'] = os.path.join(tempfile.mkdtemp(), 'elo_snapshot.json')
+    sys.path.insert(0, ROOT)
+    from data_extraction import UCLDataExtractor
+
+    extractor = UCLDataExtractor()
+    with extractor.conn.cursor() as cursor:
+        cursor.execute(FILL_TABLE, (n_rows,))
+    extractor.conn.commit()
+
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    if mode == 'full':
+        X, _, _, _ = extractor.prepare_training_data()
+        n_features = len(X)
+    else:
+        n_features = sum(len(X) for X, _, _, _ in extractor.iter_training_batches(itersize))
+    elapsed = time.perf_counter() - started
+    extractor.close()
+
+    return {
+        'mode': mode, 'rows': n_rows, 'itersize': itersize if mode == 'stream' else None,
+        'seconds': elapsed, 'peak_rss_growth_mb': peak_rss_mb() - baseline, 'features': int(n_features)
+    }
+
+
+def run_child(mode: str, n_rows: int, itersize: int) -> dict:
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', mode, str(n_rows), str(itersize)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark full-table vs streamed training data extraction')
+    parser.add_argument('--rows', type=int, nargs='+', default=[50_000, 200_000, 1_000_000])
+    parser.add_argument('--itersize', type=int, nargs='+', default=[5000],
+                        help='Server-side cursor batch sizes to measure')
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'ROWS', 'ITERSIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, n_rows, itersize = args.child
+        result = measure(mode, int(n_rows), int(itersize))
+        # Progress output goes to stdout too, so the result is the last line
+        print(json.dumps(result))
+        return
+
+    if not os.getenv('DATABASE_URL'):
+        print("❌ DATABASE_URL is not set")
+        sys.exit(1)
+
+    print(f"{'matches':>9} {'mode':>16} {'time':>9} {'peak RSS +':>11}")
+    for n_rows in args.rows:
+        runs = [run_child('full', n_rows, 0)]
+        runs += [run_child('stream', n_rows, itersize) for itersize in args.itersize]
+        for r in runs:
+            label = 'full read' if r['mode'] == 'full' else f"stream/{r['itersize']}"
+            print(f"{r['rows']:>9} {label:>16} {r['seconds']:>8.2f}s {r['peak_rss_growth_mb']:>9.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
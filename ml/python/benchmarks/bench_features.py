@@ -0,0 +1,120 @@
+"""
+Feature Extraction Benchmark
+Compares the per-match pandas filtering in UCLDataExtractor (two form
+lookups and one head-to-head lookup per match) with the one-pass
+MatchFeatureBuilder and with the as-of join against FeatureSnapshots
+(which also replays ELO) on synthetic match histories
+
+The per-match path is quadratic, so it is timed on a sample of matches and
+extrapolated; the sampled rows are also checked against the builder output.
+
+Usage:
+    python benchmarks/bench_features.py                       # 10k and 100k matches
+    python benchmarks/bench_features.py --matches 20000 --sample 200
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_extraction import UCLDataExtractor
+from utils.feature_snapshots import FeatureSnapshots
+from utils.match_features import MatchFeatureBuilder
+from utils.match_store import MatchStore
+
+
+def synthetic_matches(n_matches: int, n_teams: int = 96, seed: int = 42) -> pd.DataFrame:
+    """Finished matches a few per matchday, ordered by date like fetch_matches()"""
+    rng = np.random.default_rng(seed)
+    home = rng.integers(0, n_teams, n_matches)
+    away = (home + rng.integers(1, n_teams, n_matches)) % n_teams
+
+    probs = rng.dirichlet([4, 2.5, 3], n_matches)
+    # Several matches share each kick-off time, as on a real matchday
+    kickoff = pd.Timestamp('2010-01-01', tz='UTC') + pd.to_timedelta(np.arange(n_matches) // 4 * 6, unit='h')
+    names = np.array([f'Team {i}' for i in range(n_teams)], dtype=object)
+
+    return pd.DataFrame({
+        'id': np.arange(n_matches).astype(str),
+        'homeTeam': names[home],
+        'awayTeam': names[away],
+        'date': kickoff,
+        'status': 'FINISHED',
+        'homeWinProb': probs[:, 0].round(2),
+        'drawProb': probs[:, 1].round(2),
+        'awayWinProb': probs[:, 2].round(2),
+        'homeXg': rng.gamma(3, 0.5, n_matches).round(2),
+        'awayXg': rng.gamma(2.5, 0.5, n_matches).round(2)
+    })
+
+
+def per_match_features(extractor: UCLDataExtractor, matches_df: pd.DataFrame, rows) -> np.ndarray:
+    """The previous implementation: filter the whole history three times per match"""
+    out = []
+    for i in rows:
+        match = matches_df.iloc[i]
+        home_form = extractor.calculate_team_form(match['homeTeam'], matches_df, match['date'])
+        away_form = extractor.calculate_team_form(match['awayTeam'], matches_df, match['date'])
+        h2h = extractor.calculate_h2h_stats(match['homeTeam'], match['awayTeam'], matches_df, match['date'])
+        out.append([
+            home_form['form'], away_form['form'], home_form['goals'], away_form['goals'],
+            home_form['xg'], away_form['xg'], h2h['home_wins'], h2h['draws'], h2h['away_wins'],
+            home_form['possession'], away_form['possession']
+        ])
+    return np.array(out, dtype=np.float64)
+
+
+def run(n_matches: int, sample: int) -> dict:
+    matches_df = synthetic_matches(n_matches)
+
+    started = time.perf_counter()
+    columns = MatchFeatureBuilder().build(matches_df)
+    one_pass = time.perf_counter() - started
+    built = np.column_stack(list(columns.values()))
+
+    started = time.perf_counter()
+    store = MatchStore.from_frame(matches_df)
+    FeatureSnapshots(store).training_features()
+    as_of_join = time.perf_counter() - started
+
+    # The lookups never touch the connection, so skip __init__ (which connects)
+    extractor = UCLDataExtractor.__new__(UCLDataExtractor)
+    rows = np.random.default_rng(0).choice(n_matches, size=min(sample, n_matches), replace=False)
+    started = time.perf_counter()
+    reference = per_match_features(extractor, matches_df, rows)
+    per_match = (time.perf_counter() - started) / len(rows) * n_matches
+
+    return {
+        'matches': n_matches,
+        'one_pass_s': one_pass,
+        'as_of_join_s': as_of_join,
+        'per_match_s': per_match,
+        'speedup': per_match / one_pass,
+        'checked_rows': len(rows),
+        'max_abs_diff': float(np.abs(built[rows] - reference).max())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark one-pass vs per-match feature extraction')
+    parser.add_argument('--matches', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--sample', type=int, default=300,
+                        help='Matches timed on the per-match path (extrapolated to the full history)')
+    args = parser.parse_args()
+
+    print(f"{'matches':>9} {'as-of join':>11} {'one-pass':>10} {'per-match*':>12} {'speedup':>9} {'max diff':>9}")
+    for n_matches in args.matches:
+        r = run(n_matches, args.sample)
+        print(f"{r['matches']:>9} {r['as_of_join_s']:>10.2f}s {r['one_pass_s']:>9.2f}s {r['per_match_s']:>11.1f}s "
+              f"{r['speedup']:>8.0f}x {r['max_abs_diff']:>9.2g}")
+    print(f"\n* extrapolated from {args.sample} sampled matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Inference Microbenchmark
+Compares the sklearn-wrapper path with the inplace_predict fast path,
+with and without the scaler fused into the tree thresholds
+
+Features mix continuous columns (ELO, xG) with integer-valued ones (goals,
+H2H counts, tiers, rest days) that sit exactly on split points, and the
+fitted scalers' mean/scale are not exact in float32. Both the fast and the
+fused path must reproduce the sklearn path on them bit for bit, both on the
+raw float64 rows and when fed from feature dicts through the shared
+request matrix (utils/feature_matrix.py).
+
+Usage:
+    python benchmarks/bench_inference.py                       # synthetic models
+    python benchmarks/bench_inference.py --model-dir models/trained
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.match_predictor import MatchOutcomePredictor, ExpectedGoalsPredictor
+from models.model_bundle import resolve_model_path
+from utils.feature_matrix import MATCH_FEATURE_NAMES, build_match_matrix, model_columns
+
+
+def synthetic_features(rng: np.random.Generator, n_rows: int) -> np.ndarray:
+    """Match feature rows in the 23-feature order with realistic value types"""
+    home_elo = rng.normal(1600, 150, n_rows)
+    away_elo = rng.normal(1600, 150, n_rows)
+    X = np.column_stack([
+        home_elo, away_elo, home_elo - away_elo,
+        rng.integers(0, 16, (n_rows, 2)) / 5,                # form: points / 5
+        rng.integers(0, 15, (n_rows, 2)),                    # goals last 5
+        np.round(rng.gamma(3, 0.5, (n_rows, 2)), 2),         # xG last 5
+        rng.integers(0, 5, (n_rows, 3)),                     # H2H counts
+        rng.integers(40, 61, (n_rows, 2)),                   # possession
+        rng.integers(0, 2, n_rows), rng.integers(1, 9, n_rows),
+        rng.integers(2, 10, (n_rows, 2)),                    # rest days
+        np.round(np.abs(home_elo - away_elo)), (away_elo > home_elo).astype(int),
+        rng.integers(1, 4, (n_rows, 2)),                     # quality tiers
+        rng.integers(0, 3, n_rows)
+    ])
+    return X
+
+
+def build_synthetic_models(n_samples: int = 2000):
+    """Train small outcome/xG models on random data so the benchmark is self-contained"""
+    rng = np.random.default_rng(42)
+    X = synthetic_features(rng, n_samples)
+    y = rng.integers(0, 3, size=n_samples)
+    y_xg = rng.uniform(0.3, 4.0, size=n_samples)
+
+    outcome = MatchOutcomePredictor()
+    outcome.train(X, y)
+    xg = ExpectedGoalsPredictor()
+    xg.train(X[:, :12], y_xg)
+    return outcome, xg
+
+
+def load_models(model_dir: str):
+    outcome = MatchOutcomePredictor(model_path=resolve_model_path(model_dir, 'match_outcome_model'))
+    xg = ExpectedGoalsPredictor(model_path=resolve_model_path(model_dir, 'xg_home_model'))
+    return outcome, xg
+
+
+def time_call(fn, repeats: int) -> float:
+    """Median wall time per call in microseconds"""
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return float(np.median(samples) * 1e6)
+
+
+def set_mode(predictor, mode: str):
+    """Switch a predictor between 'sklearn', 'fast' and 'fused' inference"""
+    predictor.fast_inference = mode != 'sklearn'
+    predictor.fused_scaler = mode == 'fused'
+    predictor._fast = None
+
+
+def bench(name: str, predictor, X: np.ndarray, call, repeats: int):
+    outputs, timings = {}, {}
+    for mode in ('sklearn', 'fast', 'fused'):
+        set_mode(predictor, mode)
+        outputs[mode] = np.asarray(call(X))
+        timings[mode] = time_call(lambda: call(X), repeats)
+    set_mode(predictor, 'fast')
+
+    diffs = {mode: float(np.max(np.abs(outputs['sklearn'] - outputs[mode]))) for mode in ('fast', 'fused')}
+    print(f"  {name:<24} {timings['sklearn']:>12.1f} {timings['fast']:>10.1f} {timings['fused']:>10.1f} "
+          f"{timings['sklearn'] / timings['fused']:>8.2f}x {max(diffs.values()):>12.2e}")
+    return diffs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark match model inference paths')
+    parser.add_argument('--model-dir', type=str, default=None,
+                        help='Directory with trained models (default: train synthetic models)')
+    parser.add_argument('--repeats', type=int, default=200, help='Timed calls per case')
+    args = parser.parse_args()
+
+    if args.model_dir:
+        outcome, xg = load_models(args.model_dir)
+    else:
+        outcome, xg = build_synthetic_models()
+
+    rng = np.random.default_rng(7)
+    X_big = synthetic_features(rng, 1000)
+
+    print(f"\n{'case':<26} {'sklearn (us)':>12} {'fast (us)':>10} {'fused (us)':>10} {'speedup':>9} {'max |diff|':>12}")
+    diffs = []
+    for n_rows in (1, 1000):
+        X = X_big[:n_rows]
+        X_xg = X[:, :12]
+        diffs.append(bench(f"outcome {n_rows} row(s)", outcome,
+                           X, lambda data: [list(p.values()) for p in outcome.predict_proba_batch(data)],
+                           args.repeats))
+        diffs.append(bench(f"xG {n_rows} row(s)", xg, X_xg, xg.predict_batch, args.repeats))
+
+    # End-to-end single fixture from a feature dict, as served by /predict/match
+    features = dict(zip(outcome.feature_names, X_big[0]))
+    for mode in ('sklearn', 'fast', 'fused'):
+        set_mode(outcome, mode)
+        us = time_call(lambda: outcome.predict_proba(features), args.repeats)
+        print(f"  predict_proba(dict) {mode:<8} {us:>10.1f} us")
+
+    # Served batches go through the shared request matrix; the baseline is the
+    # float64 sklearn path fed one feature dict at a time
+    rows = [dict(zip(MATCH_FEATURE_NAMES, x)) for x in X_big]
+    set_mode(outcome, 'sklearn')
+    baseline = np.array([list(outcome.predict_proba(row).values()) for row in rows])
+    served = {}
+    for mode in ('fast', 'fused'):
+        set_mode(outcome, mode)
+        X_served = model_columns(build_match_matrix(rows), outcome.feature_names)
+        served[mode] = float(np.max(np.abs(
+            baseline - [list(p.values()) for p in outcome.predict_proba_batch(X_served)]
+        )))
+    set_mode(outcome, 'fast')
+    diffs.append(served)
+    print(f"  served matrix vs dict baseline: fast {served['fast']:.2e}, fused {served['fused']:.2e}")
+
+    failed = False
+    for mode in ('fast', 'fused'):
+        max_diff = max(d[mode] for d in diffs)
+        if max_diff > 0:
+            print(f"\n❌ {mode} path differs from the sklearn path (max |diff| = {max_diff:.2e})")
+            failed = True
+    if not failed:
+        print("\n✅ Fast and fused paths match the sklearn path exactly")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Multi-Worker Memory Benchmark
+Starts the API with 1, 4 and 8 workers, both as `uvicorn --workers N`
+(every worker loads its own models) and with serve_prefork.py (models
+loaded once before forking), and reports per-worker RSS and PSS
+
+PSS (proportional set size) splits each shared page between the processes
+mapping it, so the sum of PSS over all processes is the real footprint of
+the deployment. Reads /proc/<pid>/smaps_rollup, so Linux only.
+
+Usage:
+    python benchmarks/bench_memory.py --model-dir models/trained
+    python benchmarks/bench_memory.py --model-dir models/trained --workers 1 2 4 --modes prefork
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.feature_matrix import MATCH_FEATURE_NAMES
+
+SMAPS_FIELDS = ('Rss', 'Pss', 'Private_Clean', 'Private_Dirty')
+
+
+def server_command(mode: str, workers: int, port: int) -> List[str]:
+    if mode == 'uvicorn':
+        return [sys.executable, '-m', 'uvicorn', 'serve:app', '--host', '127.0.0.1',
+                '--port', str(port), '--workers', str(workers), '--log-level', 'warning']
+    return [sys.executable, 'serve_prefork.py', '--host', '127.0.0.1',
+            '--port', str(port), '--workers', str(workers)]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def memory_kb(pid: int) -> Dict[str, int]:
+    """Rss/Pss/private memory of one process in kB"""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in SMAPS_FIELDS:
+                values[key] = int(rest.split()[0])
+    return values
+
+
+def descendants(pid: int) -> List[int]:
+    """All live processes below pid"""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # Field 4 is the parent pid; the command name (field 2) may contain spaces
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def is_helper(pid: int) -> bool:
+    """multiprocessing's resource tracker is a child of the uvicorn supervisor but serves no requests"""
+    try:
+        with open(f'/proc/{pid}/cmdline', 'rb') as f:
+            return b'resource_tracker' in f.read()
+    except OSError:
+        return False
+
+
+def wait_ready(port: int, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{port}/health/ready', timeout=2) as r:
+                if r.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.25)
+    return False
+
+
+def exercise(port: int, n_requests: int):
+    """Spread match, explanation and player requests over the workers so every model path is touched"""
+    features = {name: 1.0 for name in MATCH_FEATURE_NAMES}
+    match = json.dumps({'home_team': 'A', 'away_team': 'B', 'features': features}).encode()
+    player = json.dumps({'player_name': 'X', 'position': 'FWD', 'features': {}}).encode()
+    calls = [('/predict/match', match), ('/explain/match', match), ('/predict/player', player)]
+
+    def post(i: int):
+        path, body = calls[i % len(calls)]
+        request = urllib.request.Request(f'http://127.0.0.1:{port}{path}', data=body,
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            urllib.request.urlopen(request, timeout=30).read()
+        except urllib.error.HTTPError:
+            pass  # 429/503 still exercises the worker
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(post, range(n_requests)))
+
+
+def measure(mode: str, workers: int, model_dir: str, n_requests: int, timeout: float) -> Dict:
+    port = free_port()
+    env = dict(os.environ, MODEL_PATH=model_dir, LOG_LEVEL='WARNING')
+    proc = subprocess.Popen(server_command(mode, workers, port), cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_ready(port, timeout):
+            raise RuntimeError(f"{mode} with {workers} worker(s) did not become ready in {timeout:.0f}s")
+        # uvicorn workers load independently: readiness of one says nothing about the rest
+        deadline = time.monotonic() + timeout
+        while workers > 1 and len(descendants(proc.pid)) < workers and time.monotonic() < deadline:
+            time.sleep(0.25)
+        exercise(port, n_requests)
+        time.sleep(1.0)
+
+        parent = memory_kb(proc.pid)
+        helpers, children = [], []
+        for pid in descendants(proc.pid):
+            (helpers if is_helper(pid) else children).append(memory_kb(pid))
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    total_pss = parent['Pss'] + sum(p['Pss'] for p in children + helpers)
+    supervisor_rss = parent['Rss']
+    if not children:
+        # uvicorn with a single worker serves from the main process
+        children, supervisor_rss = [parent], 0
+    n = len(children)
+    return {
+        'mode': mode,
+        'workers': n,
+        'parent_rss_mb': supervisor_rss / 1024,
+        'worker_rss_mb': sum(c['Rss'] for c in children) / n / 1024,
+        'worker_pss_mb': sum(c['Pss'] for c in children) / n / 1024,
+        'worker_private_mb': sum(c['Private_Clean'] + c['Private_Dirty'] for c in children) / n / 1024,
+        'total_pss_mb': total_pss / 1024
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure per-worker RSS/PSS of the multi-worker server modes')
+    parser.add_argument('--model-dir', type=str, default='models/trained', help='Directory with trained models')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8], help='Worker counts to measure')
+    parser.add_argument('--modes', nargs='+', choices=['uvicorn', 'prefork'], default=['uvicorn', 'prefork'])
+    parser.add_argument('--requests', type=int, default=300, help='Requests sent before measuring')
+    parser.add_argument('--timeout', type=float, default=180, help='Seconds to wait for a server to get ready')
+    parser.add_argument('--json', type=str, default=None, help='Also write the results to this file')
+    args = parser.parse_args()
+
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print("❌ /proc/<pid>/smaps_rollup not available (Linux 4.14+ required)")
+        return 1
+    model_dir = os.path.abspath(args.model_dir)
+
+    results = []
+    print(f"\n{'mode':<8} {'workers':>7} {'parent RSS':>11} {'worker RSS':>11} {'worker PSS':>11} "
+          f"{'worker priv':>12} {'total PSS':>10}   (MB)")
+    for workers in args.workers:
+        for mode in args.modes:
+            r = measure(mode, workers, model_dir, args.requests, args.timeout)
+            results.append(r)
+            print(f"{r['mode']:<8} {r['workers']:>7} {r['parent_rss_mb']:>11.1f} {r['worker_rss_mb']:>11.1f} "
+                  f"{r['worker_pss_mb']:>11.1f} {r['worker_private_mb']:>12.1f} {r['total_pss_mb']:>10.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
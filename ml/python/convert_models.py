@@ -0,0 +1,108 @@
+"""
+Convert Legacy Model Pickles to Model Bundles
+Rewrites each <name>.pkl as <name>.bundle and checks both give identical predictions
+
+Usage:
+    python convert_models.py --model-dir models/trained
+    python convert_models.py --model-dir models/trained --version 2025.11.1
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+
+from models.match_predictor import MatchOutcomePredictor, ExpectedGoalsPredictor
+from models.model_bundle import BUNDLE_SUFFIX, publish_bundle, save_bundle
+from models.scaler_fusion import sample_from_scaler
+
+MODEL_FILES = {
+    'match_outcome_model': MatchOutcomePredictor,
+    'xg_home_model': ExpectedGoalsPredictor,
+    'xg_away_model': ExpectedGoalsPredictor,
+}
+
+
+def _predict(predictor, X: np.ndarray) -> np.ndarray:
+    if isinstance(predictor, MatchOutcomePredictor):
+        return np.array([[p['home_win_prob'], p['draw_prob'], p['away_win_prob']]
+                         for p in predictor.predict_proba_batch(X)])
+    return np.asarray(predictor.predict_batch(X))
+
+
+def convert_model(pkl_path: str, predictor_cls, version: str = None, n_samples: int = 1000,
+                  tolerance: float = 1e-6) -> dict:
+    """
+    Write <name>.bundle next to a .pkl and compare predictions of the two
+
+    The reference is the pickle on the sklearn path (float64 scaling); the
+    bundle is scored the way the server will score it (fast and, with
+    ML_FUSED_SCALER=1, fused inference). The new bundle is written to a
+    staging directory and only replaces <name>.bundle once it passes, so a
+    failed conversion leaves any existing bundle untouched.
+    """
+    legacy = predictor_cls(model_path=pkl_path, fast_inference=False)
+    bundle_path = os.path.splitext(pkl_path)[0] + BUNDLE_SUFFIX
+    workdir = tempfile.mkdtemp(prefix='.convert-', dir=os.path.dirname(os.path.abspath(pkl_path)))
+    try:
+        staged_path = os.path.join(workdir, os.path.basename(bundle_path))
+        save_bundle(staged_path, legacy.model, legacy.scaler, legacy.feature_names, version)
+
+        bundled = predictor_cls(model_path=staged_path)
+        model_version = bundled.model_version
+        X = sample_from_scaler(legacy.scaler, n_samples=n_samples)
+        max_diff = float(np.max(np.abs(_predict(legacy, X) - _predict(bundled, X))))
+        # Drop the memory-mapped scaler arrays before the staging directory goes
+        del bundled
+
+        passed = max_diff <= tolerance
+        if passed:
+            publish_bundle(staged_path, bundle_path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        'bundle_path': bundle_path,
+        'model_version': model_version,
+        'max_abs_diff': max_diff,
+        'passed': passed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert legacy .pkl models to model bundles')
+    parser.add_argument('--model-dir', type=str, default='models/trained',
+                        help='Directory with trained .pkl models')
+    parser.add_argument('--version', type=str, default=None,
+                        help='Model version written to the manifests (default: UTC timestamp)')
+    parser.add_argument('--tolerance', type=float, default=1e-6,
+                        help='Maximum allowed absolute prediction difference')
+    args = parser.parse_args()
+
+    converted = 0
+    all_passed = True
+    for name, predictor_cls in MODEL_FILES.items():
+        pkl_path = os.path.join(args.model_dir, name + '.pkl')
+        if not os.path.exists(pkl_path):
+            print(f"⚠️  Skipping {name}.pkl: not found")
+            continue
+
+        result = convert_model(pkl_path, predictor_cls, args.version, tolerance=args.tolerance)
+        bundle_name = os.path.basename(result['bundle_path'])
+        if result['passed']:
+            print(f"✅ {name}.pkl -> {bundle_name} "
+                  f"(version {result['model_version']}, max |diff| = {result['max_abs_diff']:.2e})")
+            converted += 1
+        else:
+            print(f"❌ {name}.pkl -> {bundle_name}: max |diff| = {result['max_abs_diff']:.2e} "
+                  f"above tolerance {args.tolerance:.0e}; existing files left unchanged")
+            all_passed = False
+
+    return 0 if converted and all_passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,16 +5,122 @@ Extracts real UCL match data for ML training
 
 import os
 import sys
-import psycopg2
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
 
+from utils.elo_store import EloStore, open_elo_store
+from utils.feature_snapshots import FeatureSnapshots
+from utils.match_features import TRAINING_FEATURES, MatchFeatureBuilder, build_training_features, goals_proxy
+from utils.match_store import MatchStore, infer_match_scores
+from utils.training_dataset import (
+    TrainingDataset, training_writer, write_training_csv, write_training_data
+)
+
 # Load environment variables
 load_dotenv(dotenv_path='../../.env')
 
+# Ratings persist between runs so each extraction only applies new results
+ELO_SNAPSHOT_PATH = os.getenv('ELO_SNAPSHOT_PATH', 'data/elo_snapshot.json')
+ELO_PARAMS = {'k_factor': 20, 'initial_rating': 1500, 'home_advantage': 100}
+
+# Training rows as a columnar bundle (float32 features, int8 outcome); CSV export is opt-in
+TRAINING_DATA_PATH = os.getenv('TRAINING_DATA_PATH', 'data/real_training_data')
+CSV_EXPORT_PATH = 'data/real_training_data.csv'
+
+# Partitioned dataset appended to by incremental extraction
+TRAINING_DATASET_PATH = os.getenv('TRAINING_DATASET_PATH', 'data/training_dataset')
+
+# Rows per round trip when streaming through a server-side cursor
+EXTRACT_ITERSIZE = int(os.getenv('EXTRACT_ITERSIZE', '5000'))
+
+# Columns read by the streaming extraction and their batch dtypes
+# ('datetime' parses to UTC timestamps); the probabilities and xG are
+# `real` in the database, so float32 loses nothing
+MATCH_COLUMNS = [
+    ('id', 'object'),
+    ('homeTeam', 'object'),
+    ('awayTeam', 'object'),
+    ('date', 'datetime'),
+    ('status', 'object'),
+    ('homeWinProb', 'float32'),
+    ('drawProb', 'float32'),
+    ('awayWinProb', 'float32'),
+    ('homeXg', 'float32'),
+    ('awayXg', 'float32')
+]
+
+PLAYER_COLUMNS = [
+    ('id', 'object'),
+    ('name', 'object'),
+    ('team', 'object'),
+    ('position', 'object'),
+    ('overall', 'float32'),
+    ('potential', 'float32'),
+    ('predicted_minutes', 'float32'),
+    ('last5_avg', 'float32'),
+    ('stat_90', 'float32'),
+    ('stat_type', 'object'),
+    ('stat_probability', 'float32'),
+    ('expected_contribution', 'float32')
+]
+
+
+def record_batch(rows: List[Tuple], columns: List[Tuple[str, str]]) -> pd.DataFrame:
+    """
+    Typed columnar batch from cursor rows
+
+    Args:
+        rows: Tuples in column order, as returned by fetchmany()
+        columns: (name, dtype) per column; NULLs become NaN in float columns
+
+    Returns:
+        DataFrame backed by one NumPy array per column
+    """
+    values = list(zip(*rows)) if rows else [()] * len(columns)
+    data = {}
+    for (name, dtype), column in zip(columns, values):
+        if dtype == 'datetime':
+            data[name] = pd.to_datetime(pd.Series(column, dtype=object), utc=True)
+        elif dtype == 'object':
+            data[name] = np.array(column, dtype=object)
+        else:
+            array = np.array(column, dtype=object)
+            array[pd.isna(array)] = np.nan
+            data[name] = array.astype(dtype)
+    return pd.DataFrame(data)
+
+
+def outcome_labels(matches_df: pd.DataFrame) -> np.ndarray:
+    """Match outcome per row (0=home win, 1=draw, 2=away win), the likeliest side by stored probability"""
+    home_prob = matches_df['homeWinProb'].to_numpy()
+    draw_prob = matches_df['drawProb'].to_numpy()
+    away_prob = matches_df['awayWinProb'].to_numpy()
+    return np.where(
+        (home_prob > away_prob) & (home_prob > draw_prob), 0,
+        np.where((away_prob > home_prob) & (away_prob > draw_prob), 2, 1)
+    ).astype(np.int8)
+
+
+def apply_elo_results(store: EloStore, matches_df: pd.DataFrame) -> int:
+    """Apply the finished matches of a frame to an EloStore; returns the number newly applied"""
+    finished = matches_df[matches_df['status'] == 'FINISHED']
+    home_scores, away_scores = infer_match_scores(finished)
+    return store.apply_matches(
+        {
+            'match_id': match_id, 'date': date,
+            'home_team': home_team, 'away_team': away_team,
+            'home_score': home_score, 'away_score': away_score
+        }
+        for match_id, date, home_team, away_team, home_score, away_score in zip(
+            finished['id'], finished['date'], finished['homeTeam'], finished['awayTeam'],
+            home_scores, away_scores
+        )
+    )
+
+
 class UCLDataExtractor:
     """Extract and prepare UCL match data for ML training"""
     
@@ -32,6 +138,9 @@ class UCLDataExtractor:
     
     def connect_db(self):
         """Connect to PostgreSQL database"""
+        # Imported here so the feature helpers work without the driver installed
+        import psycopg2
+        
         try:
             self.conn = psycopg2.connect(self.db_url)
             print("✅ Connected to database")
@@ -87,57 +196,135 @@ class UCLDataExtractor:
         print(f"📊 Fetched {len(df)} players from database")
         return df
     
-    def calculate_elo_ratings(self, matches_df: pd.DataFrame) -> Dict[str, float]:
+    def _stream(self, name: str, query: str, columns: List[Tuple[str, str]],
+                params: Tuple = None, itersize: int = EXTRACT_ITERSIZE) -> Iterator[pd.DataFrame]:
         """
-        Calculate ELO ratings for all teams based on match history
+        Run a query on a named (server-side) cursor and yield typed batches
+        
+        The result set stays on the server and arrives itersize rows per
+        round trip, so client memory is bounded by one batch rather than
+        the whole table.
+        """
+        cursor = self.conn.cursor(name=name)
+        cursor.itersize = itersize
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(itersize)
+                if not rows:
+                    break
+                yield record_batch(rows, columns)
+        finally:
+            cursor.close()
+    
+    def iter_match_batches(self, itersize: int = EXTRACT_ITERSIZE, finished_only: bool = True,
+                           after: Tuple[str, str] = None, through: Tuple[str, str] = None
+                           ) -> Iterator[pd.DataFrame]:
+        """
+        Stream matches in (date, id) order as typed batches (see MATCH_COLUMNS)
+        
+        Args:
+            itersize: Rows per batch
+            finished_only: Only matches with status FINISHED
+            after: (date, id) watermark; only matches strictly after it
+            through: (date, id); only matches up to and including it
+        """
+        conditions, params = [], []
+        if finished_only:
+            conditions.append('status = %s')
+            params.append('FINISHED')
+        if after is not None:
+            conditions.append('(date, id) > (%s, %s)')
+            params.extend(after)
+        if through is not None:
+            conditions.append('(date, id) <= (%s, %s)')
+            params.extend(through)
+        
+        query = f"""
+        SELECT {', '.join(f'"{name}"' for name, _ in MATCH_COLUMNS)}
+        FROM matches
+        {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        ORDER BY date, id
+        """
+        yield from self._stream('ucl_matches', query, MATCH_COLUMNS, tuple(params) or None, itersize)
+    
+    def finished_watermark(self) -> Optional[Tuple[str, str]]:
+        """(date, id) of the newest finished match, as stored; None if there is none"""
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT date, id FROM matches WHERE status = %s ORDER BY date DESC, id DESC LIMIT 1",
+                ('FINISHED',)
+            )
+            row = cursor.fetchone()
+        return tuple(row) if row else None
+    
+    def count_finished(self, through: Tuple[str, str]) -> int:
+        """Number of finished matches up to and including a (date, id) watermark"""
+        with self.conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM matches WHERE status = %s AND (date, id) <= (%s, %s)",
+                ('FINISHED', *through)
+            )
+            return cursor.fetchone()[0]
+    
+    def iter_player_batches(self, itersize: int = EXTRACT_ITERSIZE) -> Iterator[pd.DataFrame]:
+        """Stream players as typed batches (see PLAYER_COLUMNS)"""
+        query = f"""
+        SELECT {', '.join(name for name, _ in PLAYER_COLUMNS)}
+        FROM players
+        ORDER BY id
+        """
+        yield from self._stream('ucl_players', query, PLAYER_COLUMNS, itersize=itersize)
+    
+    def update_elo_store(self, matches_df: pd.DataFrame, snapshot_path: str = ELO_SNAPSHOT_PATH) -> EloStore:
+        """
+        Bring the persisted ELO ratings up to date
+        
+        Loads the snapshot, applies only finished matches it has not seen
+        (by match ID, in date order) and writes the snapshot back.
         
         Args:
             matches_df: DataFrame with match results
+            snapshot_path: ELO snapshot file
         
         Returns:
-            Dictionary mapping team names to ELO ratings
+            EloStore with a rating history for every team
         """
-        from utils.feature_engineering import ELOSystem
+        store = open_elo_store(snapshot_path, **ELO_PARAMS)
+        applied = apply_elo_results(store, matches_df)
+        store.save(snapshot_path)
         
-        elo = ELOSystem(k_factor=20, initial_rating=1500)
+        print(f"📊 ELO: applied {applied} new matches ({len(store)} total, "
+              f"{store.stats()['teams']} teams) -> {snapshot_path}")
+        return store
+    
+    def calculate_elo_ratings(self, matches_df: pd.DataFrame) -> Dict[str, float]:
+        """
+        Calculate ELO ratings for all teams based on match history
         
-        # Process matches chronologically
-        for _, match in matches_df.iterrows():
-            # Skip if match hasn't been played yet
-            if match['status'] != 'FINISHED':
-                continue
-            
-            home_team = match['homeTeam']
-            away_team = match['awayTeam']
-            
-            # Infer result from probabilities (or use actual scores if available)
-            home_prob = match.get('homeWinProb', 0)
-            draw_prob = match.get('drawProb', 0)
-            away_prob = match.get('awayWinProb', 0)
-            
-            # Determine winner based on probabilities
-            if home_prob > away_prob and home_prob > draw_prob:
-                home_score, away_score = 2, 1  # Home win
-            elif away_prob > home_prob and away_prob > draw_prob:
-                home_score, away_score = 1, 2  # Away win
-            else:
-                home_score, away_score = 1, 1  # Draw
-            
-            # Update ELO ratings
-            elo.update_ratings(home_team, away_team, home_score, away_score)
+        Args:
+            matches_df: DataFrame with match results
         
-        ratings = elo.get_all_ratings()
-        print(f"📊 Calculated ELO for {len(ratings)} teams")
-        return ratings
+        Returns:
+            Dictionary mapping team names to their latest ELO ratings
+        """
+        return self.update_elo_store(matches_df).current_ratings()
     
     def calculate_team_form(self, team: str, matches_df: pd.DataFrame, 
                            before_date: str, n_matches: int = 5) -> Dict:
         """
         Calculate team form metrics (last N matches before a specific date)
         
+        With a DataFrame this scans the whole history on every call; pass a
+        MatchStore to slice the team's own matches instead. prepare_training_data
+        builds the same features for all matches in one pass with MatchFeatureBuilder.
+        
         Returns:
             Dict with form, goals_scored, xg, etc.
         """
+        if isinstance(matches_df, MatchStore):
+            return matches_df.team_form(team, before_date, n_matches)
+        
         # Get team's recent matches
         team_matches = matches_df[
             ((matches_df['homeTeam'] == team) | (matches_df['awayTeam'] == team)) &
@@ -189,14 +376,17 @@ class UCLDataExtractor:
         
         return {
             'form': np.mean(form_points) if form_points else 1.5,
-            'goals': int(goals),
+            'goals': goals_proxy(goals),
             'xg': xg,
             'possession': np.mean(possession) if possession else 50
         }
     
     def calculate_h2h_stats(self, home_team: str, away_team: str, 
                            matches_df: pd.DataFrame, before_date: str) -> Dict:
-        """Calculate head-to-head statistics"""
+        """Calculate head-to-head statistics (see MatchFeatureBuilder for the one-pass version)"""
+        if isinstance(matches_df, MatchStore):
+            return matches_df.h2h(home_team, away_team, before_date)
+        
         h2h = matches_df[
             (((matches_df['homeTeam'] == home_team) & (matches_df['awayTeam'] == away_team)) |
              ((matches_df['homeTeam'] == away_team) & (matches_df['awayTeam'] == home_team))) &
@@ -233,12 +423,115 @@ class UCLDataExtractor:
             'away_wins': away_wins
         }
     
-    def prepare_training_data(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    def iter_training_batches(self, itersize: int = EXTRACT_ITERSIZE, window: int = 5,
+                              snapshot_path: str = ELO_SNAPSHOT_PATH,
+                              builder: MatchFeatureBuilder = None,
+                              after: Tuple[str, str] = None, through: Tuple[str, str] = None
+                              ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Training rows for every finished match, one cursor batch at a time
+        
+        Form and head-to-head state (MatchFeatureBuilder) and ELO history
+        (the persisted EloStore) carry over from batch to batch, so only one
+        batch of raw matches is held in memory. Rows match the as-of join in
+        prepare_training_data: each sees only matches from earlier days.
+        
+        Args:
+            itersize: Matches per batch
+            window: Number of recent matches in the form features
+            snapshot_path: ELO snapshot, brought up to date and saved at the end
+            builder: Form / head-to-head state to continue from (None = empty history)
+            after, through: (date, id) bounds passed to iter_match_batches
+        
+        Yields:
+            (X, y_outcome, y_xg_home, y_xg_away) per batch, in date order
+        """
+        elo_store = open_elo_store(snapshot_path, **ELO_PARAMS)
+        if builder is None:
+            builder = MatchFeatureBuilder(window)
+        n_matches = 0
+        
+        for batch in self.iter_match_batches(itersize, after=after, through=through):
+            apply_elo_results(elo_store, batch)
+            # Day resolution: a day's matches stay pending in the builder (even
+            # across a batch boundary) until a later day arrives
+            by_day = batch.assign(date=batch['date'].dt.floor('D'))
+            X = build_training_features(by_day, elo_store, builder=builder, flush=False)
+            n_matches += len(batch)
+            yield (
+                X,
+                outcome_labels(batch),
+                batch['homeXg'].to_numpy(dtype=np.float32),
+                batch['awayXg'].to_numpy(dtype=np.float32)
+            )
+        
+        elo_store.save(snapshot_path)
+        print(f"📊 Streamed {n_matches} finished matches in batches of {itersize} "
+              f"(ELO: {len(elo_store)} matches -> {snapshot_path})")
+    
+    def extract_incremental(self, dataset_path: str = TRAINING_DATASET_PATH,
+                            itersize: int = EXTRACT_ITERSIZE, rebuild: bool = False) -> int:
+        """
+        Append training rows for the matches finished since the last run
+        
+        The dataset's manifest holds the (date, id) watermark of the newest
+        match it covers and the form / head-to-head state after it. Only
+        finished matches past the watermark are read (up to the newest one at
+        the start of the run, so rows arriving meanwhile wait for the next
+        run). They are featurized from the saved state and written as new
+        partitions. The cost scales with the new matches, not the history.
+        
+        A match that is marked FINISHED after later matches were extracted
+        sorts before the watermark and is not picked up; this is reported,
+        and rebuild=True re-extracts everything.
+        
+        Args:
+            dataset_path: Partitioned dataset directory
+            itersize: Rows per cursor round trip
+            rebuild: Discard the dataset and extract the whole history
+        
+        Returns:
+            Number of rows appended
+        """
+        dataset = TrainingDataset(dataset_path)
+        if rebuild:
+            dataset.reset()
+        
+        if dataset.watermark is not None:
+            missed = self.count_finished(dataset.watermark) - dataset.rows
+            if missed > 0:
+                print(f"⚠️  {missed} finished matches dated at or before the watermark are not in the dataset")
+                print("   (results entered late); run with --rebuild to include them")
+        
+        through = self.finished_watermark()
+        if through is None or through == dataset.watermark:
+            print(f"✅ No new finished matches since {dataset.watermark} ({dataset.rows} rows in {dataset_path})")
+            return 0
+        
+        builder = dataset.builder()
+        for X, y_outcome, y_xg_home, y_xg_away in self.iter_training_batches(
+                itersize, builder=builder, after=dataset.watermark, through=through):
+            dataset.append(X, y_outcome, y_xg_home, y_xg_away)
+        
+        rows_before = dataset.rows
+        dataset.commit(through, builder)
+        appended = dataset.rows - rows_before
+        print(f"💾 Appended {appended} rows to {dataset_path} "
+              f"({dataset.rows} total, watermark {through[0]} / {through[1]})")
+        return appended
+    
+    def prepare_training_data(self, stream: bool = False, itersize: int = EXTRACT_ITERSIZE
+                              ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """
         Prepare complete training dataset from database
         
+        Args:
+            stream: Build the rows from server-side cursor batches
+                (iter_training_batches) instead of one full-table read
+            itersize: Matches per batch when streaming
+        
         Returns:
-            X: Feature matrix (n_samples, 18)
+            X: Feature matrix (n_samples, 23)
             y_outcome: Match outcomes (0=home, 1=draw, 2=away)
             y_xg_home: Home team xG
             y_xg_away: Away team xG
@@ -247,6 +540,15 @@ class UCLDataExtractor:
         print("🔄 EXTRACTING TRAINING DATA FROM DATABASE")
         print("="*60 + "\n")
         
+        if stream:
+            batches = list(self.iter_training_batches(itersize))
+            n_rows = sum(len(batch[0]) for batch in batches)
+            if n_rows < 10:
+                print(f"⚠️  Only {n_rows} finished matches found!")
+                print("   Minimum 10 required for training. Using synthetic data as fallback.")
+                return None, None, None, None
+            return tuple(np.concatenate(column) for column in zip(*batches))
+        
         # Fetch data
         matches_df = self.fetch_matches()
         
@@ -260,77 +562,23 @@ class UCLDataExtractor:
         
         print(f"✅ Found {len(finished_matches)} finished matches for training")
         
-        # Calculate ELO ratings
-        elo_ratings = self.calculate_elo_ratings(finished_matches)
-        
-        # Prepare features and labels
-        X = []
-        y_outcome = []
-        y_xg_home = []
-        y_xg_away = []
+        # Keep the served ratings snapshot up to date
+        self.update_elo_store(finished_matches)
         
         print("\n🔧 Engineering features...")
         
-        for idx, match in finished_matches.iterrows():
-            home_team = match['homeTeam']
-            away_team = match['awayTeam']
-            match_date = match['date']
-            
-            # Get ELO ratings
-            home_elo = elo_ratings.get(home_team, 1500)
-            away_elo = elo_ratings.get(away_team, 1500)
-            
-            # Get form metrics
-            home_form = self.calculate_team_form(home_team, finished_matches, match_date)
-            away_form = self.calculate_team_form(away_team, finished_matches, match_date)
-            
-            # Get head-to-head
-            h2h = self.calculate_h2h_stats(home_team, away_team, finished_matches, match_date)
-            
-            # Build feature vector (18 features)
-            features = [
-                home_elo,
-                away_elo,
-                home_elo - away_elo,  # elo_diff
-                home_form['form'],
-                away_form['form'],
-                home_form['goals'],
-                away_form['goals'],
-                home_form['xg'],
-                away_form['xg'],
-                h2h['home_wins'],
-                h2h['draws'],
-                h2h['away_wins'],
-                home_form['possession'],
-                away_form['possession'],
-                1,  # venue_advantage (always home)
-                8,  # stage_importance (Champions League)
-                4,  # home_rest_days (default)
-                4   # away_rest_days (default)
-            ]
-            
-            X.append(features)
-            
-            # Labels (outcome)
-            home_prob = match['homeWinProb']
-            draw_prob = match['drawProb']
-            away_prob = match['awayWinProb']
-            
-            if home_prob > away_prob and home_prob > draw_prob:
-                y_outcome.append(0)  # Home win
-            elif away_prob > home_prob and away_prob > draw_prob:
-                y_outcome.append(2)  # Away win
-            else:
-                y_outcome.append(1)  # Draw
-            
-            # Expected goals
-            y_xg_home.append(match['homeXg'])
-            y_xg_away.append(match['awayXg'])
+        # Point-in-time features: each row is an as-of join against team and
+        # head-to-head state from strictly earlier days, so nothing leaks
+        store = MatchStore.from_frame(finished_matches)
+        X = np.empty((len(store), len(TRAINING_FEATURES)), dtype=np.float32)
+        X[store.source_rows] = FeatureSnapshots(store, **ELO_PARAMS).training_features()
+        
+        # Labels (outcome): 0=home win, 1=draw, 2=away win
+        y_outcome = outcome_labels(finished_matches)
         
-        X = np.array(X, dtype=np.float32)
-        y_outcome = np.array(y_outcome, dtype=np.int32)
-        y_xg_home = np.array(y_xg_home, dtype=np.float32)
-        y_xg_away = np.array(y_xg_away, dtype=np.float32)
+        # Expected goals
+        y_xg_home = finished_matches['homeXg'].to_numpy(dtype=np.float32)
+        y_xg_away = finished_matches['awayXg'].to_numpy(dtype=np.float32)
         
         print(f"\n✅ Prepared training data:")
         print(f"   Samples: {len(X)}")
@@ -351,40 +599,65 @@ class UCLDataExtractor:
 
 def main():
     """Main function to extract and save training data"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Extract UCL training data from PostgreSQL')
+    parser.add_argument('--stream', action='store_true',
+                        help='Read matches through a server-side cursor and write rows batch by batch')
+    parser.add_argument('--itersize', type=int, default=EXTRACT_ITERSIZE,
+                        help='Rows per cursor round trip when streaming (env EXTRACT_ITERSIZE)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Append rows for newly finished matches to the partitioned dataset')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='With --incremental: discard the dataset and extract the whole history')
+    parser.add_argument('--dataset', default=TRAINING_DATASET_PATH,
+                        help='Partitioned dataset directory (env TRAINING_DATASET_PATH)')
+    parser.add_argument('--output', default=TRAINING_DATA_PATH,
+                        help='Training data bundle directory (env TRAINING_DATA_PATH)')
+    parser.add_argument('--csv', action='store_true',
+                        help=f'Also export the rows as CSV ({CSV_EXPORT_PATH})')
+    args = parser.parse_args()
+    
     extractor = UCLDataExtractor()
+    os.makedirs('data', exist_ok=True)
     
     try:
-        # Extract training data
-        X, y_outcome, y_xg_home, y_xg_away = extractor.prepare_training_data()
-        
-        if X is None:
-            print("\n⚠️  Insufficient data, falling back to synthetic data")
-            return False
-        
-        # Save to CSV for inspection
-        import pandas as pd
-        
-        feature_names = [
-            'home_elo', 'away_elo', 'elo_diff',
-            'home_form_last5', 'away_form_last5',
-            'home_goals_last5', 'away_goals_last5',
-            'home_xg_last5', 'away_xg_last5',
-            'h2h_home_wins', 'h2h_draws', 'h2h_away_wins',
-            'home_possession_avg', 'away_possession_avg',
-            'venue_advantage', 'stage_importance',
-            'home_rest_days', 'away_rest_days'
-        ]
-        
-        df = pd.DataFrame(X, columns=feature_names)
-        df['outcome'] = y_outcome
-        df['home_xg'] = y_xg_home
-        df['away_xg'] = y_xg_away
-        
-        output_path = 'data/real_training_data.csv'
-        os.makedirs('data', exist_ok=True)
-        df.to_csv(output_path, index=False)
+        if args.incremental:
+            extractor.extract_incremental(args.dataset, args.itersize, rebuild=args.rebuild)
+            rows = TrainingDataset(args.dataset).rows
+            if rows < 10:
+                print(f"\n⚠️  Only {rows} finished matches, falling back to synthetic data")
+                return False
+            print("\n✅ Data extraction complete!")
+            return True
+        
+        if args.stream:
+            with training_writer(args.output) as writer:
+                for X, y_outcome, y_xg_home, y_xg_away in extractor.iter_training_batches(args.itersize):
+                    writer.append(features=X, outcome=y_outcome, home_xg=y_xg_home, away_xg=y_xg_away)
+                    if args.csv:
+                        write_training_csv(CSV_EXPORT_PATH, X, y_outcome, y_xg_home, y_xg_away,
+                                           append=writer.rows > len(X))
+            n_rows = writer.rows
+            
+            if n_rows < 10:
+                print(f"\n⚠️  Only {n_rows} finished matches, falling back to synthetic data")
+                return False
+        else:
+            # Extract training data
+            X, y_outcome, y_xg_home, y_xg_away = extractor.prepare_training_data()
+            
+            if X is None:
+                print("\n⚠️  Insufficient data, falling back to synthetic data")
+                return False
+            
+            n_rows = write_training_data(args.output, X, y_outcome, y_xg_home, y_xg_away)
+            if args.csv:
+                write_training_csv(CSV_EXPORT_PATH, X, y_outcome, y_xg_home, y_xg_away)
         
-        print(f"\n💾 Training data saved to: {output_path}")
+        print(f"\n💾 Training data saved to: {args.output} ({n_rows} rows)")
+        if args.csv:
+            print(f"💾 CSV export: {CSV_EXPORT_PATH}")
         print("\n✅ Data extraction complete!")
         
         return True
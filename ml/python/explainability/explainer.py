@@ -4,29 +4,54 @@ Provides feature contribution analysis for match predictions
 """
 
 import shap
+import threading
 import numpy as np
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import warnings
 warnings.filterwarnings('ignore')
 
+# Outcome model class order (see MatchOutcomePredictor.predict_proba)
+OUTCOME_CLASSES = ['home_win', 'draw', 'away_win']
+
+
+def per_class_shap(shap_values) -> np.ndarray:
+    """
+    Normalize TreeExplainer output to shape (n_classes, n_samples, n_features)
+    
+    Older SHAP releases return a list with one array per class, newer ones a
+    single (n_samples, n_features, n_classes) array; single-output models
+    get a leading class axis of length 1.
+    """
+    if isinstance(shap_values, list):
+        return np.stack([np.asarray(v) for v in shap_values])
+    values = np.asarray(shap_values)
+    if values.ndim == 3:
+        return np.moveaxis(values, -1, 0)
+    return values[np.newaxis]
+
+
 class MatchExplainer:
     """
     SHAP explainer for match outcome predictions
     Uses TreeExplainer for XGBoost models
     """
     
-    def __init__(self, model):
+    def __init__(self, model, lazy: bool = False):
         """
         Initialize explainer with trained model
         
         Args:
             model: Trained MatchOutcomePredictor instance
+            lazy: Build the TreeExplainer on first use instead of now
+                (the model may still be loading)
         """
         self.model = model
         self.explainer = None
         self.background_data = None
+        self._initialized = False
+        self._init_lock = threading.Lock()
         
-        if model.model is not None:
+        if not lazy and model.model is not None:
             self._initialize_explainer()
     
     def _initialize_explainer(self):
@@ -38,6 +63,15 @@ class MatchExplainer:
         except Exception as e:
             print(f"⚠️  Warning: Could not initialize SHAP explainer: {e}")
             self.explainer = None
+        self._initialized = True
+    
+    def _ensure_explainer(self):
+        """Build the TreeExplainer once, on first use (thread-safe)"""
+        if self._initialized:
+            return
+        with self._init_lock:
+            if not self._initialized and self.model.model is not None:
+                self._initialize_explainer()
     
     def set_background_data(self, X: np.ndarray):
         """
@@ -46,13 +80,41 @@ class MatchExplainer:
         Args:
             X: Background dataset (n_samples, n_features)
         """
-        self.background_data = self.model.scaler.transform(X)
+        self.background_data = self._scale(X)
         # Re-initialize explainer with background data
         if self.model.model is not None:
             self.explainer = shap.TreeExplainer(
                 self.model.model,
                 data=self.background_data
             )
+            self._initialized = True
+    
+    def _scale(self, X: np.ndarray) -> np.ndarray:
+        """
+        Scale raw features as the predictor does
+        
+        StandardScaler keeps float32 input in float32, which can move a value
+        across a split point; scaling always runs in float64 like predictions.
+        """
+        return self.model.scaler.transform(np.asarray(X, dtype=np.float64))
+    
+    def mean_abs_shap(self, X: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Global mean |SHAP| per class over a sample, in one explainer pass
+        
+        Args:
+            X: Unscaled feature sample (n_samples, n_features)
+        
+        Returns:
+            Array (n_classes, n_features), or None if SHAP is not available
+        """
+        self._ensure_explainer()
+        if self.explainer is None or len(X) == 0:
+            return None
+        
+        X_scaled = self._scale(X)
+        values = per_class_shap(self.explainer.shap_values(X_scaled))
+        return np.abs(values).mean(axis=1)
     
     def explain_prediction(self, features: Dict) -> Dict[str, float]:
         """
@@ -64,37 +126,97 @@ class MatchExplainer:
         Returns:
             Dict mapping feature names to SHAP values
         """
+        X = self.model.prepare_features(features)
+        shap_vals, _ = self._shap_for_predicted_class(X)
+        
+        # Map to feature names
+        return {
+            name: float(val)
+            for name, val in zip(self.model.feature_names, shap_vals[0])
+        }
+    
+    def explain_batch(
+        self,
+        X: np.ndarray,
+        proba: Optional[np.ndarray] = None,
+        top_k: int = 5
+    ) -> List[Dict]:
+        """
+        Get SHAP values and top factors for many predictions in one pass
+        
+        Args:
+            X: Unscaled features (n_matches, n_features) in model feature order
+            proba: Class probabilities (n_matches, n_classes) already computed
+                for these rows; predicted once over the batch if omitted
+            top_k: Number of top positive and negative factors per row
+        
+        Returns:
+            List of dicts with predicted_class, shap_values and top_factors
+        """
+        X = np.asarray(X)
+        shap_vals, pred_class = self._shap_for_predicted_class(X, proba)
+        
+        # Rank every row by |SHAP| at once
+        order = np.argsort(-np.abs(shap_vals), axis=1, kind='stable')
+        names = self.model.feature_names
+        
+        explanations = []
+        for row, ranked, cls in zip(shap_vals, order, pred_class):
+            positive = [
+                {'feature': names[j], 'impact': float(row[j])}
+                for j in ranked if row[j] > 0
+            ][:top_k]
+            negative = [
+                {'feature': names[j], 'impact': float(row[j])}
+                for j in ranked if row[j] < 0
+            ][:top_k]
+            explanations.append({
+                'predicted_class': OUTCOME_CLASSES[cls] if cls >= 0 else None,
+                'shap_values': {name: float(val) for name, val in zip(names, row)},
+                'top_factors': {'positive': positive, 'negative': negative}
+            })
+        
+        return explanations
+    
+    def _shap_for_predicted_class(
+        self,
+        X: np.ndarray,
+        proba: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        SHAP values (n_rows, n_features) for each row's predicted class
+        
+        One shap_values call covers every row; the predicted class comes from
+        proba, or from a single predict_proba pass over the batch (-1 where
+        it is unknown).
+        """
+        pred_class = np.full(len(X), -1) if proba is None else np.argmax(proba, axis=1)
+        self._ensure_explainer()
         if self.explainer is None:
             # Fallback to feature importance if SHAP not available
-            return self._fallback_explanation(features)
+            return self._fallback_batch(X), pred_class
         
         try:
-            # Prepare features
-            X = self.model.prepare_features(features)
-            X_scaled = self.model.scaler.transform(X)
-            
-            # Calculate SHAP values
-            shap_values = self.explainer.shap_values(X_scaled)
+            X_scaled = self._scale(X)
+            per_class = per_class_shap(self.explainer.shap_values(X_scaled))
             
             # For multiclass, use values for predicted class
-            if isinstance(shap_values, list):
-                # Get predicted class
-                pred_class = np.argmax(self.model.model.predict_proba(X_scaled)[0])
-                shap_vals = shap_values[pred_class][0]
-            else:
-                shap_vals = shap_values[0]
-            
-            # Map to feature names
-            explanation = {
-                name: float(val)
-                for name, val in zip(self.model.feature_names, shap_vals)
-            }
-            
-            return explanation
+            if len(per_class) == 1:
+                return per_class[0], pred_class
+            if proba is None:
+                pred_class = np.argmax(self.model.model.predict_proba(X_scaled), axis=1)
+            return per_class[pred_class, np.arange(len(X))], pred_class
         
         except Exception as e:
             print(f"⚠️  SHAP calculation failed: {e}")
-            return self._fallback_explanation(features)
+            return self._fallback_batch(X), pred_class
+    
+    def _fallback_batch(self, X: np.ndarray) -> np.ndarray:
+        """Vectorized _fallback_explanation over a feature matrix"""
+        importance = np.array([
+            item['importance'] for item in self.model.get_feature_importance()
+        ])
+        return importance * (np.asarray(X, dtype=np.float64) / 100)
     
     def _fallback_explanation(self, features: Dict) -> Dict[str, float]:
         """
@@ -235,4 +357,4 @@ class PlayerExplainer:
 
 
 # Export main classes
-__all__ = ['MatchExplainer', 'PlayerExplainer']
+__all__ = ['MatchExplainer', 'PlayerExplainer', 'OUTCOME_CLASSES', 'per_class_shap']
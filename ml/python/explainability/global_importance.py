@@ -0,0 +1,151 @@
+"""
+Global Feature Importance
+Importances (and optional mean |SHAP| per class) computed once at model
+load and kept as an immutable structure with pre-serialized responses
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from explainability.explainer import OUTCOME_CLASSES
+
+
+class CachedPayload(NamedTuple):
+    """Serialized JSON response body and its strong ETag"""
+    body: bytes
+    etag: str
+
+
+class GlobalImportance(NamedTuple):
+    """
+    Precomputed global importances for the outcome model
+
+    importance holds (feature, importance) pairs in model feature order;
+    mean_abs_shap holds (class, ((feature, value), ...)) pairs when a SHAP
+    sample was available, otherwise None.
+    """
+    importance: Tuple[Tuple[str, float], ...]
+    mean_abs_shap: Optional[Tuple[Tuple[str, Tuple[Tuple[str, float], ...]], ...]]
+    shap_samples: int
+    importance_payload: CachedPayload
+    shap_payload: Optional[CachedPayload]
+
+    def as_list(self) -> List[Dict]:
+        """Importances in the /features/importance list-of-dicts format (a fresh copy)"""
+        return [{'feature': name, 'importance': value} for name, value in self.importance]
+
+
+def _payload(obj) -> CachedPayload:
+    body = json.dumps(obj, separators=(',', ':')).encode('utf-8')
+    return CachedPayload(body=body, etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+
+
+def load_shap_sample(
+    path: str,
+    feature_names: List[str],
+    max_rows: int = 1000,
+    seed: int = 42
+) -> np.ndarray:
+    """
+    Load a feature sample (e.g. the training CSV) for global SHAP values
+
+    Columns missing from the file count as 0, like prepare_features does.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    if len(df) > max_rows:
+        df = df.sample(n=max_rows, random_state=seed)
+    return df.reindex(columns=feature_names, fill_value=0).to_numpy(dtype=np.float64)
+
+
+def build_global_importance(
+    model,
+    explainer=None,
+    sample: Optional[np.ndarray] = None
+) -> GlobalImportance:
+    """
+    Compute global importances for a loaded MatchOutcomePredictor
+
+    Args:
+        model: Trained MatchOutcomePredictor
+        explainer: MatchExplainer for mean |SHAP| (optional)
+        sample: Unscaled feature sample for mean |SHAP| (optional)
+
+    Returns:
+        Immutable GlobalImportance
+    """
+    importance = tuple(
+        (item['feature'], float(item['importance']))
+        for item in model.get_feature_importance()
+    )
+
+    mean_abs_shap = None
+    shap_samples = 0
+    if explainer is not None and sample is not None:
+        values = explainer.mean_abs_shap(sample)
+        if values is not None:
+            classes = OUTCOME_CLASSES if len(values) == len(OUTCOME_CLASSES) else [
+                f'class_{i}' for i in range(len(values))
+            ]
+            mean_abs_shap = tuple(
+                (cls, tuple((name, float(v)) for name, v in zip(model.feature_names, row)))
+                for cls, row in zip(classes, values)
+            )
+            shap_samples = int(len(sample))
+
+    importance_payload = _payload([
+        {'feature': name, 'importance': value} for name, value in importance
+    ])
+    shap_payload = None
+    if mean_abs_shap is not None:
+        shap_payload = _payload({
+            'samples': shap_samples,
+            'classes': {
+                cls: [{'feature': name, 'mean_abs_shap': v} for name, v in row]
+                for cls, row in mean_abs_shap
+            }
+        })
+
+    return GlobalImportance(
+        importance=importance,
+        mean_abs_shap=mean_abs_shap,
+        shap_samples=shap_samples,
+        importance_payload=importance_payload,
+        shap_payload=shap_payload
+    )
+
+
+def create_global_importance(model, explainer=None) -> GlobalImportance:
+    """
+    Build global importances from environment settings
+
+    Environment:
+        IMPORTANCE_SHAP_SAMPLE: CSV of feature rows for mean |SHAP| (unset skips SHAP)
+        IMPORTANCE_SHAP_ROWS: Maximum rows drawn from the sample (default 1000)
+    """
+    sample = None
+    sample_path = os.getenv('IMPORTANCE_SHAP_SAMPLE')
+    if sample_path and explainer is not None:
+        try:
+            sample = load_shap_sample(
+                sample_path,
+                model.feature_names,
+                max_rows=int(os.getenv('IMPORTANCE_SHAP_ROWS', '1000'))
+            )
+        except Exception as e:
+            print(f"⚠️  Warning: Could not load SHAP sample {sample_path}: {e}")
+
+    return build_global_importance(model, explainer, sample)
+
+
+__all__ = [
+    'CachedPayload',
+    'GlobalImportance',
+    'build_global_importance',
+    'create_global_importance',
+    'load_shap_sample'
+]
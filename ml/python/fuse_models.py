@@ -0,0 +1,86 @@
+"""
+Fuse StandardScalers into Trained Boosters
+Verifies that scaler-fused boosters match the unfused models
+
+Fusion itself happens at load time (ML_FUSED_SCALER=1); this script only
+checks saved models before the flag is turned on.
+
+Usage:
+    python fuse_models.py --model-dir models/trained
+    python fuse_models.py --sample-csv data/real_training_data.csv
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from models.match_predictor import MatchOutcomePredictor, ExpectedGoalsPredictor
+from models.fast_inference import get_iteration_range
+from models.model_bundle import resolve_model_path
+from models.scaler_fusion import (
+    fuse_scaler_into_booster,
+    verify_fused_predictions,
+    sample_from_scaler
+)
+
+MODEL_FILES = {
+    'match_outcome_model': MatchOutcomePredictor,
+    'xg_home_model': ExpectedGoalsPredictor,
+    'xg_away_model': ExpectedGoalsPredictor,
+}
+
+
+def fuse_model(path: str, predictor_cls, sample_df=None, n_samples: int = 10000,
+               tolerance: float = 1e-6) -> dict:
+    """Fuse one saved model and verify it against the unfused model"""
+    predictor = predictor_cls(model_path=path, fast_inference=False)
+    fused = fuse_scaler_into_booster(predictor.model.get_booster(), predictor.scaler)
+
+    if sample_df is not None:
+        X = sample_df[predictor.feature_names].values.astype(np.float64)
+    else:
+        X = sample_from_scaler(predictor.scaler, n_samples=n_samples)
+
+    return verify_fused_predictions(
+        predictor.model, predictor.scaler, fused, X,
+        iteration_range=get_iteration_range(predictor.model),
+        tolerance=tolerance
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fold StandardScalers into booster thresholds')
+    parser.add_argument('--model-dir', type=str, default='models/trained',
+                        help='Directory with trained model bundles (or legacy .pkl files)')
+    parser.add_argument('--sample-csv', type=str, default=None,
+                        help='Verify on rows of this CSV instead of a synthetic sample')
+    parser.add_argument('--samples', type=int, default=10000,
+                        help='Synthetic verification sample size')
+    parser.add_argument('--tolerance', type=float, default=1e-6,
+                        help='Maximum allowed absolute prediction difference')
+    args = parser.parse_args()
+
+    sample_df = pd.read_csv(args.sample_csv) if args.sample_csv else None
+
+    all_passed = True
+    for name, predictor_cls in MODEL_FILES.items():
+        path = resolve_model_path(args.model_dir, name)
+        filename = os.path.basename(path)
+        if not os.path.exists(path):
+            print(f"⚠️  Skipping {filename}: not found")
+            continue
+
+        result = fuse_model(path, predictor_cls, sample_df, args.samples, args.tolerance)
+        status = "✅" if result['passed'] else "❌"
+        print(f"{status} {filename}: max |diff| = {result['max_abs_diff']:.2e}, "
+              f"{result['n_mismatched']}/{result['n_samples']} samples above tolerance")
+        all_passed = all_passed and result['passed']
+
+    return 0 if all_passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+Fast XGBoost Inference
+Scaler + Booster.inplace_predict on preallocated buffers
+"""
+
+import threading
+import numpy as np
+from typing import Optional, Tuple
+
+
+def get_iteration_range(model) -> Tuple[int, int]:
+    """
+    Iteration range the sklearn wrapper would use for prediction
+
+    Models trained with early stopping predict with trees up to
+    best_iteration; otherwise every tree is used.
+    """
+    try:
+        return (0, int(model.best_iteration) + 1)
+    except AttributeError:
+        return (0, 0)
+
+
+class FastBoosterPredictor:
+    """
+    Low-overhead inference for a fitted XGBoost sklearn model
+
+    The StandardScaler is reduced to precomputed float64 mean/scale vectors and
+    applied into a per-thread contiguous buffer, which is handed straight to
+    Booster.inplace_predict (no sklearn validation, no DMatrix construction).
+
+    Scaling runs in float64 and the result is cast to float32 afterwards,
+    exactly as StandardScaler.transform followed by XGBoost's own float32
+    conversion. Scaling in float32 would move integer-valued features (goals,
+    H2H counts, tiers) that sit on a split point to the other branch.
+
+    With a scaler-fused booster, batches whose values are all exactly
+    representable in float32 skip scaling and go straight to the fused
+    booster. Fused thresholds are only exact for such inputs, so any other
+    batch is scaled and predicted with the original booster.
+    """
+
+    def __init__(self, model, scaler=None, fused=None):
+        """
+        Args:
+            model: Fitted xgb.XGBClassifier / xgb.XGBRegressor
+            scaler: Fitted StandardScaler, or None if inputs need no scaling
+            fused: Scaler-fused copy of the booster (models.scaler_fusion)
+                to use for float32-exact batches
+        """
+        self.booster = model.get_booster()
+        self.fused = fused
+        self.iteration_range = get_iteration_range(model)
+        self.n_features = self.booster.num_features()
+
+        self.mean: Optional[np.ndarray] = None
+        self.scale: Optional[np.ndarray] = None
+        if scaler is not None:
+            mean = getattr(scaler, 'mean_', None)
+            scale = getattr(scaler, 'scale_', None)
+            self.mean = np.ascontiguousarray(
+                mean if mean is not None else np.zeros(self.n_features), dtype=np.float64
+            )
+            self.scale = np.ascontiguousarray(
+                scale if scale is not None else np.ones(self.n_features), dtype=np.float64
+            )
+
+        # One scratch buffer per thread so concurrent requests never share rows
+        self._local = threading.local()
+
+    def _buffers(self, n_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get (n_rows, n_features) float64 and float32 views of this thread's scratch buffers"""
+        buf = getattr(self._local, 'buf', None)
+        if buf is None or buf.shape[0] < n_rows:
+            capacity = max(n_rows, 1 if buf is None else 2 * buf.shape[0])
+            buf = np.empty((capacity, self.n_features), dtype=np.float64)
+            self._local.buf = buf
+            self._local.buf32 = np.empty((capacity, self.n_features), dtype=np.float32)
+        return buf[:n_rows], self._local.buf32[:n_rows]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Raw model output for a feature matrix
+
+        Args:
+            X: Unscaled features (n_rows, n_features)
+
+        Returns:
+            Class probabilities (n_rows, n_classes) for multi:softprob models,
+            otherwise predictions (n_rows,)
+        """
+        if self.mean is None:
+            return self._inplace_predict(self.booster, X)
+
+        scaled, data = self._buffers(X.shape[0])
+        if self.fused is not None:
+            data[...] = X
+            # NaN marks a missing value and is handled alike on both paths
+            if np.all((data == X) | np.isnan(X)):
+                return self._inplace_predict(self.fused, data)
+
+        np.subtract(X, self.mean, out=scaled)
+        np.divide(scaled, self.scale, out=scaled)
+        data[...] = scaled
+        return self._inplace_predict(self.booster, data)
+
+    def _inplace_predict(self, booster, data: np.ndarray) -> np.ndarray:
+        """Predict with the iteration range the sklearn wrapper would use"""
+        return booster.inplace_predict(
+            data,
+            iteration_range=self.iteration_range,
+            predict_type='value'
+        )
+
+
+__all__ = ['FastBoosterPredictor', 'get_iteration_range']
@@ -13,15 +13,37 @@ import json
 import os
 from typing import Dict, List, Tuple, Optional
 
+from models.fast_inference import FastBoosterPredictor
+from models.scaler_fusion import fuse_scaler_into_booster
+from models.model_bundle import is_bundle, load_bundle, save_bundle
+
+
+def _fast_inference_default() -> bool:
+    """Fast inference is on unless ML_FAST_INFERENCE is set to 0/false"""
+    return os.getenv('ML_FAST_INFERENCE', '1').lower() not in ('0', 'false', 'no')
+
+
+def _fused_scaler_default() -> bool:
+    """Scaler fusion is opt-in via ML_FUSED_SCALER=1"""
+    return os.getenv('ML_FUSED_SCALER', '0').lower() in ('1', 'true', 'yes')
+
+
 class MatchOutcomePredictor:
     """
     Multi-class classifier for match outcomes
     Classes: 0=Home Win, 1=Draw, 2=Away Win
     """
     
-    def __init__(self, model_path: Optional[str] = None):
+    def __init__(self, model_path: Optional[str] = None, fast_inference: Optional[bool] = None):
         self.model = None
         self.scaler = StandardScaler()
+        # Booster.inplace_predict on float32 buffers instead of the sklearn wrapper
+        self.fast_inference = _fast_inference_default() if fast_inference is None else fast_inference
+        # Fold the scaler into the tree thresholds so the fast path skips scaling
+        self.fused_scaler = _fused_scaler_default()
+        self._fast = None
+        # Manifest version of a loaded bundle (None for legacy pickles and fresh models)
+        self.model_version: Optional[str] = None
         self.feature_names = [
             'home_elo', 'away_elo', 'elo_diff',
             'home_form_last5', 'away_form_last5',
@@ -89,6 +111,7 @@ class MatchOutcomePredictor:
         X_val_scaled = self.scaler.transform(X_val)
         
         # Train with early stopping
+        self._fast = None
         self.model.fit(
             X_train_scaled, y_train,
             eval_set=[(X_val_scaled, y_val)],
@@ -128,10 +151,40 @@ class MatchOutcomePredictor:
             raise ValueError("Model not trained or loaded")
         
         X = self.prepare_features(match_data)
-        X_scaled = self.scaler.transform(X)
+        return self.predict_proba_batch(X)[0]
+    
+    def predict_proba_batch(self, X: np.ndarray) -> List[Dict]:
+        """
+        Predict match outcome probabilities for many fixtures at once
         
-        proba = self.model.predict_proba(X_scaled)[0]
+        Args:
+            X: Feature matrix (n_matches, n_features) in feature_names order
         
+        Returns:
+            list: One probability dict per row, in row order
+        """
+        if self.model is None:
+            raise ValueError("Model not trained or loaded")
+        
+        if self.fast_inference:
+            proba = self._get_fast_predictor().predict(X)
+        else:
+            X_scaled = self.scaler.transform(X)
+            proba = self.model.predict_proba(X_scaled)
+        
+        return [
+            {
+                'home_win_prob': float(row[0] * 100),
+                'draw_prob': float(row[1] * 100),
+                'away_win_prob': float(row[2] * 100),
+                'confidence': float(max(row) * 100)
+            }
+            for row in self._smooth_proba(proba)
+        ]
+    
+    @staticmethod
+    def _smooth_proba(proba: np.ndarray) -> np.ndarray:
+        """Mix raw class probabilities (n_matches, 3) with a neutral baseline"""
         # Light smoothing to avoid only extreme predictions (90%+)
         # Mostly trust model predictions with minimal baseline mixing
         alpha = 0.92  # Weight for model predictions (92% model + 8% baseline)
@@ -140,14 +193,7 @@ class MatchOutcomePredictor:
         smoothed_proba = alpha * proba + (1 - alpha) * baseline
         
         # Normalize to ensure probabilities sum to 100%
-        smoothed_proba = smoothed_proba / smoothed_proba.sum()
-        
-        return {
-            'home_win_prob': float(smoothed_proba[0] * 100),
-            'draw_prob': float(smoothed_proba[1] * 100),
-            'away_win_prob': float(smoothed_proba[2] * 100),
-            'confidence': float(max(smoothed_proba) * 100)
-        }
+        return smoothed_proba / smoothed_proba.sum(axis=1, keepdims=True)
     
     def get_feature_importance(self) -> List[Dict]:
         """Get feature importance scores"""
@@ -160,22 +206,49 @@ class MatchOutcomePredictor:
             for name, score in zip(self.feature_names, importance)
         ]
     
-    def save_model(self, path: str):
-        """Save model and scaler"""
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        joblib.dump({
-            'model': self.model,
-            'scaler': self.scaler,
-            'feature_names': self.feature_names
-        }, path)
+    def _get_fast_predictor(self) -> FastBoosterPredictor:
+        """Build (once per fitted model) the float32 inplace_predict path"""
+        if self._fast is None:
+            fused = None
+            if self.fused_scaler:
+                fused = fuse_scaler_into_booster(self.model.get_booster(), self.scaler)
+            self._fast = FastBoosterPredictor(self.model, self.scaler, fused=fused)
+        return self._fast
+    
+    def save_model(self, path: str, version: Optional[str] = None):
+        """
+        Save model and scaler
+        
+        A .pkl path writes the legacy joblib pickle; any other path writes a
+        model bundle directory (see models.model_bundle).
+        """
+        if path.endswith('.pkl'):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            joblib.dump({
+                'model': self.model,
+                'scaler': self.scaler,
+                'feature_names': self.feature_names
+            }, path)
+        else:
+            manifest = save_bundle(path, self.model, self.scaler, self.feature_names, version)
+            self.model_version = manifest['model_version']
         print(f"✅ Model saved to {path}")
     
     def load_model(self, path: str):
-        """Load model and scaler"""
-        data = joblib.load(path)
-        self.model = data['model']
-        self.scaler = data['scaler']
-        self.feature_names = data['feature_names']
+        """Load model and scaler from a model bundle or a legacy .pkl"""
+        if is_bundle(path):
+            self.model, self.scaler, self.feature_names, manifest = load_bundle(path)
+            self.model_version = manifest['model_version']
+        else:
+            data = joblib.load(path)
+            self.model = data['model']
+            self.scaler = data['scaler']
+            self.feature_names = data['feature_names']
+            self.model_version = None
+        self._fast = None
+        if self.fast_inference:
+            # Build the fast path (and fuse thresholds if enabled) at load time
+            self._get_fast_predictor()
         print(f"✅ Model loaded from {path}")
 
 
@@ -185,9 +258,16 @@ class ExpectedGoalsPredictor:
     Separate models for home and away teams
     """
     
-    def __init__(self, model_path: Optional[str] = None):
+    def __init__(self, model_path: Optional[str] = None, fast_inference: Optional[bool] = None):
         self.model = None
         self.scaler = StandardScaler()
+        # Booster.inplace_predict on float32 buffers instead of the sklearn wrapper
+        self.fast_inference = _fast_inference_default() if fast_inference is None else fast_inference
+        # Fold the scaler into the tree thresholds so the fast path skips scaling
+        self.fused_scaler = _fused_scaler_default()
+        self._fast = None
+        # Manifest version of a loaded bundle (None for legacy pickles and fresh models)
+        self.model_version: Optional[str] = None
         # These are the first 12 features from the 18-feature training set
         self.feature_names = [
             'home_elo', 'away_elo', 'elo_diff',
@@ -224,6 +304,7 @@ class ExpectedGoalsPredictor:
     def train(self, X: np.ndarray, y: np.ndarray) -> Dict:
         """Train xG prediction model"""
         X_scaled = self.scaler.fit_transform(X)
+        self._fast = None
         self.model.fit(X_scaled, y)
         
         # Calculate metrics
@@ -244,8 +325,26 @@ class ExpectedGoalsPredictor:
             raise ValueError("Model not trained or loaded")
         
         X = self.prepare_features(match_data)
-        X_scaled = self.scaler.transform(X)
-        xg_raw = self.model.predict(X_scaled)[0]
+        return float(self.predict_batch(X)[0])
+    
+    def predict_batch(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict expected goals for many fixtures at once
+        
+        Args:
+            X: Feature matrix (n_matches, n_features) in feature_names order
+        
+        Returns:
+            np.ndarray: Smoothed and clamped xG per row
+        """
+        if self.model is None:
+            raise ValueError("Model not trained or loaded")
+        
+        if self.fast_inference:
+            xg_raw = self._get_fast_predictor().predict(X)
+        else:
+            X_scaled = self.scaler.transform(X)
+            xg_raw = self.model.predict(X_scaled)
         
         # Apply smoothing toward realistic mean (1.5 goals)
         # Mix prediction with baseline to avoid extremes
@@ -254,24 +353,51 @@ class ExpectedGoalsPredictor:
         xg_smoothed = alpha * xg_raw + (1 - alpha) * baseline_xg
         
         # Clamp to realistic range for Champions League
-        return float(max(0.5, min(3.5, xg_smoothed)))
+        return np.clip(xg_smoothed, 0.5, 3.5)
+    
+    def _get_fast_predictor(self) -> FastBoosterPredictor:
+        """Build (once per fitted model) the float32 inplace_predict path"""
+        if self._fast is None:
+            fused = None
+            if self.fused_scaler:
+                fused = fuse_scaler_into_booster(self.model.get_booster(), self.scaler)
+            self._fast = FastBoosterPredictor(self.model, self.scaler, fused=fused)
+        return self._fast
     
-    def save_model(self, path: str):
-        """Save model and scaler"""
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        joblib.dump({
-            'model': self.model,
-            'scaler': self.scaler,
-            'feature_names': self.feature_names
-        }, path)
+    def save_model(self, path: str, version: Optional[str] = None):
+        """
+        Save model and scaler
+        
+        A .pkl path writes the legacy joblib pickle; any other path writes a
+        model bundle directory (see models.model_bundle).
+        """
+        if path.endswith('.pkl'):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            joblib.dump({
+                'model': self.model,
+                'scaler': self.scaler,
+                'feature_names': self.feature_names
+            }, path)
+        else:
+            manifest = save_bundle(path, self.model, self.scaler, self.feature_names, version)
+            self.model_version = manifest['model_version']
         print(f"✅ xG Model saved to {path}")
     
     def load_model(self, path: str):
-        """Load model and scaler"""
-        data = joblib.load(path)
-        self.model = data['model']
-        self.scaler = data['scaler']
-        self.feature_names = data['feature_names']
+        """Load model and scaler from a model bundle or a legacy .pkl"""
+        if is_bundle(path):
+            self.model, self.scaler, self.feature_names, manifest = load_bundle(path)
+            self.model_version = manifest['model_version']
+        else:
+            data = joblib.load(path)
+            self.model = data['model']
+            self.scaler = data['scaler']
+            self.feature_names = data['feature_names']
+            self.model_version = None
+        self._fast = None
+        if self.fast_inference:
+            # Build the fast path (and fuse thresholds if enabled) at load time
+            self._get_fast_predictor()
         print(f"✅ xG Model loaded from {path}")
 
 
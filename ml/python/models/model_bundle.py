@@ -0,0 +1,250 @@
+"""
+Model Bundle Format
+Versioned on-disk format for a StandardScaler + XGBoost model pair:
+UBJSON booster, float64 scaler arrays that can be memory-mapped, and a
+manifest carrying the feature names, model version and checksums
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import xgboost as xgb
+from sklearn.preprocessing import StandardScaler
+
+BUNDLE_SUFFIX = '.bundle'
+BUNDLE_FORMAT = 'ucl-model-bundle'
+BUNDLE_FORMAT_VERSION = 1
+
+MANIFEST_FILE = 'manifest.json'
+BOOSTER_FILE = 'booster.ubj'
+MEAN_FILE = 'scaler_mean.npy'
+SCALE_FILE = 'scaler_scale.npy'
+
+_MODEL_CLASSES = {
+    'XGBClassifier': xgb.XGBClassifier,
+    'XGBRegressor': xgb.XGBRegressor
+}
+
+
+class BundleError(Exception):
+    """Raised for unreadable, incompatible or corrupted bundles"""
+
+
+def is_bundle(path: str) -> bool:
+    """True if path is a bundle directory (has a manifest)"""
+    return os.path.isfile(os.path.join(path, MANIFEST_FILE))
+
+
+def resolve_model_path(model_dir: str, stem: str) -> str:
+    """
+    Locate a model by name, preferring the bundle over a legacy pickle
+
+    Returns <stem>.bundle if it exists, otherwise <stem>.pkl (which may
+    not exist either; loading reports that).
+    """
+    bundle = os.path.join(model_dir, stem + BUNDLE_SUFFIX)
+    if is_bundle(bundle):
+        return bundle
+    return os.path.join(model_dir, stem + '.pkl')
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _bundle_checksum(files: Dict[str, Dict]) -> str:
+    """Checksum over the per-file checksums (order independent)"""
+    canonical = json.dumps(files, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def save_bundle(
+    path: str,
+    model,
+    scaler: StandardScaler,
+    feature_names: List[str],
+    version: Optional[str] = None
+) -> Dict:
+    """
+    Write a model bundle directory
+
+    The bundle is assembled in a temporary directory next to path and moved
+    into place at the end, so readers never see a half-written bundle.
+
+    Args:
+        path: Bundle directory (conventionally <name>.bundle)
+        model: Fitted xgb.XGBClassifier / xgb.XGBRegressor
+        scaler: Fitted StandardScaler
+        feature_names: Feature order the model was trained on
+        version: Model version label (default: UTC timestamp)
+
+    Returns:
+        The manifest dict
+    """
+    path = os.path.abspath(path)
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+
+    n_features = len(feature_names)
+    mean = getattr(scaler, 'mean_', None)
+    scale = getattr(scaler, 'scale_', None)
+    mean = np.zeros(n_features) if mean is None else mean
+    scale = np.ones(n_features) if scale is None else scale
+
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=parent)
+    try:
+        with open(os.path.join(staging, BOOSTER_FILE), 'wb') as f:
+            f.write(model.get_booster().save_raw('ubj'))
+        # Full precision: rounding mean/scale moves inputs that sit on split points
+        np.save(os.path.join(staging, MEAN_FILE), np.ascontiguousarray(mean, dtype=np.float64))
+        np.save(os.path.join(staging, SCALE_FILE), np.ascontiguousarray(scale, dtype=np.float64))
+
+        files = {
+            name: {
+                'sha256': _sha256(os.path.join(staging, name)),
+                'bytes': os.path.getsize(os.path.join(staging, name))
+            }
+            for name in (BOOSTER_FILE, MEAN_FILE, SCALE_FILE)
+        }
+        created = datetime.now(timezone.utc)
+        manifest = {
+            'format': BUNDLE_FORMAT,
+            'format_version': BUNDLE_FORMAT_VERSION,
+            'model_version': version or created.strftime('%Y%m%d%H%M%S'),
+            'created_at': created.isoformat(),
+            'model_class': type(model).__name__,
+            'xgboost_version': xgb.__version__,
+            'feature_names': list(feature_names),
+            'files': files,
+            'checksum': _bundle_checksum(files)
+        }
+        # Manifest last: a directory without one is never treated as a bundle
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        publish_bundle(staging, path)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    return manifest
+
+
+def publish_bundle(staged: str, path: str):
+    """
+    Move a finished bundle directory into place, replacing any bundle at path
+
+    staged must be on the same filesystem as path (e.g. a temporary
+    directory next to it). An existing bundle is renamed away first and
+    only deleted once the new one is in place.
+    """
+    path = os.path.abspath(path)
+    if os.path.exists(path):
+        retired = tempfile.mkdtemp(prefix='.retired-', dir=os.path.dirname(path))
+        os.replace(path, os.path.join(retired, 'bundle'))
+        os.replace(staged, path)
+        shutil.rmtree(retired, ignore_errors=True)
+    else:
+        os.replace(staged, path)
+
+
+def read_manifest(path: str) -> Dict:
+    """Read and sanity-check a bundle manifest"""
+    try:
+        with open(os.path.join(path, MANIFEST_FILE), 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise BundleError(f"Cannot read bundle manifest in {path}: {e}")
+
+    if manifest.get('format') != BUNDLE_FORMAT:
+        raise BundleError(f"{path} is not a model bundle")
+    if manifest.get('format_version', 0) > BUNDLE_FORMAT_VERSION:
+        raise BundleError(
+            f"{path} uses bundle format v{manifest['format_version']}, "
+            f"this build reads up to v{BUNDLE_FORMAT_VERSION}"
+        )
+    return manifest
+
+
+def verify_bundle(path: str, manifest: Optional[Dict] = None):
+    """
+    Check every file against the manifest checksums
+
+    Raises:
+        BundleError: A file is missing, truncated or modified
+    """
+    manifest = manifest or read_manifest(path)
+    files = manifest['files']
+    if _bundle_checksum(files) != manifest['checksum']:
+        raise BundleError(f"Manifest checksum mismatch in {path}")
+    for name, meta in files.items():
+        file_path = os.path.join(path, name)
+        if not os.path.isfile(file_path) or os.path.getsize(file_path) != meta['bytes']:
+            raise BundleError(f"{name} missing or truncated in {path}")
+        if _sha256(file_path) != meta['sha256']:
+            raise BundleError(f"Checksum mismatch for {name} in {path}")
+
+
+def load_bundle(
+    path: str,
+    verify: bool = True,
+    mmap: bool = True
+) -> Tuple[object, StandardScaler, List[str], Dict]:
+    """
+    Load a model bundle
+
+    Args:
+        path: Bundle directory
+        verify: Check file checksums before loading
+        mmap: Memory-map the scaler arrays (read-only, pages shared
+            between processes) instead of reading them into private memory
+
+    Returns:
+        (model, scaler, feature_names, manifest)
+    """
+    manifest = read_manifest(path)
+    if verify:
+        verify_bundle(path, manifest)
+
+    model_class = _MODEL_CLASSES.get(manifest['model_class'])
+    if model_class is None:
+        raise BundleError(f"Unsupported model class {manifest['model_class']} in {path}")
+    model = model_class()
+    model.load_model(os.path.join(path, BOOSTER_FILE))
+
+    mmap_mode = 'r' if mmap else None
+    mean = np.load(os.path.join(path, MEAN_FILE), mmap_mode=mmap_mode)
+    scale = np.load(os.path.join(path, SCALE_FILE), mmap_mode=mmap_mode)
+
+    # Rebuild a fitted StandardScaler around the stored arrays
+    scaler = StandardScaler()
+    scaler.mean_ = mean
+    scaler.scale_ = scale
+    scaler.var_ = np.square(scale, dtype=np.float64)
+    scaler.n_features_in_ = len(mean)
+    scaler.n_samples_seen_ = 0
+
+    return model, scaler, list(manifest['feature_names']), manifest
+
+
+__all__ = [
+    'BUNDLE_SUFFIX',
+    'BundleError',
+    'is_bundle',
+    'load_bundle',
+    'publish_bundle',
+    'read_manifest',
+    'resolve_model_path',
+    'save_bundle',
+    'verify_bundle'
+]
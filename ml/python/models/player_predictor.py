@@ -5,10 +5,15 @@ Predicts individual player statistics using XGBoost regressors
 
 import os
 import json
+import logging
 import xgboost as xgb
 import numpy as np
+from concurrent.futures import Executor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
+
+# Hot-path diagnostics go through logging so serve.py controls level and format
+logger = logging.getLogger('ucl_ml.player_predictor')
 
 
 class PlayerPerformancePredictor:
@@ -17,12 +22,13 @@ class PlayerPerformancePredictor:
     Uses separate models for each position type (FWD, MID, DEF, GK)
     """
     
-    def __init__(self, model_path: str = './models/trained/'):
+    def __init__(self, model_path: str = './models/trained/', executor: Optional[Executor] = None):
         """
         Initialize player performance predictor
         
         Args:
             model_path: Path to directory containing trained models
+            executor: Optional thread pool to load the model files in parallel
         """
         self.model_path = Path(model_path)
         self.models = {}
@@ -36,24 +42,31 @@ class PlayerPerformancePredictor:
             print(f"[PlayerPredictor] Loaded feature config: {config_path}")
         
         # Load all trained models
-        self._load_models()
+        self._load_models(executor)
     
-    def _load_models(self):
-        """Load all position-specific models"""
+    def _load_models(self, executor: Optional[Executor] = None):
+        """Load all position-specific models (in parallel when an executor is given)"""
         model_files = list(self.model_path.glob('player_*.json'))
         
-        for model_file in model_files:
-            try:
-                model_name = model_file.stem.replace('player_', '')
-                model = xgb.XGBRegressor()
-                model.load_model(str(model_file))
-                self.models[model_name] = model
-                print(f"[PlayerPredictor] Loaded model: {model_name}")
-            except Exception as e:
-                print(f"[PlayerPredictor] Failed to load {model_file.name}: {e}")
+        loaded = executor.map(self._load_one, model_files) if executor else map(self._load_one, model_files)
+        for model_file, model in zip(model_files, loaded):
+            if model is not None:
+                self.models[model_file.stem.replace('player_', '')] = model
         
         print(f"[PlayerPredictor] Total models loaded: {len(self.models)}")
     
+    @staticmethod
+    def _load_one(model_file: Path) -> Optional[xgb.XGBRegressor]:
+        """Load one booster file, or None if it cannot be read"""
+        try:
+            model = xgb.XGBRegressor()
+            model.load_model(str(model_file))
+            print(f"[PlayerPredictor] Loaded model: {model_file.stem.replace('player_', '')}")
+            return model
+        except Exception as e:
+            print(f"[PlayerPredictor] Failed to load {model_file.name}: {e}")
+            return None
+    
     def predict(self, position: str, features: Dict) -> Dict[str, float]:
         """
         Predict player performance statistics
@@ -65,47 +78,75 @@ class PlayerPerformancePredictor:
         Returns:
             Dictionary of predicted statistics
         """
-        position_lower = position.lower()
-        predictions = {}
+        return self.predict_batch([position], [features])[0]
+    
+    def predict_batch(self, positions: List[str], features_list: List[Dict]) -> List[Dict[str, float]]:
+        """
+        Predict performance statistics for many players at once
+        
+        Players are partitioned by position and each {position}_{target}
+        model is called once on the whole partition.
+        
+        Args:
+            positions: Player positions ('FWD', 'MID', 'DEF', 'GK'), one per player
+            features_list: Feature dicts, aligned with positions
+        
+        Returns:
+            List of predicted statistics dicts, in input order
+        """
+        predictions: List[Dict[str, float]] = [{} for _ in features_list]
         
-        # Convert features dict to numpy array in correct order
+        # Group row indices by position, keeping first-seen order
+        partitions: Dict[str, List[int]] = {}
+        for i, position in enumerate(positions):
+            partitions.setdefault(position, []).append(i)
+        
+        for position, rows in partitions.items():
+            position_lower = position.lower()
+            targets = self._get_targets(position)
+            X = self._build_matrix([features_list[i] for i in rows])
+            
+            # Predict each stat for the whole partition
+            for target in targets:
+                model_key = f'{position_lower}_{target}'
+                
+                if model_key in self.models:
+                    try:
+                        preds = self.models[model_key].predict(X)
+                        # Ensure non-negative predictions
+                        for i, pred in zip(rows, preds):
+                            predictions[i][target] = max(0.0, float(pred))
+                    except Exception as e:
+                        logger.error("Error predicting %s: %s", model_key, e)
+                        for i in rows:
+                            predictions[i][target] = 0.0
+                else:
+                    # Model not found, use simple heuristic
+                    for i in rows:
+                        predictions[i][target] = self._fallback_prediction(position, target, features_list[i])
+        
+        return predictions
+    
+    def _build_matrix(self, features_list: List[Dict]) -> np.ndarray:
+        """Convert feature dicts to a (n_players, n_features) array in model order"""
         if self.feature_config:
             feature_names = self.feature_config['feature_names']
-            X = np.array([[features.get(fname, 0) for fname in feature_names]])
-        else:
-            # Fallback: use features in dict order
-            X = np.array([list(features.values())])
-        
-        # Get target stats for this position
+            return np.array([[features.get(fname, 0) for fname in feature_names] for features in features_list])
+        # Fallback: use features in dict order
+        return np.array([list(features.values()) for features in features_list])
+    
+    def _get_targets(self, position: str) -> List[str]:
+        """Get target stats for a position"""
         if position == 'FWD':
-            targets = self.feature_config.get('forward_targets', ['goals', 'shots', 'assists', 'key_passes'])
+            return self.feature_config.get('forward_targets', ['goals', 'shots', 'assists', 'key_passes'])
         elif position == 'MID':
-            targets = self.feature_config.get('midfielder_targets', ['assists', 'key_passes', 'goals', 'tackles', 'interceptions'])
+            return self.feature_config.get('midfielder_targets', ['assists', 'key_passes', 'goals', 'tackles', 'interceptions'])
         elif position == 'DEF':
-            targets = self.feature_config.get('defender_targets', ['tackles', 'interceptions', 'clearances', 'blocks'])
+            return self.feature_config.get('defender_targets', ['tackles', 'interceptions', 'clearances', 'blocks'])
         elif position == 'GK':
-            targets = self.feature_config.get('goalkeeper_targets', ['saves', 'goals_conceded', 'clean_sheet'])
-        else:
-            print(f"[PlayerPredictor] Warning: Unknown position {position}, defaulting to MID")
-            targets = ['assists', 'key_passes', 'goals']
-        
-        # Predict each stat
-        for target in targets:
-            model_key = f'{position_lower}_{target}'
-            
-            if model_key in self.models:
-                try:
-                    pred = self.models[model_key].predict(X)[0]
-                    # Ensure non-negative predictions
-                    predictions[target] = max(0.0, float(pred))
-                except Exception as e:
-                    print(f"[PlayerPredictor] Error predicting {model_key}: {e}")
-                    predictions[target] = 0.0
-            else:
-                # Model not found, use simple heuristic
-                predictions[target] = self._fallback_prediction(position, target, features)
-        
-        return predictions
+            return self.feature_config.get('goalkeeper_targets', ['saves', 'goals_conceded', 'clean_sheet'])
+        logger.warning("Unknown position %s, defaulting to MID", position)
+        return ['assists', 'key_passes', 'goals']
     
     def _fallback_prediction(self, position: str, stat: str, features: Dict) -> float:
         """
@@ -0,0 +1,182 @@
+"""
+Scaler Fusion for Tree Models
+Rewrites XGBoost split thresholds into raw feature space so a
+StandardScaler in front of the booster can be dropped at inference time
+"""
+
+import json
+import xgboost as xgb
+import numpy as np
+from typing import Dict, Optional
+
+
+def _scaled_value(x: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """What the booster sees for raw value x on the unfused path (float64 scaling, float32 cast)"""
+    return ((x.astype(np.float64) - mean) / scale).astype(np.float32)
+
+
+def _round_up_float32(x: np.ndarray) -> np.ndarray:
+    """Smallest float32 value >= x (elementwise)"""
+    y = x.astype(np.float32)
+    return np.where(y.astype(np.float64) < x, np.nextafter(y, np.float32(np.inf)), y)
+
+
+def _raw_thresholds(thresholds: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """
+    Map scaled split thresholds back into raw feature space
+
+    XGBoost sends a float32 feature value x left when x < threshold. The
+    fused threshold c for a scaled split t is therefore the smallest float32
+    x with scaled(x) >= t. The scaled value is computed in float64 and cast
+    to float32, as the unfused path does. Bisection in float64 finds the
+    exact boundary b (the smallest float64 x with scaled(x) >= t), and c is
+    b rounded up to float32. scaled() is monotone, so c and the float32
+    value just below it fall on the same sides as they do unfused, and so
+    does every other float32 input, including integer features sitting
+    exactly on a cut point.
+    """
+    t = thresholds.astype(np.float32)
+    estimate = t.astype(np.float64) * scale + mean
+
+    # Bracket the boundary: scaled(lo) < t <= scaled(hi)
+    width = (np.abs(estimate) + np.abs(scale) * (np.abs(t) + 1.0)) * 1e-6
+    lo = estimate - width
+    hi = estimate + width
+    while True:
+        bad_lo = _scaled_value(lo, mean, scale) >= t
+        bad_hi = _scaled_value(hi, mean, scale) < t
+        if not (bad_lo.any() or bad_hi.any()):
+            break
+        width = width * 2
+        lo = np.where(bad_lo, estimate - width, lo)
+        hi = np.where(bad_hi, estimate + width, hi)
+
+    # Bisect in float64 until lo and hi are adjacent
+    for _ in range(200):
+        mid = lo + (hi - lo) / 2
+        done = (mid <= lo) | (mid >= hi)
+        if done.all():
+            break
+        right = _scaled_value(mid, mean, scale) >= t
+        hi = np.where(~done & right, mid, hi)
+        lo = np.where(~done & ~right, mid, lo)
+
+    raw = _round_up_float32(hi)
+
+    # Both float32 neighbours of the threshold must keep their unfused branch
+    below = np.nextafter(raw, np.float32(-np.inf))
+    if (_scaled_value(raw, mean, scale) < t).any() or (_scaled_value(below, mean, scale) >= t).any():
+        raise ArithmeticError("No float32 threshold reproduces the scaled split")
+    return raw
+
+
+def _get_trees(model_json: Dict):
+    """Locate the tree list in a saved XGBoost JSON model (gbtree or dart)"""
+    booster = model_json['learner']['gradient_booster']
+    if 'gbtree' in booster:
+        booster = booster['gbtree']
+    return booster['model']['trees']
+
+
+def fuse_scaler_into_booster(booster: xgb.Booster, scaler) -> xgb.Booster:
+    """
+    Return a copy of booster whose splits operate on unscaled features
+
+    Args:
+        booster: Booster trained on StandardScaler output
+        scaler: The fitted StandardScaler
+
+    Returns:
+        New booster that takes raw features directly
+    """
+    n_features = booster.num_features()
+    mean = getattr(scaler, 'mean_', None)
+    scale = getattr(scaler, 'scale_', None)
+    mean = np.zeros(n_features) if mean is None else np.asarray(mean, dtype=np.float64)
+    scale = np.ones(n_features) if scale is None else np.asarray(scale, dtype=np.float64)
+
+    model_json = json.loads(booster.save_raw('json'))
+
+    for tree in _get_trees(model_json):
+        if any(tree.get('split_type', [])):
+            raise ValueError("Scaler fusion does not support categorical splits")
+
+        # Leaves store their value in split_conditions; only rewrite internal nodes
+        left = np.asarray(tree['left_children'])
+        nodes = np.flatnonzero(left != -1)
+        if len(nodes) == 0:
+            continue
+
+        features = np.asarray(tree['split_indices'])[nodes]
+        conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+        conditions[nodes] = _raw_thresholds(conditions[nodes], mean[features], scale[features])
+        tree['split_conditions'] = [float(c) for c in conditions]
+
+    fused = xgb.Booster()
+    fused.load_model(bytearray(json.dumps(model_json).encode('utf-8')))
+    return fused
+
+
+def verify_fused_predictions(
+    model,
+    scaler,
+    fused: xgb.Booster,
+    X: np.ndarray,
+    iteration_range=(0, 0),
+    tolerance: float = 1e-6
+) -> Dict:
+    """
+    Compare fused and unfused predictions on a sample set
+
+    The sample is rounded to float32 first: the fast path only hands
+    float32-exact batches to the fused booster and scales everything else.
+    On such inputs fused thresholds reproduce every split exactly, so any
+    difference points at the fusion itself. Training rows are the most
+    representative sample.
+
+    Args:
+        model: Fitted sklearn-wrapper model (unfused)
+        scaler: Fitted StandardScaler
+        fused: Booster returned by fuse_scaler_into_booster
+        X: Raw feature sample (n_samples, n_features)
+        iteration_range: Tree range used for prediction
+        tolerance: Maximum allowed absolute difference
+
+    Returns:
+        dict: max_abs_diff, n_mismatched, n_samples, tolerance, passed
+    """
+    X = np.asarray(X, dtype=np.float32)
+    unfused = model.get_booster().inplace_predict(
+        scaler.transform(X.astype(np.float64)), iteration_range=iteration_range
+    )
+    fused_pred = fused.inplace_predict(X, iteration_range=iteration_range)
+    diff = np.abs(np.asarray(unfused) - np.asarray(fused_pred)).reshape(len(X), -1)
+    max_diff = float(diff.max())
+
+    return {
+        'max_abs_diff': max_diff,
+        'n_mismatched': int(np.sum(diff.max(axis=1) > tolerance)),
+        'n_samples': int(len(X)),
+        'tolerance': tolerance,
+        'passed': max_diff <= tolerance
+    }
+
+
+def sample_from_scaler(scaler, n_samples: int = 10000, seed: Optional[int] = 42) -> np.ndarray:
+    """Draw a verification sample around the training distribution recorded in the scaler"""
+    rng = np.random.default_rng(seed)
+    mean = np.asarray(scaler.mean_)
+    scale = np.asarray(scaler.scale_)
+    X = rng.normal(size=(n_samples, len(mean))) * scale * 1.5 + mean
+    # Served features carry at most two decimals (ratings, averages); counts and
+    # tiers are integers and sit exactly on typical split points
+    X[: n_samples // 2] = np.round(X[: n_samples // 2])
+    X[n_samples // 2:] = np.round(X[n_samples // 2:], 2)
+    return X
+
+
+__all__ = [
+    'fuse_scaler_into_booster',
+    'verify_fused_predictions',
+    'sample_from_scaler'
+]
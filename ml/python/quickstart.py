@@ -36,7 +36,7 @@ def train_all_models(n_samples=1000):
     print("\n📊 Step 1/2: Training Match Outcome Model...")
     match_model, match_metrics = train_match_outcome_model(
         n_samples=n_samples,
-        save_path='models/trained/match_outcome_model.pkl'
+        save_path='models/trained/match_outcome_model.bundle'
     )
     print(f"✅ Match model trained - Accuracy: {match_metrics['val_accuracy']:.2%}")
     
@@ -44,8 +44,8 @@ def train_all_models(n_samples=1000):
     print("\n📊 Step 2/2: Training Expected Goals Models...")
     xg_home, xg_away, metrics_home, metrics_away = train_xg_models(
         n_samples=n_samples,
-        save_path_home='models/trained/xg_home_model.pkl',
-        save_path_away='models/trained/xg_away_model.pkl'
+        save_path_home='models/trained/xg_home_model.bundle',
+        save_path_away='models/trained/xg_away_model.bundle'
     )
     print(f"✅ xG models trained - Home RMSE: {metrics_home['rmse']:.4f}, Away RMSE: {metrics_away['rmse']:.4f}")
     
@@ -53,20 +53,21 @@ def train_all_models(n_samples=1000):
     print("✅ ALL MODELS TRAINED SUCCESSFULLY!")
     print("="*60)
     print(f"\n📁 Models saved to: models/trained/")
-    print(f"   - match_outcome_model.pkl")
-    print(f"   - xg_home_model.pkl")
-    print(f"   - xg_away_model.pkl")
+    print(f"   - match_outcome_model.bundle")
+    print(f"   - xg_home_model.bundle")
+    print(f"   - xg_away_model.bundle")
     
 
 def start_server(host="127.0.0.1", port=8000):
     """Start FastAPI ML server"""
     import uvicorn
     
-    # Check if models exist
+    from models.model_bundle import resolve_model_path
+    
+    # Check if models exist (bundles, or legacy .pkl files)
     required_models = [
-        'models/trained/match_outcome_model.pkl',
-        'models/trained/xg_home_model.pkl',
-        'models/trained/xg_away_model.pkl'
+        resolve_model_path('models/trained', name)
+        for name in ('match_outcome_model', 'xg_home_model', 'xg_away_model')
     ]
     
     missing_models = [m for m in required_models if not os.path.exists(m)]
@@ -3,25 +3,65 @@ FastAPI ML Server for UCL Match Predictions
 Serves XGBoost models and SHAP explanations
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
+from contextlib import asynccontextmanager
+import asyncio
+import hmac
+import logging
+import numpy as np
 import os
 import sys
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from models.match_predictor import MatchOutcomePredictor, ExpectedGoalsPredictor
-from models.player_predictor import PlayerPerformancePredictor
-from explainability.explainer import MatchExplainer
+from explainability.global_importance import CachedPayload
+from utils.elo_store import create_elo_store
+from utils.feature_matrix import build_match_matrix, model_columns
+from utils.feature_store import create_feature_store
+from utils.inference_executor import ExecutorSaturated, create_inference_executor
+from utils.micro_batcher import create_micro_batcher
+from utils.model_registry import (
+    ModelReloadError, ModelSet, ReloadInProgress, create_model_registry, warm_model_set
+)
+from utils.prediction_cache import create_prediction_cache
+from utils.structured_logging import (
+    configure_logging, get_sampled_logger, new_request_id, request_id_var
+)
+
+# Structured logging (LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE_RATE)
+configure_logging()
+log = get_sampled_logger('serve')
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start loading models in the background so liveness answers immediately"""
+    loader = None
+    if not models_ready.is_set():  # already loaded when forked from serve_prefork.py
+        loader = asyncio.get_running_loop().run_in_executor(None, _load_models)
+    registry.watch()
+    prediction_cache.watch()
+    if feature_store is not None:
+        feature_store.watch()
+    yield
+    registry.stop()
+    prediction_cache.stop()
+    if feature_store is not None:
+        feature_store.stop()
+    inference.shutdown(wait=False)
+    if loader is not None and not loader.done():
+        loader.cancel()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="UCL ML Prediction API",
     description="Machine Learning API for UEFA Champions League Match Predictions",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -33,21 +73,100 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load models at startup
+# Endpoints that need resident models; everything else (health, docs, stats) is always served
+MODEL_ROUTE_PREFIXES = ('/predict', '/explain', '/features')
+
+@app.middleware("http")
+async def readiness_gate(request: Request, call_next):
+    """Answer 503 on model endpoints until startup loading has finished"""
+    if not models_ready.is_set() and request.url.path.startswith(MODEL_ROUTE_PREFIXES):
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Models are still loading"},
+            headers={"Retry-After": "5"}
+        )
+    return await call_next(request)
+
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    """Tag each request with an ID (from X-Request-ID or generated) for log correlation"""
+    request_id = request.headers.get('x-request-id') or new_request_id()
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers['X-Request-ID'] = request_id
+    return response
+
+# Models are loaded by _load_models() during the lifespan startup and can be
+# replaced at runtime by POST /admin/reload or the MODEL_WATCH_INTERVAL watcher
 MODEL_PATH = os.getenv('MODEL_PATH', './models/trained/')
-outcome_model = MatchOutcomePredictor(
-    model_path=os.path.join(MODEL_PATH, 'match_outcome_model.pkl')
-)
-xg_model_home = ExpectedGoalsPredictor(
-    model_path=os.path.join(MODEL_PATH, 'xg_home_model.pkl')
-)
-xg_model_away = ExpectedGoalsPredictor(
-    model_path=os.path.join(MODEL_PATH, 'xg_away_model.pkl')
-)
-explainer = MatchExplainer(outcome_model)
+registry = create_model_registry(MODEL_PATH)
+
+# Readiness: set once every model needed for prediction is resident
+models_ready = registry.ready
+
+# Shared secret for /admin endpoints (unset disables them)
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+# Every model-backed response names the model version that produced it
+MODEL_VERSION_HEADER = 'X-Model-Version'
+
+def _load_models():
+    """Initial load: publish whatever loaded, leaving the TreeExplainer to the first explain request"""
+    try:
+        registry.reload(warm=False)
+    except Exception:
+        log.logger.exception("model loading failed")
+
+def preload_models() -> bool:
+    """
+    Load every model in the calling process without running it
+    
+    Used by the pre-fork server before forking workers, so the boosters,
+    scalers and fast-inference paths are allocated once in the parent and
+    shared copy-on-write by the workers. Nothing is predicted here: XGBoost
+    and SHAP start an OpenMP thread pool on their first prediction, and
+    libgomp does not survive fork(). Each worker calls warm_models() after
+    the fork instead.
+    
+    Returns:
+        True if all models are ready
+    """
+    try:
+        registry.reload(warm=False)
+    except Exception:
+        log.logger.exception("model loading failed")
+    return registry.current.ready
+
+def warm_models():
+    """Warm the current model set in this process (pre-fork workers, after the fork)"""
+    model_set = registry.current
+    if not model_set.ready:
+        return
+    try:
+        warm_model_set(model_set)
+    except Exception:
+        log.logger.exception("model warm-up failed")
+
+# Match predictions keyed on model version + feature vector; invalidated when MODEL_PATH changes
+prediction_cache = create_prediction_cache(MODEL_PATH)
+
+# Browser/proxy cache lifetime for global importance responses
+IMPORTANCE_CACHE_CONTROL = f"public, max-age={int(os.getenv('IMPORTANCE_MAX_AGE', '3600'))}"
 
-# Load player prediction models
-player_predictor = PlayerPerformancePredictor(model_path=MODEL_PATH)
+# Model calls run on a bounded thread pool so the event loop stays responsive
+inference = create_inference_executor()
+
+# Team ratings with history for point-in-time lookups (ELO_SNAPSHOT_PATH)
+elo_store = create_elo_store()
+
+# Team state for /predict/fixture, fed from finished results (FEATURE_RESULTS_PATH)
+feature_store = create_feature_store()
+
+# Upper bound on fixtures/players accepted by a single batch request
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', '1000'))
 
 # Pydantic models for request/response
 class MatchFeatures(BaseModel):
@@ -88,16 +207,59 @@ class MatchPredictionResponse(BaseModel):
     home_xg: float
     away_xg: float
     confidence: float
+    model_version: Optional[str] = None
+
+class FixturePredictionRequest(BaseModel):
+    home_team: str = Field(..., description="Home team name")
+    away_team: str = Field(..., description="Away team name")
+    date: Optional[str] = Field(None, description="Kick-off date (ISO); defaults to now")
+    stage: str = Field("", description="Competition stage, e.g. 'Round of 16'")
+    venue: str = Field("", description="Stadium name")
+
+class FixturePredictionResponse(MatchPredictionResponse):
+    features: MatchFeatures
+
+class MatchBatchRequest(BaseModel):
+    # Items are validated one by one so a malformed fixture only fails its own slot
+    matches: List[Dict[str, Any]] = Field(..., description="Fixtures in /predict/match request format")
+
+class MatchBatchItem(BaseModel):
+    index: int
+    home_team: Optional[str] = None
+    away_team: Optional[str] = None
+    prediction: Optional[MatchPredictionResponse] = None
+    error: Optional[str] = None
+
+class MatchBatchResponse(BaseModel):
+    results: List[MatchBatchItem]
+
+class FeatureImportance(BaseModel):
+    feature: str
+    importance: float
 
 class ExplanationResponse(BaseModel):
     prediction: MatchPredictionResponse
-    feature_importance: List[Dict[str, float]]
+    feature_importance: List[FeatureImportance]
     shap_values: Dict[str, float]
     top_factors: Dict[str, List[Dict]]
 
-class FeatureImportance(BaseModel):
-    feature: str
-    importance: float
+class ExplanationBatchRequest(BaseModel):
+    # Items are validated one by one so a malformed fixture only fails its own slot
+    matches: List[Dict[str, Any]] = Field(..., description="Fixtures in /explain/match request format")
+    top_k: int = Field(5, ge=1, le=23, description="Top positive/negative factors per fixture")
+
+class ExplanationBatchItem(BaseModel):
+    index: int
+    home_team: Optional[str] = None
+    away_team: Optional[str] = None
+    prediction: Optional[MatchPredictionResponse] = None
+    predicted_outcome: Optional[str] = None
+    shap_values: Optional[Dict[str, float]] = None
+    top_factors: Optional[Dict[str, List[Dict]]] = None
+    error: Optional[str] = None
+
+class ExplanationBatchResponse(BaseModel):
+    results: List[ExplanationBatchItem]
 
 class PlayerFeatures(BaseModel):
     overall_rating: float
@@ -134,11 +296,42 @@ class PlayerPredictionResponse(BaseModel):
     position: str
     predictions: Dict[str, float]  # stat_name -> expected_value
     confidence: float
+    model_version: Optional[str] = None
+
+class PlayerBatchRequest(BaseModel):
+    # Items are validated one by one so a malformed player only fails its own slot
+    players: List[Dict[str, Any]] = Field(..., description="Players in /predict/player request format")
+
+class PlayerBatchItem(BaseModel):
+    index: int
+    player_name: Optional[str] = None
+    position: Optional[str] = None
+    prediction: Optional[PlayerPredictionResponse] = None
+    error: Optional[str] = None
+
+class PlayerBatchResponse(BaseModel):
+    results: List[PlayerBatchItem]
+
+class EloRatingResponse(BaseModel):
+    team: str
+    rating: float
+    as_of: Optional[str] = None
+    matches_played: int
 
 class HealthResponse(BaseModel):
     status: str
     models_loaded: Dict[str, bool]
     version: str
+    model_version: Optional[str] = None
+
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    """Backpressure: reject work the inference pool cannot queue"""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
 @app.get("/", response_model=Dict[str, str])
 async def root():
@@ -151,207 +344,530 @@ async def root():
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint ('healthy' once models are loaded, 'loading' before)"""
     return HealthResponse(
-        status="healthy",
-        models_loaded={
-            "match_outcome": outcome_model.model is not None,
-            "xg_home": xg_model_home.model is not None,
-            "xg_away": xg_model_away.model is not None,
-            "player_predictor": player_predictor is not None
-        },
-        version="1.0.0"
+        status="healthy" if models_ready.is_set() else "loading",
+        models_loaded=dict(registry.current.status),
+        version="1.0.0",
+        model_version=registry.current.version
     )
 
+@app.get("/health/live", response_model=Dict[str, str])
+async def liveness():
+    """Liveness: the process is up and the event loop is responsive"""
+    return {"status": "alive"}
+
+@app.get("/health/ready", response_model=HealthResponse)
+async def readiness():
+    """Readiness: 200 only when every model needed for prediction is resident"""
+    response = HealthResponse(
+        status="ready" if models_ready.is_set() else "loading",
+        models_loaded=dict(registry.current.status),
+        version="1.0.0",
+        model_version=registry.current.version
+    )
+    if not models_ready.is_set():
+        return JSONResponse(status_code=503, content=response.dict())
+    return response
+
+@app.get("/cache/stats", response_model=Dict[str, Any])
+async def cache_stats():
+    """Prediction cache hit/miss counters"""
+    return prediction_cache.stats()
+
+@app.get("/inference/stats", response_model=Dict[str, Any])
+async def inference_stats():
+    """Inference pool load plus micro-batch size and queueing delay metrics"""
+    return {
+        **inference.stats(),
+        'micro_batching': {
+            'match': match_batcher.stats(),
+            'player': player_batcher.stats()
+        }
+    }
+
+@app.get("/feature-store/stats", response_model=Dict[str, Any])
+async def feature_store_stats():
+    """Results and teams held by the fixture feature store"""
+    if feature_store is None:
+        raise HTTPException(status_code=404, detail="Feature store not available (set FEATURE_RESULTS_PATH)")
+    return feature_store.stats()
+
+@app.get("/models", response_model=Dict[str, Any])
+async def model_info():
+    """Model version being served, when it was loaded, and reload counters"""
+    return registry.stats()
+
+def _check_admin_token(token: Optional[str]):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (set ADMIN_TOKEN)")
+    if not token or not hmac.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.post("/admin/reload", response_model=Dict[str, Any])
+async def reload_models(x_admin_token: Optional[str] = Header(None)):
+    """
+    Load the models in MODEL_PATH again, warm them and swap them in
+
+    Requests already running finish on the previous models. If anything
+    fails to load the previous version keeps serving. Only reloads the
+    worker process that receives the call.
+    """
+    _check_admin_token(x_admin_token)
+    previous = registry.current.version
+    try:
+        models = await asyncio.get_running_loop().run_in_executor(None, registry.reload)
+    except ReloadInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ModelReloadError as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {str(e)}")
+
+    return {
+        'previous_version': previous,
+        **models.info()
+    }
+
 @app.post("/predict/match", response_model=MatchPredictionResponse)
-async def predict_match(request: MatchPredictionRequest):
+async def predict_match(request: MatchPredictionRequest, response: Response):
     """
     Predict match outcome probabilities and expected goals
     """
     try:
-        print(f"\n[ML Server] Received prediction request:")
-        print(f"  Home: {request.home_team}")
-        print(f"  Away: {request.away_team}")
-        print(f"  Features: {request.features.dict()}")
-        
-        # Get match outcome probabilities
-        features_dict = request.features.dict()
-        outcome_probs = outcome_model.predict_proba(features_dict)
+        X = build_match_matrix([request.features])
+        prediction = await _predict_row(X[0], registry.current)
         
-        print(f"[ML Server] Outcome probabilities: {outcome_probs}")
-        
-        # Predict expected goals for home and away
-        # xG models use first 12 features: elo ratings, form, goals, xG, and H2H stats
-        home_xg_features = {
-            'home_elo': features_dict['home_elo'],
-            'away_elo': features_dict['away_elo'],
-            'elo_diff': features_dict['elo_diff'],
-            'home_form_last5': features_dict['home_form_last5'],
-            'away_form_last5': features_dict['away_form_last5'],
-            'home_goals_last5': features_dict['home_goals_last5'],
-            'away_goals_last5': features_dict['away_goals_last5'],
-            'home_xg_last5': features_dict['home_xg_last5'],
-            'away_xg_last5': features_dict['away_xg_last5'],
-            'h2h_home_wins': features_dict['h2h_home_wins'],
-            'h2h_draws': features_dict['h2h_draws'],
-            'h2h_away_wins': features_dict['h2h_away_wins']
-        }
-        
-        away_xg_features = {
-            'home_elo': features_dict['home_elo'],
-            'away_elo': features_dict['away_elo'],
-            'elo_diff': features_dict['elo_diff'],
-            'home_form_last5': features_dict['home_form_last5'],
-            'away_form_last5': features_dict['away_form_last5'],
-            'home_goals_last5': features_dict['home_goals_last5'],
-            'away_goals_last5': features_dict['away_goals_last5'],
-            'home_xg_last5': features_dict['home_xg_last5'],
-            'away_xg_last5': features_dict['away_xg_last5'],
-            'h2h_home_wins': features_dict['h2h_home_wins'],
-            'h2h_draws': features_dict['h2h_draws'],
-            'h2h_away_wins': features_dict['h2h_away_wins']
-        }
-        
-        home_xg = xg_model_home.predict(home_xg_features)
-        away_xg = xg_model_away.predict(away_xg_features)
-        
-        print(f"[ML Server] xG predictions - Home: {home_xg}, Away: {away_xg}")
-        
-        response = MatchPredictionResponse(
-            home_win_prob=outcome_probs['home_win_prob'],
-            draw_prob=outcome_probs['draw_prob'],
-            away_win_prob=outcome_probs['away_win_prob'],
-            home_xg=home_xg,
-            away_xg=away_xg,
-            confidence=outcome_probs['confidence']
+        if log.enabled(logging.DEBUG):
+            log.log(
+                logging.DEBUG, "match prediction",
+                home_team=request.home_team,
+                away_team=request.away_team,
+                features=request.features.dict(),
+                prediction=prediction.dict()
+            )
+        return _tag_version(response, prediction)
+    
+    except ExecutorSaturated:
+        raise
+    except Exception as e:
+        log.logger.exception("match prediction failed")
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+@app.post("/predict/fixture", response_model=FixturePredictionResponse)
+async def predict_fixture(request: FixturePredictionRequest, response: Response):
+    """
+    Predict a fixture from team names, resolving all 23 features on the server
+    """
+    if feature_store is None:
+        raise HTTPException(status_code=404, detail="Feature store not available (set FEATURE_RESULTS_PATH)")
+    try:
+        features = feature_store.fixture_features(
+            request.home_team, request.away_team,
+            date=request.date, stage=request.stage, venue=request.venue
         )
-        
-        print(f"[ML Server] ✅ Sending response: {response}")
-        return response
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid date: {str(e)}")
     
+    try:
+        X = build_match_matrix([features])
+        prediction = await _predict_row(X[0], registry.current)
+        return _tag_version(response, FixturePredictionResponse(
+            **prediction.dict(),
+            features=MatchFeatures(**features)
+        ))
+    
+    except ExecutorSaturated:
+        raise
     except Exception as e:
-        print(f"[ML Server] ❌ Error during prediction: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.logger.exception("fixture prediction failed")
         raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
 
+async def _predict_row(x: np.ndarray, models: ModelSet) -> MatchPredictionResponse:
+    """One canonical feature row: cached prediction, or a slot in the next micro-batch"""
+    namespace = _cache_namespace(models)
+    cached = await _cache_io(prediction_cache.get, namespace, x)
+    if cached is not None:
+        return MatchPredictionResponse(**cached)
+    
+    # Concurrent single-fixture requests are coalesced into one model call
+    prediction = await match_batcher.submit((models, x))
+    await _cache_io(prediction_cache.set, namespace, x, prediction.dict())
+    return prediction
+
+def _cache_namespace(models: ModelSet) -> str:
+    """Cached predictions are only reused by requests served by the same model version"""
+    return f"match:{models.version}"
+
+async def _cache_io(fn, *args):
+    """Run a cache call; calls that reach the shared sqlite file go to a thread, off the event loop"""
+    if prediction_cache.backend is None:
+        return fn(*args)
+    return await asyncio.to_thread(fn, *args)
+
+def _tag_version(response: Response, result, version: Optional[str] = None):
+    """Set the model version header from the result (or an explicit version)"""
+    version = version or getattr(result, 'model_version', None)
+    if version:
+        response.headers[MODEL_VERSION_HEADER] = version
+    return result
+
+def _score_matrix(X, models: ModelSet) -> List[MatchPredictionResponse]:
+    """
+    Run the outcome model and both xG models once over a canonical match matrix
+    
+    Each model reads its own columns as a view of X (the xG models use the
+    first 12 features: elo ratings, form, goals, xG, and H2H stats).
+    """
+    outcome, xg_home, xg_away = models.outcome_model, models.xg_home, models.xg_away
+    outcome_probs = outcome.predict_proba_batch(model_columns(X, outcome.feature_names))
+    home_xg = xg_home.predict_batch(model_columns(X, xg_home.feature_names))
+    away_xg = xg_away.predict_batch(model_columns(X, xg_away.feature_names))
+    
+    return [
+        MatchPredictionResponse(
+            home_win_prob=probs['home_win_prob'],
+            draw_prob=probs['draw_prob'],
+            away_win_prob=probs['away_win_prob'],
+            home_xg=float(h_xg),
+            away_xg=float(a_xg),
+            confidence=probs['confidence'],
+            model_version=models.version
+        )
+        for probs, h_xg, a_xg in zip(outcome_probs, home_xg, away_xg)
+    ]
+
+@app.post("/predict/matches", response_model=MatchBatchResponse)
+async def predict_matches(request: MatchBatchRequest, response: Response):
+    """
+    Predict outcome probabilities and expected goals for many fixtures in one call
+    
+    Results are returned in request order. A fixture that fails validation or
+    scoring carries an error message instead of a prediction.
+    """
+    if len(request.matches) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.matches)} fixtures (max {MAX_BATCH_SIZE})"
+        )
+    
+    results = [MatchBatchItem(index=i) for i in range(len(request.matches))]
+    valid = []
+    
+    for i, raw in enumerate(request.matches):
+        results[i].home_team = raw.get('home_team')
+        results[i].away_team = raw.get('away_team')
+        try:
+            valid.append((i, MatchPredictionRequest(**raw).features))
+        except Exception as e:
+            results[i].error = f"Invalid fixture: {str(e)}"
+    
+    models = registry.current
+    _tag_version(response, None, models.version)
+    if not valid:
+        return MatchBatchResponse(results=results)
+    
+    # One float64 matrix for the whole batch; row j belongs to fixture valid[j]
+    X = build_match_matrix([features for _, features in valid])
+    namespace = _cache_namespace(models)
+    
+    # Serve repeated fixtures from the cache and score only the misses
+    misses = []
+    for j, cached in enumerate(await _cache_io(prediction_cache.get_many, namespace, X)):
+        if cached is not None:
+            results[valid[j][0]].prediction = MatchPredictionResponse(**cached)
+        else:
+            misses.append(j)
+    
+    if not misses:
+        return MatchBatchResponse(results=results)
+    
+    scored = await inference.run(_score_rows, X[misses], models)
+    fresh, values = [], []
+    for j, prediction in zip(misses, scored):
+        i = valid[j][0]
+        if isinstance(prediction, Exception):
+            results[i].error = f"Prediction error: {str(prediction)}"
+        else:
+            results[i].prediction = prediction
+            fresh.append(j)
+            values.append(prediction.dict())
+    await _cache_io(prediction_cache.set_many, namespace, X[fresh], values)
+    
+    return MatchBatchResponse(results=results)
+
+def _score_rows(X, models: ModelSet) -> List[Union[MatchPredictionResponse, Exception]]:
+    """_score_matrix, falling back to row-by-row scoring to isolate failing rows"""
+    try:
+        return _score_matrix(X, models)
+    except Exception:
+        # Vectorized pass failed - score row by row to isolate the bad fixtures
+        log.logger.warning("batch match scoring failed, retrying row by row", exc_info=True)
+    
+    scored = []
+    for j in range(len(X)):
+        try:
+            scored.append(_score_matrix(X[j:j + 1], models)[0])
+        except Exception as e:
+            scored.append(e)
+    return scored
+
+def _by_model_set(items: List[tuple]) -> List[Tuple[ModelSet, List[int]]]:
+    """Group micro-batch items by the model set their request started on (normally one)"""
+    groups: Dict[int, Tuple[ModelSet, List[int]]] = {}
+    for k, item in enumerate(items):
+        groups.setdefault(id(item[0]), (item[0], []))[1].append(k)
+    return list(groups.values())
+
+def _score_match_rows(items: List[Tuple[ModelSet, np.ndarray]]) -> List[Union[MatchPredictionResponse, Exception]]:
+    """Micro-batch handler: score single-fixture feature rows collected from concurrent requests"""
+    results: List[Union[MatchPredictionResponse, Exception]] = [None] * len(items)
+    for models, indices in _by_model_set(items):
+        scored = _score_rows(np.stack([items[k][1] for k in indices]), models)
+        for k, prediction in zip(indices, scored):
+            results[k] = prediction
+    return results
+
+match_batcher = create_micro_batcher(_score_match_rows, inference)
+
 @app.post("/explain/match", response_model=ExplanationResponse)
-async def explain_match(request: MatchPredictionRequest):
+async def explain_match(request: MatchPredictionRequest, response: Response):
     """
     Get SHAP explanation for match prediction
     """
     try:
-        # Get prediction
-        features_dict = request.features.dict()
-        prediction = outcome_model.predict_proba(features_dict)
-        
-        # Get feature importance
-        feature_importance = outcome_model.get_feature_importance()
-        
-        # Get SHAP values
-        shap_values = explainer.explain_prediction(features_dict)
+        # Get feature importance (precomputed at load)
+        models = registry.current
+        if models.global_importance is None:
+            raise ValueError("Feature importance unavailable")
+        feature_importance = models.global_importance.as_list()
         
-        # Identify top positive and negative factors
-        sorted_shap = sorted(shap_values.items(), key=lambda x: abs(x[1]), reverse=True)
-        top_positive = [
-            {'feature': k, 'impact': v}
-            for k, v in sorted_shap if v > 0
-        ][:5]
-        top_negative = [
-            {'feature': k, 'impact': v}
-            for k, v in sorted_shap if v < 0
-        ][:5]
-        
-        # Calculate xG
-        home_xg_features = {
-            'team_elo': features_dict['home_elo'],
-            'opponent_elo': features_dict['away_elo'],
-            'team_goals_last5': features_dict['home_goals_last5'],
-            'team_xg_last5': features_dict['home_xg_last5'],
-            'opponent_goals_conceded_last5': features_dict['away_goals_last5'],
-            'opponent_xga_last5': features_dict['away_xg_last5'],
-            'team_shots_last5': 15,
-            'team_shots_on_target_last5': 8,
-            'possession_avg': features_dict['home_possession_avg'],
-            'venue_advantage': features_dict['venue_advantage']
-        }
-        
-        away_xg_features = {
-            'team_elo': features_dict['away_elo'],
-            'opponent_elo': features_dict['home_elo'],
-            'team_goals_last5': features_dict['away_goals_last5'],
-            'team_xg_last5': features_dict['away_xg_last5'],
-            'opponent_goals_conceded_last5': features_dict['home_goals_last5'],
-            'opponent_xga_last5': features_dict['home_xg_last5'],
-            'team_shots_last5': 12,
-            'team_shots_on_target_last5': 6,
-            'possession_avg': features_dict['away_possession_avg'],
-            'venue_advantage': -features_dict['venue_advantage']
-        }
-        
-        home_xg = xg_model_home.predict(home_xg_features)
-        away_xg = xg_model_away.predict(away_xg_features)
+        # Get prediction plus SHAP values and top factors for the predicted outcome
+        X = build_match_matrix([request.features])
+        predictions, explanations = await inference.run(_explain_matrix, X, 5, models)
+        prediction, explanation = predictions[0], explanations[0]
         
+        _tag_version(response, prediction)
         return ExplanationResponse(
-            prediction=MatchPredictionResponse(
-                home_win_prob=prediction['home_win_prob'],
-                draw_prob=prediction['draw_prob'],
-                away_win_prob=prediction['away_win_prob'],
-                home_xg=home_xg,
-                away_xg=away_xg,
-                confidence=prediction['confidence']
-            ),
+            prediction=prediction,
             feature_importance=feature_importance,
-            shap_values=shap_values,
-            top_factors={
-                'positive': top_positive,
-                'negative': top_negative
-            }
+            shap_values=explanation['shap_values'],
+            top_factors=explanation['top_factors']
         )
     
+    except ExecutorSaturated:
+        raise
     except Exception as e:
+        log.logger.exception("match explanation failed")
         raise HTTPException(status_code=500, detail=f"Explanation error: {str(e)}")
 
-@app.get("/features/importance", response_model=List[FeatureImportance])
-async def get_feature_importance():
-    """Get global feature importance from trained model"""
+def _outcome_proba(predictions: List[MatchPredictionResponse]) -> np.ndarray:
+    """Outcome probabilities (n_matches, 3) in model class order, for SHAP class selection"""
+    return np.array([
+        [p.home_win_prob, p.draw_prob, p.away_win_prob] for p in predictions
+    ])
+
+def _explain_matrix(X, top_k: int, models: ModelSet) -> Tuple[List[MatchPredictionResponse], List[Dict]]:
+    """Score a match matrix and explain every row for its predicted outcome"""
+    predictions = _score_matrix(X, models)
+    explanations = models.explainer.explain_batch(
+        model_columns(X, models.outcome_model.feature_names),
+        proba=_outcome_proba(predictions),
+        top_k=top_k
+    )
+    return predictions, explanations
+
+@app.post("/explain/matches", response_model=ExplanationBatchResponse)
+async def explain_matches(request: ExplanationBatchRequest, response: Response):
+    """
+    Get SHAP explanations for many fixtures in one call
+    
+    SHAP values for every fixture come from a single explainer pass, and the
+    predicted outcome of each row is taken from the batch prediction instead
+    of a second predict_proba call. Results are returned in request order.
+    """
+    if len(request.matches) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.matches)} fixtures (max {MAX_BATCH_SIZE})"
+        )
+    
+    results = [ExplanationBatchItem(index=i) for i in range(len(request.matches))]
+    valid = []
+    
+    for i, raw in enumerate(request.matches):
+        results[i].home_team = raw.get('home_team')
+        results[i].away_team = raw.get('away_team')
+        try:
+            valid.append((i, MatchPredictionRequest(**raw).features))
+        except Exception as e:
+            results[i].error = f"Invalid fixture: {str(e)}"
+    
+    models = registry.current
+    _tag_version(response, None, models.version)
+    if not valid:
+        return ExplanationBatchResponse(results=results)
+    
     try:
-        importance = outcome_model.get_feature_importance()
-        return [FeatureImportance(**item) for item in importance]
+        X = build_match_matrix([features for _, features in valid])
+        predictions, explanations = await inference.run(_explain_matrix, X, request.top_k, models)
+        for (i, _), prediction, explanation in zip(valid, predictions, explanations):
+            results[i].prediction = prediction
+            results[i].predicted_outcome = explanation['predicted_class']
+            results[i].shap_values = explanation['shap_values']
+            results[i].top_factors = explanation['top_factors']
+    except ExecutorSaturated:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error getting feature importance: {str(e)}")
+        log.logger.exception("batch match explanation failed")
+        for i, _ in valid:
+            results[i].error = f"Explanation error: {str(e)}"
+    
+    return ExplanationBatchResponse(results=results)
+
+def _cached_json(request: Request, payload: CachedPayload, version: Optional[str]) -> Response:
+    """Serve a pre-serialized body with ETag/Cache-Control, answering revalidations with 304"""
+    headers = {'ETag': payload.etag, 'Cache-Control': IMPORTANCE_CACHE_CONTROL}
+    if version:
+        headers[MODEL_VERSION_HEADER] = version
+    if_none_match = request.headers.get('if-none-match', '')
+    tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    if payload.etag in tags or '*' in tags:
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type='application/json', headers=headers)
+
+@app.get("/features/importance", response_model=List[FeatureImportance])
+async def get_feature_importance(request: Request):
+    """Get global feature importance from trained model (precomputed at load)"""
+    models = registry.current
+    if models.global_importance is None:
+        raise HTTPException(status_code=500, detail="Error getting feature importance: model not loaded")
+    return _cached_json(request, models.global_importance.importance_payload, models.version)
+
+@app.get("/features/importance/shap", response_model=Dict[str, Any])
+async def get_shap_importance(request: Request):
+    """Get global mean |SHAP| per outcome class (requires IMPORTANCE_SHAP_SAMPLE)"""
+    models = registry.current
+    if models.global_importance is None or models.global_importance.shap_payload is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Global SHAP importance not computed (set IMPORTANCE_SHAP_SAMPLE)"
+        )
+    return _cached_json(request, models.global_importance.shap_payload, models.version)
+
+@app.get("/elo/{team}", response_model=EloRatingResponse)
+async def get_elo_rating(team: str, as_of: Optional[str] = None):
+    """ELO rating of a team, latest or as it stood just before as_of (ISO date)"""
+    if elo_store is None:
+        raise HTTPException(status_code=404, detail="ELO ratings not available (set ELO_SNAPSHOT_PATH)")
+    if not elo_store.matches_played(team):
+        raise HTTPException(status_code=404, detail=f"Unknown team: {team}")
+    try:
+        rating = elo_store.rating(team, as_of=as_of)
+        played = elo_store.matches_played(team, as_of=as_of)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid as_of date: {str(e)}")
+    return EloRatingResponse(team=team, rating=rating, as_of=as_of, matches_played=played)
 
 @app.post("/predict/player", response_model=PlayerPredictionResponse)
-async def predict_player(request: PlayerPredictionRequest):
+async def predict_player(request: PlayerPredictionRequest, response: Response):
     """
     Predict player performance statistics
     """
     try:
-        print(f"\n[ML Server] Received player prediction request:")
-        print(f"  Player: {request.player_name}")
-        print(f"  Position: {request.position}")
-        
+        models = registry.current
         features_dict = request.features.dict()
-        predictions = player_predictor.predict(request.position, features_dict)
+        # Concurrent single-player requests are coalesced into one predict_batch call
+        predictions = await player_batcher.submit((models, request.position, features_dict))
         
-        print(f"[ML Server] Player predictions: {predictions}")
-        
-        response = PlayerPredictionResponse(
+        prediction = PlayerPredictionResponse(
             player_name=request.player_name,
             position=request.position,
             predictions=predictions,
-            confidence=0.75  # Can be calculated from model uncertainty
+            confidence=0.75,  # Can be calculated from model uncertainty
+            model_version=models.version
         )
         
-        print(f"[ML Server] ✅ Sending player response: {response}")
-        return response
+        if log.enabled(logging.DEBUG):
+            log.log(
+                logging.DEBUG, "player prediction",
+                player_name=request.player_name,
+                position=request.position,
+                predictions=predictions
+            )
+        return _tag_version(response, prediction)
     
+    except ExecutorSaturated:
+        raise
     except Exception as e:
-        print(f"[ML Server] ❌ Error during player prediction: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.logger.exception("player prediction failed")
         raise HTTPException(status_code=500, detail=f"Player prediction error: {str(e)}")
 
+def _predict_player_rows(items: List[Tuple[ModelSet, str, Dict]]) -> List[Dict[str, float]]:
+    """Micro-batch handler: (models, position, features) items collected from concurrent requests"""
+    results: List[Dict[str, float]] = [None] * len(items)
+    for models, indices in _by_model_set(items):
+        predictions = models.player_predictor.predict_batch(
+            [items[k][1] for k in indices],
+            [items[k][2] for k in indices]
+        )
+        for k, stats in zip(indices, predictions):
+            results[k] = stats
+    return results
+
+player_batcher = create_micro_batcher(_predict_player_rows, inference)
+
+@app.post("/predict/players", response_model=PlayerBatchResponse)
+async def predict_players(request: PlayerBatchRequest, response: Response):
+    """
+    Predict performance statistics for many players in one call
+    
+    Players are grouped by position so each position/stat model runs once
+    per batch. Results are returned in request order.
+    """
+    if len(request.players) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.players)} players (max {MAX_BATCH_SIZE})"
+        )
+    
+    results = [PlayerBatchItem(index=i) for i in range(len(request.players))]
+    valid = []
+    
+    for i, raw in enumerate(request.players):
+        results[i].player_name = raw.get('player_name')
+        results[i].position = raw.get('position')
+        try:
+            valid.append((i, PlayerPredictionRequest(**raw)))
+        except Exception as e:
+            results[i].error = f"Invalid player: {str(e)}"
+    
+    models = registry.current
+    _tag_version(response, None, models.version)
+    if not valid:
+        return PlayerBatchResponse(results=results)
+    
+    try:
+        predictions = await inference.run(
+            models.player_predictor.predict_batch,
+            [player.position for _, player in valid],
+            [player.features.dict() for _, player in valid]
+        )
+        for (i, player), stats in zip(valid, predictions):
+            results[i].prediction = PlayerPredictionResponse(
+                player_name=player.player_name,
+                position=player.position,
+                predictions=stats,
+                confidence=0.75,  # Can be calculated from model uncertainty
+                model_version=models.version
+            )
+    except ExecutorSaturated:
+        raise
+    except Exception as e:
+        log.logger.exception("batch player prediction failed")
+        for i, _ in valid:
+            results[i].error = f"Player prediction error: {str(e)}"
+    
+    return PlayerBatchResponse(results=results)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,145 @@
+"""
+Pre-fork Multi-Worker Server
+Loads every model once in the parent process, then forks uvicorn workers
+that share the model memory copy-on-write
+
+`uvicorn serve:app --workers N` spawns fresh interpreters that each load
+every booster and all player models; here the workers inherit them from
+the parent instead, so adding a worker costs little more than its own
+request-handling memory. Linux/macOS only (needs os.fork).
+
+The parent never predicts. XGBoost and SHAP run on OpenMP, and a libgomp
+thread pool started before fork() is unusable (or deadlocks) in the
+children, so warm-up predictions and the TreeExplainer are done by each
+worker after it is forked.
+
+Usage:
+    python serve_prefork.py --workers 4
+    WEB_CONCURRENCY=4 python serve_prefork.py --port 8000
+"""
+
+import argparse
+import gc
+import os
+import signal
+import sys
+import time
+from typing import Callable, Optional
+
+import uvicorn
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Workers that die sooner than this after starting are restarted with a delay
+MIN_WORKER_UPTIME = 1.0
+
+
+class PreforkServer:
+    """
+    Supervises forked uvicorn workers sharing one listening socket
+
+    The parent never serves requests: it loads the models, binds the socket,
+    forks the workers and restarts any that exit unexpectedly. SIGINT and
+    SIGTERM are forwarded to the workers for a graceful shutdown.
+    """
+
+    def __init__(self, config: uvicorn.Config, workers: int, post_fork: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            config: uvicorn settings shared by every worker (app must be an object, not a string)
+            workers: Number of worker processes
+            post_fork: Called in each worker right after the fork, before it serves
+        """
+        self.config = config
+        self.workers = max(1, workers)
+        self.post_fork = post_fork
+        self.children = {}  # pid -> (slot, start time)
+        self.stopping = False
+        self.socket = None
+
+    def _spawn(self, slot: int) -> int:
+        pid = os.fork()
+        if pid == 0:
+            # Worker: default signal handling until uvicorn installs its own
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 0
+            try:
+                if self.post_fork is not None:
+                    self.post_fork()
+                uvicorn.Server(self.config).run(sockets=[self.socket])
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+
+        self.children[pid] = (slot, time.monotonic())
+        return pid
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        """Fork the workers and supervise them until shut down"""
+        self.socket = self.config.bind_socket()
+
+        # Move everything loaded so far out of the collector's reach, so
+        # collections in the workers do not write to (and un-share) those pages
+        gc.collect()
+        gc.freeze()
+
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGTERM, self._stop)
+
+        for slot in range(self.workers):
+            self._spawn(slot)
+        print(f"🚀 Serving with {self.workers} pre-forked workers "
+              f"(parent pid {os.getpid()}, workers {sorted(self.children)})")
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            slot, started = self.children.pop(pid)
+            if self.stopping:
+                continue
+
+            print(f"⚠️  Worker {pid} exited (status {os.waitstatus_to_exitcode(status)}), restarting")
+            if time.monotonic() - started < MIN_WORKER_UPTIME:
+                time.sleep(MIN_WORKER_UPTIME)
+            if not self.stopping:
+                self._spawn(slot)
+
+        self.socket.close()
+        return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the ML API from pre-forked workers sharing one model copy')
+    parser.add_argument('--host', type=str, default='0.0.0.0', help='Bind address')
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', '8000')), help='Bind port (default: $PORT or 8000)')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('WEB_CONCURRENCY', '2')),
+                        help='Worker processes (default: $WEB_CONCURRENCY or 2)')
+    args = parser.parse_args()
+
+    import serve
+
+    started = time.perf_counter()
+    if serve.preload_models():
+        print(f"✅ Models loaded in {time.perf_counter() - started:.2f}s; each worker warms them after the fork")
+    else:
+        # Workers see models_ready unset and retry loading on their own
+        print(f"⚠️  Models incomplete after preload {serve.registry.current.status}; each worker will retry")
+
+    config = uvicorn.Config(serve.app, host=args.host, port=args.port, log_config=None)
+    return PreforkServer(config, args.workers, post_fork=serve.warm_models).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
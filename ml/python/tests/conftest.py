@@ -0,0 +1,50 @@
+"""
+Shared test setup
+Makes the ml/python modules importable as they are when the server runs
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.match_predictor import MatchOutcomePredictor, ExpectedGoalsPredictor
+
+
+def synthetic_match_rows(rng: np.random.Generator, n_rows: int) -> np.ndarray:
+    """Unrounded float64 rows: two-decimal averages next to integer counts on split points"""
+    home_elo = rng.normal(1600, 150, n_rows)
+    away_elo = rng.normal(1600, 150, n_rows)
+    return np.column_stack([
+        home_elo, away_elo, home_elo - away_elo,
+        rng.integers(0, 16, (n_rows, 2)) / 5,
+        rng.integers(0, 15, (n_rows, 2)),
+        np.round(rng.gamma(3, 0.5, (n_rows, 2)), 2),
+        rng.integers(0, 5, (n_rows, 3)),
+        np.round(rng.uniform(40, 60, (n_rows, 2)), 1),
+        rng.integers(0, 2, n_rows), rng.integers(1, 9, n_rows),
+        rng.integers(2, 10, (n_rows, 2)),
+        np.abs(home_elo - away_elo), (away_elo > home_elo).astype(int),
+        rng.integers(1, 4, (n_rows, 2)),
+        rng.uniform(0, 0.5, n_rows)
+    ])
+
+
+@pytest.fixture(scope='session')
+def match_rows():
+    return synthetic_match_rows
+
+
+@pytest.fixture(scope='session')
+def trained_models():
+    """Small outcome and xG models fitted on synthetic rows (sklearn inference)"""
+    rng = np.random.default_rng(42)
+    X = synthetic_match_rows(rng, 1500)
+    outcome = MatchOutcomePredictor(fast_inference=False)
+    outcome.train(X, rng.integers(0, 3, len(X)))
+    xg = ExpectedGoalsPredictor(fast_inference=False)
+    xg.train(X[:, :12], rng.uniform(0.3, 4.0, len(X)))
+    return outcome, xg
@@ -0,0 +1,44 @@
+"""
+Pickle to bundle conversion
+"""
+
+import os
+
+import numpy as np
+
+from convert_models import convert_model
+from models.match_predictor import MatchOutcomePredictor
+from models.model_bundle import read_manifest, verify_bundle
+
+
+def test_failed_conversion_keeps_existing_bundle(tmp_path, trained_models):
+    outcome, _ = trained_models
+    pkl_path = str(tmp_path / 'match_outcome_model.pkl')
+    outcome.save_model(pkl_path)
+
+    first = convert_model(pkl_path, MatchOutcomePredictor, version='v1')
+    assert first['passed']
+    bundle_path = first['bundle_path']
+    before = read_manifest(bundle_path)
+
+    # A negative tolerance fails every comparison
+    second = convert_model(pkl_path, MatchOutcomePredictor, version='v2', tolerance=-1)
+    assert not second['passed']
+
+    assert read_manifest(bundle_path) == before
+    verify_bundle(bundle_path)
+    assert sorted(os.listdir(tmp_path)) == ['match_outcome_model.bundle', 'match_outcome_model.pkl']
+
+
+def test_bundle_matches_pickle_on_unrounded_input(tmp_path, trained_models, match_rows):
+    outcome, _ = trained_models
+    pkl_path = str(tmp_path / 'match_outcome_model.pkl')
+    outcome.save_model(pkl_path)
+
+    result = convert_model(pkl_path, MatchOutcomePredictor, version='v1')
+    assert result['passed'] and result['max_abs_diff'] == 0
+
+    X = match_rows(np.random.default_rng(9), 1000)
+    legacy = MatchOutcomePredictor(model_path=pkl_path, fast_inference=False)
+    bundled = MatchOutcomePredictor(model_path=result['bundle_path'])
+    assert legacy.predict_proba_batch(X) == bundled.predict_proba_batch(X)
@@ -0,0 +1,19 @@
+"""
+SHAP explanations must see the same scaled values as the predictor
+"""
+
+import numpy as np
+
+from explainability.explainer import MatchExplainer
+
+
+def test_float32_input_is_scaled_in_float64(trained_models, match_rows):
+    outcome, _ = trained_models
+    explainer = MatchExplainer(outcome)
+    X32 = match_rows(np.random.default_rng(5), 300).astype(np.float32)
+
+    from_float32 = explainer.explain_batch(X32)
+    from_float64 = explainer.explain_batch(X32.astype(np.float64))
+
+    assert [e['predicted_class'] for e in from_float32] == [e['predicted_class'] for e in from_float64]
+    assert [e['shap_values'] for e in from_float32] == [e['shap_values'] for e in from_float64]
@@ -0,0 +1,58 @@
+"""
+Fast and fused inference must reproduce the float64 sklearn path exactly
+"""
+
+import numpy as np
+import pytest
+
+from utils.feature_matrix import MATCH_FEATURE_NAMES, build_match_matrix, model_columns
+
+
+def set_mode(predictor, mode):
+    predictor.fast_inference = mode != 'sklearn'
+    predictor.fused_scaler = mode == 'fused'
+    predictor._fast = None
+
+
+def outcome_values(predictions):
+    return np.array([[p['home_win_prob'], p['draw_prob'], p['away_win_prob']] for p in predictions])
+
+
+@pytest.mark.parametrize('mode', ['fast', 'fused'])
+def test_matches_sklearn_path_on_unrounded_input(trained_models, match_rows, mode):
+    outcome, xg = trained_models
+    X = match_rows(np.random.default_rng(7), 2000)
+    assert not np.array_equal(X, X.astype(np.float32))
+
+    set_mode(outcome, 'sklearn')
+    set_mode(xg, 'sklearn')
+    expected_outcome = outcome_values(outcome.predict_proba_batch(X))
+    expected_xg = xg.predict_batch(X[:, :12])
+
+    set_mode(outcome, mode)
+    set_mode(xg, mode)
+    np.testing.assert_array_equal(outcome_values(outcome.predict_proba_batch(X)), expected_outcome)
+    np.testing.assert_array_equal(xg.predict_batch(X[:, :12]), expected_xg)
+
+
+def test_fused_matches_sklearn_path_on_float32_input(trained_models, match_rows):
+    outcome, _ = trained_models
+    X = np.round(match_rows(np.random.default_rng(11), 2000))
+
+    set_mode(outcome, 'sklearn')
+    expected = outcome_values(outcome.predict_proba_batch(X))
+    set_mode(outcome, 'fused')
+    np.testing.assert_array_equal(outcome_values(outcome.predict_proba_batch(X)), expected)
+
+
+@pytest.mark.parametrize('mode', ['fast', 'fused'])
+def test_request_matrix_matches_single_fixture_path(trained_models, match_rows, mode):
+    outcome, _ = trained_models
+    rows = [dict(zip(MATCH_FEATURE_NAMES, x)) for x in match_rows(np.random.default_rng(3), 500)]
+
+    set_mode(outcome, 'sklearn')
+    expected = outcome_values([outcome.predict_proba(row) for row in rows])
+
+    set_mode(outcome, mode)
+    X = model_columns(build_match_matrix(rows), outcome.feature_names)
+    np.testing.assert_array_equal(outcome_values(outcome.predict_proba_batch(X)), expected)
@@ -0,0 +1,93 @@
+"""
+Training bundles written the way data_extraction.py writes them
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from models.match_predictor import MatchOutcomePredictor
+from train_real_data import FEATURE_COLUMNS, default_data_path, train_on_real_data
+import train_real_data
+from utils.feature_snapshots import FeatureSnapshots
+from utils.match_features import TRAINING_FEATURES
+from utils.match_store import MatchStore
+from utils.training_dataset import training_writer, write_training_data
+
+
+def finished_matches(n_matches=400, n_teams=24, seed=0):
+    rng = np.random.default_rng(seed)
+    home = rng.integers(0, n_teams, n_matches)
+    away = (home + rng.integers(1, n_teams, n_matches)) % n_teams
+    home_win = rng.uniform(0.1, 0.7, n_matches)
+    draw = rng.uniform(0.1, 0.3, n_matches)
+    return pd.DataFrame({
+        'id': [f'm{i}' for i in range(n_matches)],
+        'homeTeam': [f'Team {t}' for t in home],
+        'awayTeam': [f'Team {t}' for t in away],
+        'date': pd.Timestamp('2023-09-01', tz='UTC') + pd.to_timedelta(np.sort(rng.integers(0, 600, n_matches)), 'D'),
+        'homeWinProb': home_win,
+        'drawProb': draw,
+        'awayWinProb': 1 - home_win - draw,
+        'homeXg': rng.gamma(3, 0.5, n_matches).round(2),
+        'awayXg': rng.gamma(2.5, 0.5, n_matches).round(2),
+        'status': 'FINISHED'
+    })
+
+
+def extract_bundle(path, matches):
+    """Rows and bundle as UCLDataExtractor.prepare_training_data + main() produce them"""
+    store = MatchStore.from_frame(matches)
+    X = np.empty((len(store), len(TRAINING_FEATURES)), dtype=np.float32)
+    X[store.source_rows] = FeatureSnapshots(store).training_features()
+    y_outcome = np.random.default_rng(1).integers(0, 3, len(matches)).astype(np.int8)
+    write_training_data(path, X, y_outcome,
+                        matches['homeXg'].to_numpy(dtype=np.float32),
+                        matches['awayXg'].to_numpy(dtype=np.float32))
+    return X
+
+
+def test_extractor_layout_is_the_model_layout():
+    assert TRAINING_FEATURES == FEATURE_COLUMNS == MatchOutcomePredictor().feature_names
+
+
+def test_strength_features_follow_elo_columns(tmp_path):
+    X = extract_bundle(str(tmp_path / 'bundle'), finished_matches())
+    column = {name: X[:, i].astype(np.float64) for i, name in enumerate(TRAINING_FEATURES)}
+    gap = np.abs(column['home_elo'] - column['away_elo'])
+
+    np.testing.assert_allclose(column['elo_gap_magnitude'], gap, atol=1e-3)
+    np.testing.assert_array_equal(column['underdog_factor'], column['away_elo'] > column['home_elo'])
+    assert set(np.unique(column['quality_tier_home'])) <= {1, 2, 3}
+    np.testing.assert_allclose(column['strength_adjusted_venue'],
+                               column['venue_advantage'] * (1 - np.minimum(gap / 200, 0.8)), atol=1e-5)
+
+
+def test_extractor_bundle_trains(tmp_path):
+    bundle = str(tmp_path / 'real_training_data')
+    extract_bundle(bundle, finished_matches())
+    output_dir = str(tmp_path / 'trained')
+
+    assert train_on_real_data(bundle, output_dir=output_dir)
+
+    outcome = MatchOutcomePredictor(model_path=os.path.join(output_dir, 'match_outcome_model.bundle'))
+    assert outcome.feature_names == FEATURE_COLUMNS
+    assert len(outcome.predict_proba_batch(np.zeros((1, len(FEATURE_COLUMNS))))) == 1
+
+
+def test_default_data_path_skips_older_layout(tmp_path, monkeypatch):
+    csv_path = str(tmp_path / 'real_training_data.csv')
+    bundle = str(tmp_path / 'real_training_data')
+    monkeypatch.setattr(train_real_data, 'DEFAULT_CSV_PATH', csv_path)
+    monkeypatch.setattr(train_real_data, 'DEFAULT_BUNDLE_PATH', bundle)
+
+    pd.DataFrame(np.zeros((2, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS).to_csv(csv_path, index=False)
+    # A newer bundle from the 18-feature layout
+    with training_writer(bundle, TRAINING_FEATURES[:18]) as writer:
+        writer.append(features=np.zeros((2, 18), dtype=np.float32), outcome=np.zeros(2, dtype=np.int8),
+                      home_xg=np.zeros(2, dtype=np.float32), away_xg=np.zeros(2, dtype=np.float32))
+    os.utime(csv_path, (1, 1))
+
+    assert default_data_path() == csv_path
+    assert not train_on_real_data(bundle, output_dir=str(tmp_path / 'trained'))
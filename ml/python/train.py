@@ -88,7 +88,7 @@ def generate_synthetic_training_data(n_samples: int = 1000):
 
 def train_match_outcome_model(
     n_samples: int = 1000,
-    save_path: str = 'models/trained/match_outcome_model.pkl'
+    save_path: str = 'models/trained/match_outcome_model.bundle'
 ):
     """
     Train match outcome prediction model
@@ -146,8 +146,8 @@ def train_match_outcome_model(
 
 def train_xg_models(
     n_samples: int = 1000,
-    save_path_home: str = 'models/trained/xg_home_model.pkl',
-    save_path_away: str = 'models/trained/xg_away_model.pkl'
+    save_path_home: str = 'models/trained/xg_home_model.bundle',
+    save_path_away: str = 'models/trained/xg_away_model.bundle'
 ):
     """
     Train expected goals prediction models
@@ -228,15 +228,15 @@ def main():
     if args.model in ['match', 'all']:
         match_model, match_metrics = train_match_outcome_model(
             n_samples=args.samples,
-            save_path=os.path.join(args.output_dir, 'match_outcome_model.pkl')
+            save_path=os.path.join(args.output_dir, 'match_outcome_model.bundle')
         )
         results['match_outcome'] = match_metrics
     
     if args.model in ['xg', 'all']:
         xg_home, xg_away, metrics_home, metrics_away = train_xg_models(
             n_samples=args.samples,
-            save_path_home=os.path.join(args.output_dir, 'xg_home_model.pkl'),
-            save_path_away=os.path.join(args.output_dir, 'xg_away_model.pkl')
+            save_path_home=os.path.join(args.output_dir, 'xg_home_model.bundle'),
+            save_path_away=os.path.join(args.output_dir, 'xg_away_model.bundle')
         )
         results['xg_home'] = metrics_home
         results['xg_away'] = metrics_away
@@ -4,6 +4,7 @@ Predicts individual player match statistics (goals, assists, shots, tackles, etc
 Based on: player attributes, team strength, opponent, venue, recent form
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
@@ -50,149 +51,174 @@ DEFENDER_TARGETS = ['tackles', 'interceptions', 'clearances', 'blocks']
 GOALKEEPER_TARGETS = ['saves', 'goals_conceded', 'clean_sheet']
 
 
-def generate_synthetic_training_data(n_samples=5000):
+POSITIONS = ['FWD', 'MID', 'DEF', 'GK']
+POSITION_PROBS = [0.3, 0.35, 0.3, 0.05]
+TARGET_NAMES = [
+    'goals', 'shots', 'assists', 'key_passes', 'tackles', 'interceptions',
+    'clearances', 'blocks', 'saves', 'goals_conceded', 'clean_sheet'
+]
+
+# Rows per chunk when streaming synthetic data to disk
+SYNTHETIC_CHUNK_SIZE = 100_000
+
+
+def synthetic_columns(rng: np.random.Generator, n_samples: int) -> dict:
+    """
+    Draw n_samples synthetic player rows as whole arrays
+    
+    Every attribute is one vectorized draw over all rows; each target is
+    drawn once per position block from the same distribution the per-row
+    generator used for that position (0 where a position has no such stat).
+    
+    Returns:
+        Feature and target columns, plus 'position_code' (index into POSITIONS)
+    """
+    n = n_samples
+    
+    # Player attributes (70-95 range for UCL quality)
+    overall = rng.integers(70, 96, n)
+    pace = rng.integers(60, 96, n)
+    shooting = rng.integers(60, 96, n)
+    passing = rng.integers(65, 95, n)
+    dribbling = rng.integers(60, 95, n)
+    defending = rng.integers(40, 90, n)
+    physical = rng.integers(55, 90, n)
+    
+    position = rng.choice(len(POSITIONS), size=n, p=POSITION_PROBS)
+    is_fwd = (position == 0).astype(np.int64)
+    is_mid = (position == 1).astype(np.int64)
+    is_def = (position == 2).astype(np.int64)
+    is_gk = (position == 3).astype(np.int64)
+    
+    # Team and opponent context
+    team_elo = rng.integers(1600, 2100, n)
+    team_form = rng.integers(0, 16, n)  # Last 5 matches points
+    team_goals_scored = rng.uniform(1.5, 3.5, n)
+    team_goals_conceded = rng.uniform(0.5, 2.0, n)
+    opponent_elo = rng.integers(1600, 2100, n)
+    opponent_def = rng.integers(70, 90, n)
+    is_home = rng.integers(0, 2, n)
+    elo_diff = team_elo - opponent_elo
+    
+    # Player recent form
+    goals_last_5 = rng.poisson(np.select([is_fwd == 1, is_mid == 1], [2.0, 0.5], 0.0))
+    assists_last_5 = rng.poisson(np.select([is_mid == 1, is_fwd == 1], [1.5, 1.0], 0.0))
+    minutes_last_5 = rng.integers(300, 451, n)
+    avg_rating = rng.uniform(6.0, 8.5, n)
+    
+    targets = {name: np.zeros(n, dtype=np.int64) for name in TARGET_NAMES}
+    
+    def draw(rows, name, lam):
+        targets[name][rows] = rng.poisson(lam, len(rows))
+    
+    fwd = np.flatnonzero(is_fwd)
+    draw(fwd, 'goals', np.maximum(0.01, (overall[fwd] - 60) / 100 + shooting[fwd] / 300
+                                  + elo_diff[fwd] / 2000 + is_home[fwd] * 0.1))
+    targets['shots'][fwd] = targets['goals'][fwd] + rng.poisson(2, len(fwd))
+    draw(fwd, 'assists', passing[fwd] / 500 + dribbling[fwd] / 500)
+    targets['key_passes'][fwd] = targets['assists'][fwd] + rng.poisson(1, len(fwd))
+    draw(fwd, 'tackles', 0.5)
+    draw(fwd, 'interceptions', 0.3)
+    
+    mid = np.flatnonzero(is_mid)
+    draw(mid, 'goals', (overall[mid] - 65) / 150 + shooting[mid] / 400)
+    targets['shots'][mid] = targets['goals'][mid] + rng.poisson(1.5, len(mid))
+    draw(mid, 'assists', passing[mid] / 300 + (overall[mid] - 70) / 100)
+    targets['key_passes'][mid] = targets['assists'][mid] + rng.poisson(2, len(mid))
+    draw(mid, 'tackles', defending[mid] / 300 + 1)
+    draw(mid, 'interceptions', defending[mid] / 400 + 0.5)
+    draw(mid, 'clearances', 0.5)
+    
+    dfd = np.flatnonzero(is_def)
+    draw(dfd, 'goals', 0.05)
+    draw(dfd, 'shots', 0.3)
+    draw(dfd, 'assists', 0.1)
+    draw(dfd, 'key_passes', 0.5)
+    draw(dfd, 'tackles', defending[dfd] / 250 + 1.5)
+    draw(dfd, 'interceptions', defending[dfd] / 300 + 1)
+    draw(dfd, 'clearances', defending[dfd] / 200 + 2)
+    draw(dfd, 'blocks', defending[dfd] / 400 + 0.5)
+    
+    gk = np.flatnonzero(is_gk)
+    draw(gk, 'saves', 3 + (overall[gk] - 70) / 20)
+    draw(gk, 'goals_conceded', np.maximum(0, 2 - (overall[gk] - 70) / 20 - elo_diff[gk] / 500))
+    targets['clean_sheet'][gk] = targets['goals_conceded'][gk] == 0
+    
+    return {
+        # Features
+        'overall_rating': overall,
+        'pace': pace,
+        'shooting': shooting,
+        'passing': passing,
+        'dribbling': dribbling,
+        'defending': defending,
+        'physical': physical,
+        'is_forward': is_fwd,
+        'is_midfielder': is_mid,
+        'is_defender': is_def,
+        'is_goalkeeper': is_gk,
+        'team_elo': team_elo,
+        'team_form_points': team_form,
+        'team_avg_goals_scored': team_goals_scored,
+        'team_avg_goals_conceded': team_goals_conceded,
+        'opponent_elo': opponent_elo,
+        'opponent_def_rating': opponent_def,
+        'is_home': is_home,
+        'elo_differential': elo_diff,
+        'player_goals_last_5': goals_last_5,
+        'player_assists_last_5': assists_last_5,
+        'player_minutes_last_5': minutes_last_5,
+        'player_avg_rating_last_5': avg_rating,
+        
+        # Targets
+        **targets,
+        'position_code': position,
+    }
+
+
+def generate_synthetic_training_data(n_samples=5000, seed=42):
     """
     Generate synthetic player performance data for initial training
     Will be replaced with real historical data from API-Football
     """
-    np.random.seed(42)
-    
-    data = []
-    
-    for _ in range(n_samples):
-        # Player attributes (70-95 range for UCL quality)
-        overall = np.random.randint(70, 96)
-        pace = np.random.randint(60, 96)
-        shooting = np.random.randint(60, 96)
-        passing = np.random.randint(65, 95)
-        dribbling = np.random.randint(60, 95)
-        defending = np.random.randint(40, 90)
-        physical = np.random.randint(55, 90)
-        
-        # Position (one-hot)
-        position = np.random.choice(['FWD', 'MID', 'DEF', 'GK'], p=[0.3, 0.35, 0.3, 0.05])
-        is_fwd = 1 if position == 'FWD' else 0
-        is_mid = 1 if position == 'MID' else 0
-        is_def = 1 if position == 'DEF' else 0
-        is_gk = 1 if position == 'GK' else 0
-        
-        # Team context
-        team_elo = np.random.randint(1600, 2100)
-        team_form = np.random.randint(0, 16)  # Last 5 matches points
-        team_goals_scored = np.random.uniform(1.5, 3.5)
-        team_goals_conceded = np.random.uniform(0.5, 2.0)
-        
-        # Opponent context
-        opponent_elo = np.random.randint(1600, 2100)
-        opponent_def = np.random.randint(70, 90)
-        
-        # Match context
-        is_home = np.random.choice([0, 1])
-        elo_diff = team_elo - opponent_elo
-        
-        # Player recent form
-        goals_last_5 = np.random.poisson(2 if is_fwd else (0.5 if is_mid else 0))
-        assists_last_5 = np.random.poisson(1.5 if is_mid else (1 if is_fwd else 0))
-        minutes_last_5 = np.random.randint(300, 451)
-        avg_rating = np.random.uniform(6.0, 8.5)
-        
-        # Generate target values based on features
-        if position == 'FWD':
-            goals = np.random.poisson(
-                max(0.01, (overall - 60) / 100 + (shooting / 300) + (team_elo - opponent_elo) / 2000 + is_home * 0.1)
+    columns = synthetic_columns(np.random.default_rng(seed), n_samples)
+    columns['position'] = np.array(POSITIONS, dtype=object)[columns.pop('position_code')]
+    return pd.DataFrame(columns)
+
+
+def write_synthetic_dataset(path, n_rows, chunk_size=SYNTHETIC_CHUNK_SIZE, seed=42):
+    """
+    Stream synthetic player rows into a columnar bundle, chunk_size rows at a time
+    
+    Layout: 'features' float32 (n, len(FEATURE_NAMES)), one int16 column per
+    target, 'position' int8 (index into POSITIONS); names in the schema metadata.
+    Memory use is one chunk whatever n_rows is.
+    
+    Returns:
+        Number of rows written
+    """
+    from utils.columnar import ColumnarWriter
+    
+    columns = {
+        'features': ('float32', (len(FEATURE_NAMES),)),
+        **{name: ('int16', ()) for name in TARGET_NAMES},
+        'position': ('int8', ())
+    }
+    metadata = {'feature_names': FEATURE_NAMES, 'targets': TARGET_NAMES, 'positions': POSITIONS, 'seed': seed}
+    
+    rng = np.random.default_rng(seed)
+    with ColumnarWriter(path, columns, metadata) as writer:
+        for start in range(0, n_rows, chunk_size):
+            chunk = synthetic_columns(rng, min(chunk_size, n_rows - start))
+            features = np.empty((len(chunk['position_code']), len(FEATURE_NAMES)), dtype=np.float32)
+            for i, name in enumerate(FEATURE_NAMES):
+                features[:, i] = chunk[name]
+            writer.append(
+                features=features,
+                position=chunk['position_code'],
+                **{name: chunk[name] for name in TARGET_NAMES}
             )
-            shots = max(0, goals + np.random.poisson(2))
-            assists = np.random.poisson((passing / 500) + (dribbling / 500))
-            key_passes = max(0, assists + np.random.poisson(1))
-            tackles = np.random.poisson(0.5)
-            interceptions = np.random.poisson(0.3)
-            clearances = 0
-            blocks = 0
-            saves = 0
-            goals_conceded = 0
-            clean_sheet = 0
-            
-        elif position == 'MID':
-            goals = np.random.poisson((overall - 65) / 150 + (shooting / 400))
-            shots = max(0, goals + np.random.poisson(1.5))
-            assists = np.random.poisson((passing / 300) + (overall - 70) / 100)
-            key_passes = max(0, assists + np.random.poisson(2))
-            tackles = np.random.poisson((defending / 300) + 1)
-            interceptions = np.random.poisson((defending / 400) + 0.5)
-            clearances = np.random.poisson(0.5)
-            blocks = 0
-            saves = 0
-            goals_conceded = 0
-            clean_sheet = 0
-            
-        elif position == 'DEF':
-            goals = np.random.poisson(0.05)
-            shots = np.random.poisson(0.3)
-            assists = np.random.poisson(0.1)
-            key_passes = np.random.poisson(0.5)
-            tackles = np.random.poisson((defending / 250) + 1.5)
-            interceptions = np.random.poisson((defending / 300) + 1)
-            clearances = np.random.poisson((defending / 200) + 2)
-            blocks = np.random.poisson((defending / 400) + 0.5)
-            saves = 0
-            goals_conceded = 0
-            clean_sheet = 0
-            
-        else:  # GK
-            goals = 0
-            shots = 0
-            assists = 0
-            key_passes = 0
-            tackles = 0
-            interceptions = 0
-            clearances = 0
-            blocks = 0
-            saves = np.random.poisson(3 + (overall - 70) / 20)
-            goals_conceded = np.random.poisson(max(0, 2 - (overall - 70) / 20 - (team_elo - opponent_elo) / 500))
-            clean_sheet = 1 if goals_conceded == 0 else 0
-        
-        data.append({
-            # Features
-            'overall_rating': overall,
-            'pace': pace,
-            'shooting': shooting,
-            'passing': passing,
-            'dribbling': dribbling,
-            'defending': defending,
-            'physical': physical,
-            'is_forward': is_fwd,
-            'is_midfielder': is_mid,
-            'is_defender': is_def,
-            'is_goalkeeper': is_gk,
-            'team_elo': team_elo,
-            'team_form_points': team_form,
-            'team_avg_goals_scored': team_goals_scored,
-            'team_avg_goals_conceded': team_goals_conceded,
-            'opponent_elo': opponent_elo,
-            'opponent_def_rating': opponent_def,
-            'is_home': is_home,
-            'elo_differential': elo_diff,
-            'player_goals_last_5': goals_last_5,
-            'player_assists_last_5': assists_last_5,
-            'player_minutes_last_5': minutes_last_5,
-            'player_avg_rating_last_5': avg_rating,
-            
-            # Targets
-            'goals': goals,
-            'shots': shots,
-            'assists': assists,
-            'key_passes': key_passes,
-            'tackles': tackles,
-            'interceptions': interceptions,
-            'clearances': clearances,
-            'blocks': blocks,
-            'saves': saves,
-            'goals_conceded': goals_conceded,
-            'clean_sheet': clean_sheet,
-            'position': position,
-        })
-    
-    return pd.DataFrame(data)
+    return writer.rows
 
 
 def train_player_model(X_train, y_train, X_test, y_test, target_name):
@@ -239,12 +265,27 @@ def train_player_model(X_train, y_train, X_test, y_test, target_name):
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Train player performance models on synthetic data')
+    parser.add_argument('--rows', type=int, default=5000, help='Synthetic rows to generate')
+    parser.add_argument('--chunk', type=int, default=None,
+                        help='Only generate: stream --rows rows in chunks of this size to --output and exit')
+    parser.add_argument('--output', default='data/synthetic_players',
+                        help='Columnar bundle written in --chunk mode')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    if args.chunk:
+        print(f"\n📊 Writing {args.rows} synthetic player rows to {args.output} (chunks of {args.chunk})...")
+        rows = write_synthetic_dataset(args.output, args.rows, args.chunk, args.seed)
+        print(f"✅ Wrote {rows} rows")
+        return
+    
     print("\n⚽ TRAINING PLAYER PERFORMANCE PREDICTION MODELS")
     print("=" * 70)
     
     # Generate training data
     print("\n📊 Generating synthetic training data...")
-    df = generate_synthetic_training_data(n_samples=5000)
+    df = generate_synthetic_training_data(n_samples=args.rows, seed=args.seed)
     print(f"   Generated {len(df)} training samples")
     print(f"   Position distribution:")
     print(df['position'].value_counts())
@@ -1,6 +1,6 @@
 """
 Train ML Models on Real UCL Data
-Uses data from exported CSV file
+Uses a columnar training bundle from data_extraction.py or an exported CSV file
 """
 
 import argparse
@@ -11,52 +11,100 @@ import os
 from datetime import datetime
 
 from models.match_predictor import MatchOutcomePredictor, ExpectedGoalsPredictor
+from utils.training_dataset import load_training_data, training_feature_names
 
+DEFAULT_BUNDLE_PATH = 'data/real_training_data'
+DEFAULT_CSV_PATH = 'data/real_training_data.csv'
 
-def train_on_real_data(csv_path='data/real_training_data.csv', output_dir='models/trained'):
-    """Train models using real data from CSV file"""
+# Columns the outcome model trains on (first 23 columns - added 5 new features)
+FEATURE_COLUMNS = [
+    'home_elo', 'away_elo', 'elo_diff',
+    'home_form_last5', 'away_form_last5',
+    'home_goals_last5', 'away_goals_last5',
+    'home_xg_last5', 'away_xg_last5',
+    'h2h_home_wins', 'h2h_draws', 'h2h_away_wins',
+    'home_possession_avg', 'away_possession_avg',
+    'venue_advantage', 'stage_importance',
+    'home_rest_days', 'away_rest_days',
+    # New features to reduce home bias
+    'elo_gap_magnitude', 'underdog_factor',
+    'quality_tier_home', 'quality_tier_away',
+    'strength_adjusted_venue'
+]
+
+
+def missing_columns(data_path: str) -> list:
+    """FEATURE_COLUMNS absent from a training bundle, dataset or CSV (read from its header only)"""
+    try:
+        if os.path.isdir(data_path):
+            names = training_feature_names(data_path)
+        else:
+            names = list(pd.read_csv(data_path, nrows=0).columns)
+    except (OSError, ValueError, KeyError):
+        return list(FEATURE_COLUMNS)
+    return [name for name in FEATURE_COLUMNS if name not in names]
+
+
+def default_data_path() -> str:
+    """
+    The newer of the extractor's bundle and the npm CSV export that has every feature column
+
+    A file from an older feature layout is skipped even if it is newer. If
+    neither is usable the bundle path is returned, and training reports
+    what is missing.
+    """
+    candidates = [path for path in (DEFAULT_BUNDLE_PATH, DEFAULT_CSV_PATH)
+                  if os.path.exists(path) and not missing_columns(path)]
+    if not candidates:
+        return DEFAULT_BUNDLE_PATH
+    return max(candidates, key=os.path.getmtime)
+
+
+def train_on_real_data(csv_path=None, output_dir='models/trained'):
+    """
+    Train models using real data
+    
+    Args:
+        csv_path: Training bundle or partitioned dataset directory (data_extraction.py),
+            or CSV file (npm run export-training-data); default: default_data_path()
+        output_dir: Output directory for trained models
+    """
     print("\n🚀 TRAINING ON REAL UCL DATA")
     print("="*60)
     
-    # Check if CSV file exists
-    if not os.path.exists(csv_path):
-        print(f"\n❌ CSV file not found: {csv_path}")
-        print("   Run: npm run export-training-data")
+    data_path = csv_path or default_data_path()
+    if not os.path.exists(data_path):
+        print(f"\n❌ Training data not found: {data_path}")
+        print("   Run: python data_extraction.py  (or: npm run export-training-data)")
         return False
     
-    print(f"📂 Loading data from: {csv_path}")
-    
-    # Load CSV data
-    df = pd.read_csv(csv_path)
+    print(f"📂 Loading data from: {data_path}")
     
-    print(f"✅ Loaded {len(df)} training samples")
+    missing = missing_columns(data_path)
+    if missing:
+        print(f"\n❌ {data_path} has no column for: {', '.join(missing)}")
+        print("   Re-extract it: python data_extraction.py  (--incremental --rebuild for a dataset)")
+        return False
     
-    if len(df) < 10:
+    if os.path.isdir(data_path):
+        # Memory-mapped float32 / int8 columns, no parsing
+        X, y_outcome, y_xg_home, y_xg_away, names = load_training_data(data_path)
+        if names != FEATURE_COLUMNS:
+            X = X[:, [names.index(name) for name in FEATURE_COLUMNS]]
+    else:
+        df = pd.read_csv(data_path)
+        X = df[FEATURE_COLUMNS].values
+        y_outcome = df['outcome'].values
+        y_xg_home = df['home_xg'].values
+        y_xg_away = df['away_xg'].values
+    
+    print(f"✅ Loaded {len(X)} training samples")
+    
+    if len(X) < 10:
         print("\n❌ Insufficient real data available")
         print("   Minimum 10 matches required for training")
         return False
     
-    # Extract features (first 23 columns now - added 5 new features)
-    feature_columns = [
-        'home_elo', 'away_elo', 'elo_diff',
-        'home_form_last5', 'away_form_last5',
-        'home_goals_last5', 'away_goals_last5',
-        'home_xg_last5', 'away_xg_last5',
-        'h2h_home_wins', 'h2h_draws', 'h2h_away_wins',
-        'home_possession_avg', 'away_possession_avg',
-        'venue_advantage', 'stage_importance',
-        'home_rest_days', 'away_rest_days',
-        # New features to reduce home bias
-        'elo_gap_magnitude', 'underdog_factor',
-        'quality_tier_home', 'quality_tier_away',
-        'strength_adjusted_venue'
-    ]
-    
-    X = df[feature_columns].values
-    y_outcome = df['outcome'].values
-    y_xg_home = df['home_xg'].values
-    y_xg_away = df['away_xg'].values
-    
     print(f"\n📊 Training data shape:")
     print(f"   Features (X): {X.shape}")
     print(f"   Outcomes: {y_outcome.shape}")
@@ -76,7 +124,7 @@ def train_on_real_data(csv_path='data/real_training_data.csv', output_dir='model
     print("\n📊 Training Metrics:")
     print(json.dumps(metrics, indent=2))
     
-    outcome_model.save_model(os.path.join(output_dir, 'match_outcome_model.pkl'))
+    outcome_model.save_model(os.path.join(output_dir, 'match_outcome_model.bundle'))
     
     # Train xG models
     print("\n" + "="*60)
@@ -92,7 +140,7 @@ def train_on_real_data(csv_path='data/real_training_data.csv', output_dir='model
     print(f"  RMSE: {metrics_home['rmse']:.4f}")
     print(f"  MAE: {metrics_home['mae']:.4f}")
     print(f"  R²: {metrics_home['r2']:.4f}")
-    xg_home.save_model(os.path.join(output_dir, 'xg_home_model.pkl'))
+    xg_home.save_model(os.path.join(output_dir, 'xg_home_model.bundle'))
     
     # Away xG
     print("\nTraining Away xG model...")
@@ -101,13 +149,13 @@ def train_on_real_data(csv_path='data/real_training_data.csv', output_dir='model
     print(f"  RMSE: {metrics_away['rmse']:.4f}")
     print(f"  MAE: {metrics_away['mae']:.4f}")
     print(f"  R²: {metrics_away['r2']:.4f}")
-    xg_away.save_model(os.path.join(output_dir, 'xg_away_model.pkl'))
+    xg_away.save_model(os.path.join(output_dir, 'xg_away_model.bundle'))
     
     # Save training summary
     summary = {
         'timestamp': datetime.now().isoformat(),
-        'data_source': 'real_csv_export',
-        'csv_file': csv_path,
+        'data_source': 'real_bundle' if os.path.isdir(data_path) else 'real_csv_export',
+        'csv_file': data_path,
         'n_samples': len(X),
         'models_trained': ['match_outcome', 'xg_home', 'xg_away'],
         'metrics': {
@@ -125,9 +173,9 @@ def train_on_real_data(csv_path='data/real_training_data.csv', output_dir='model
     print("✅ ALL MODELS TRAINED ON REAL DATA!")
     print("="*60)
     print(f"\n📁 Models saved to: {output_dir}/")
-    print(f"   - match_outcome_model.pkl")
-    print(f"   - xg_home_model.pkl")
-    print(f"   - xg_away_model.pkl")
+    print(f"   - match_outcome_model.bundle")
+    print(f"   - xg_home_model.bundle")
+    print(f"   - xg_away_model.bundle")
     print(f"\n📄 Training summary: {summary_path}")
     
     return True
@@ -139,10 +187,13 @@ def main():
     )
     
     parser.add_argument(
-        '--csv',
+        '--data', '--csv',
+        dest='data',
         type=str,
-        default='data/real_training_data.csv',
-        help='Path to CSV file with training data'
+        default=None,
+        help='Training bundle / dataset directory or CSV file '
+             '(default: newer of data/real_training_data and data/real_training_data.csv '
+             'that has every feature column)'
     )
     
     parser.add_argument(
@@ -156,13 +207,13 @@ def main():
     
     print("\n⚽ UCL ML MODEL TRAINING - REAL DATA")
     print(f"📅 Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"📂 CSV: {args.csv}")
+    print(f"📂 Data: {args.data or default_data_path()}")
     print(f"💾 Output: {args.output_dir}\n")
     
-    success = train_on_real_data(csv_path=args.csv, output_dir=args.output_dir)
+    success = train_on_real_data(csv_path=args.data, output_dir=args.output_dir)
     
     if not success:
-        print("\n⚠️  Training failed. Check CSV file and data availability.")
+        print("\n⚠️  Training failed. Check the training data and its availability.")
         return 1
     
     return 0
@@ -0,0 +1,105 @@
+"""
+ELO Parameter Tuning
+Sweeps k_factor / home_advantage / initial_rating over the match history
+with the vectorized replay and reports the log-loss / Brier surface
+
+Usage:
+    python tune_elo.py                                   # history from data/elo_snapshot.json
+    python tune_elo.py --synthetic 20000                 # self-contained demo
+    python tune_elo.py --k-factors 10 20 30 --home-advantages 0 50 100 --output elo_surface.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.elo_store import EloStore
+from utils.elo_vectorized import elo_parameter_sweep, encode_matches
+
+
+def load_history(snapshot_path: str):
+    """Encoded matches from an ELO snapshot written by data_extraction.py"""
+    log = EloStore.load(snapshot_path).match_log()
+    _, _, home, away, home_score, away_score = zip(*log)
+    dates = np.array([entry[0] for entry in log], dtype='int64').astype('datetime64[s]')
+    return encode_matches(home, away, home_score, away_score, dates)
+
+
+def synthetic_history(n_matches: int, n_teams: int = 64, seed: int = 42):
+    """Matches between teams with fixed latent strengths and a 60-point home edge"""
+    rng = np.random.default_rng(seed)
+    strength = rng.normal(1500, 120, n_teams)
+    home = rng.integers(0, n_teams, n_matches)
+    away = (home + rng.integers(1, n_teams, n_matches)) % n_teams
+
+    p_home = 1 / (1 + 10 ** ((strength[away] - strength[home] - 60) / 400))
+    draw = rng.random(n_matches) < 0.25
+    home_win = ~draw & (rng.random(n_matches) < p_home)
+    home_score = np.where(draw, 1, np.where(home_win, 2, 0))
+    away_score = np.where(draw, 1, np.where(home_win, 0, 2))
+
+    names = np.array([f'Team {i}' for i in range(n_teams)], dtype=object)
+    dates = np.datetime64('2015-01-01') + np.arange(n_matches).astype('timedelta64[h]') * 12
+    return encode_matches(names[home], names[away], home_score, away_score, dates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep ELO parameters and report log-loss / Brier')
+    parser.add_argument('--snapshot', type=str, default=os.getenv('ELO_SNAPSHOT_PATH', 'data/elo_snapshot.json'),
+                        help='ELO snapshot with the match history')
+    parser.add_argument('--synthetic', type=int, default=None, help='Use N synthetic matches instead')
+    parser.add_argument('--k-factors', type=float, nargs='+', default=list(range(5, 65, 5)))
+    parser.add_argument('--home-advantages', type=float, nargs='+', default=list(range(0, 210, 10)))
+    parser.add_argument('--initial-ratings', type=float, nargs='+', default=[1500])
+    parser.add_argument('--burn-in', type=float, default=0.1,
+                        help='Leading share of matches replayed but not scored (default 0.1)')
+    parser.add_argument('--output', type=str, default=None, help='Write the full surface to this CSV')
+    args = parser.parse_args()
+
+    if args.synthetic:
+        matches = synthetic_history(args.synthetic)
+        source = f'{args.synthetic} synthetic matches'
+    elif os.path.exists(args.snapshot):
+        matches = load_history(args.snapshot)
+        source = args.snapshot
+    else:
+        print(f"❌ ELO snapshot not found: {args.snapshot}")
+        print("   Run data_extraction.py first, or use --synthetic N")
+        return 1
+
+    n_matches = len(matches.home)
+    burn_in = int(n_matches * args.burn_in)
+    n_combos = len(args.k_factors) * len(args.home_advantages) * len(args.initial_ratings)
+    print(f"📊 {n_matches} matches, {matches.n_teams} teams from {source}")
+    print(f"🔧 {n_combos} parameter combinations, scoring matches {burn_in}..{n_matches}")
+
+    started = time.perf_counter()
+    surface = elo_parameter_sweep(
+        matches, args.k_factors, args.home_advantages, args.initial_ratings, burn_in=burn_in
+    )
+    print(f"✅ Sweep finished in {time.perf_counter() - started:.2f}s\n")
+
+    best_brier = surface.loc[surface['brier'].idxmin()]
+    print("Best by log-loss:")
+    print(surface.head(5).to_string(index=False))
+    print(f"\nBest by Brier: k_factor={best_brier['k_factor']:g}, "
+          f"home_advantage={best_brier['home_advantage']:g}, brier={best_brier['brier']:.5f}")
+
+    if len(args.initial_ratings) == 1:
+        pivot = surface.pivot(index='k_factor', columns='home_advantage', values='log_loss')
+        print("\nLog-loss surface (rows: k_factor, columns: home_advantage):")
+        with pd.option_context('display.width', 200, 'display.max_columns', 40):
+            print(pivot.round(4).to_string())
+
+    if args.output:
+        surface.to_csv(args.output, index=False)
+        print(f"\n💾 Surface saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Columnar Bundles
+Typed column data on disk as one .npy file per column plus schema.json,
+written chunk by chunk and loaded memory-mapped
+"""
+
+import json
+import os
+import shutil
+import struct
+import tempfile
+from datetime import datetime, timezone
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+BUNDLE_FORMAT = 'ucl-columnar'
+BUNDLE_FORMAT_VERSION = 1
+SCHEMA_NAME = 'schema.json'
+
+# Fixed .npy preamble (magic, version, header length, header) reserved up
+# front so the final row count can be written in place when the writer closes;
+# a multiple of 64 keeps the data aligned
+_NPY_PREAMBLE = 128
+
+
+def _npy_preamble(dtype: np.dtype, shape: Tuple[int, ...]) -> bytes:
+    header = repr({
+        'descr': np.lib.format.dtype_to_descr(dtype),
+        'fortran_order': False,
+        'shape': tuple(shape)
+    })
+    header_len = _NPY_PREAMBLE - len(np.lib.format.magic(1, 0)) - 2
+    if len(header) + 1 > header_len:
+        raise ValueError(f"shape {shape} does not fit the reserved .npy header")
+    padded = header.ljust(header_len - 1) + '\n'
+    return np.lib.format.magic(1, 0) + struct.pack('<H', header_len) + padded.encode('latin1')
+
+
+class ColumnarWriter:
+    """
+    Stream rows into a bundle directory
+
+    Each column is an .npy file written in C order: chunks are appended as
+    raw bytes after a reserved header, which close() fills in with the final
+    shape. The bundle is assembled in a temporary directory next to the
+    target and renamed into place by close(), so readers never see a
+    partial bundle and memory use is one chunk regardless of row count.
+
+    Usage:
+        with ColumnarWriter(path, {'X': ('float32', (18,)), 'y': ('int8', ())}) as writer:
+            for X, y in batches:
+                writer.append(X=X, y=y)
+    """
+
+    def __init__(self, path: str, columns: Dict[str, Tuple[str, Sequence[int]]], metadata: Optional[Dict] = None):
+        """
+        Args:
+            path: Bundle directory (replaced if it exists)
+            columns: Column name -> (dtype, per-row shape); () for a scalar column
+            metadata: JSON-serializable values stored in schema.json
+        """
+        self.path = path
+        self.columns = {name: (np.dtype(dtype), tuple(shape)) for name, (dtype, shape) in columns.items()}
+        self.metadata = dict(metadata or {})
+        self.rows = 0
+
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._tmp_dir = tempfile.mkdtemp(prefix='.bundle-', dir=parent)
+        self._files = {}
+        for name in self.columns:
+            f = open(os.path.join(self._tmp_dir, f'{name}.npy'), 'wb')
+            f.write(b'\0' * _NPY_PREAMBLE)
+            self._files[name] = f
+
+    def append(self, **arrays: np.ndarray):
+        """Append one chunk; every column must be given, with the same number of rows"""
+        if set(arrays) != set(self.columns):
+            raise ValueError(f"expected columns {sorted(self.columns)}, got {sorted(arrays)}")
+        n_rows = None
+        for name, values in arrays.items():
+            dtype, shape = self.columns[name]
+            values = np.ascontiguousarray(values, dtype=dtype)
+            if values.shape[1:] != shape:
+                raise ValueError(f"column {name}: rows of shape {values.shape[1:]}, expected {shape}")
+            if n_rows is None:
+                n_rows = len(values)
+            elif len(values) != n_rows:
+                raise ValueError("columns in one chunk must have the same number of rows")
+            self._files[name].write(values.tobytes())
+        self.rows += n_rows or 0
+
+    def close(self, metadata: Optional[Dict] = None) -> int:
+        """
+        Finish the headers, write schema.json and move the bundle into place
+
+        Args:
+            metadata: Extra metadata merged into the schema
+
+        Returns:
+            Number of rows written
+        """
+        self.metadata.update(metadata or {})
+        for name, f in self._files.items():
+            dtype, shape = self.columns[name]
+            f.seek(0)
+            f.write(_npy_preamble(dtype, (self.rows, *shape)))
+            f.close()
+
+        schema = {
+            'format': BUNDLE_FORMAT,
+            'format_version': BUNDLE_FORMAT_VERSION,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'rows': self.rows,
+            'columns': {name: {'dtype': dtype.str, 'shape': list(shape)}
+                        for name, (dtype, shape) in self.columns.items()},
+            'metadata': self.metadata
+        }
+        with open(os.path.join(self._tmp_dir, SCHEMA_NAME), 'w') as f:
+            json.dump(schema, f, indent=2)
+
+        if os.path.isdir(self.path):
+            shutil.rmtree(self.path)
+        os.replace(self._tmp_dir, self.path)
+        return self.rows
+
+    def abort(self):
+        """Discard everything written so far"""
+        for f in self._files.values():
+            f.close()
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+    def __enter__(self) -> 'ColumnarWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_columns(path: str, arrays: Dict[str, np.ndarray], metadata: Optional[Dict] = None) -> int:
+    """Write whole arrays as a bundle (dtypes and row shapes taken from the arrays)"""
+    arrays = {name: np.asarray(values) for name, values in arrays.items()}
+    columns = {name: (values.dtype, values.shape[1:]) for name, values in arrays.items()}
+    with ColumnarWriter(path, columns, metadata) as writer:
+        writer.append(**arrays)
+    return writer.rows
+
+
+def is_bundle(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, SCHEMA_NAME))
+
+
+def read_schema(path: str) -> Dict:
+    with open(os.path.join(path, SCHEMA_NAME), 'r') as f:
+        schema = json.load(f)
+    if schema.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f"{path} is not a columnar bundle")
+    if schema.get('format_version', 0) > BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"{path} uses bundle format v{schema['format_version']}")
+    return schema
+
+
+def read_columns(path: str, mmap: bool = True) -> Tuple[Dict[str, np.ndarray], Dict]:
+    """
+    Load a bundle
+
+    Args:
+        path: Bundle directory
+        mmap: Map the column files read-only instead of reading them into memory
+
+    Returns:
+        (columns, metadata)
+    """
+    schema = read_schema(path)
+    # An empty file cannot be mapped
+    mmap_mode = 'r' if mmap and schema['rows'] > 0 else None
+    columns = {}
+    for name, spec in schema['columns'].items():
+        values = np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+        if values.dtype != np.dtype(spec['dtype']) or len(values) != schema['rows']:
+            raise ValueError(f"{path}: column {name} does not match the schema")
+        columns[name] = values
+    return columns, schema['metadata']
+
+
+__all__ = ['ColumnarWriter', 'is_bundle', 'read_columns', 'read_schema', 'write_columns']
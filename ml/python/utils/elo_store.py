@@ -0,0 +1,307 @@
+"""
+Incremental ELO Store
+Persistent ELO ratings that apply only matches not seen before, with a
+time-indexed rating history per team for point-in-time lookups
+"""
+
+import json
+import os
+import tempfile
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from utils.feature_engineering import ELOSystem
+
+SNAPSHOT_FORMAT = 'ucl-elo-snapshot'
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def to_epoch(value) -> int:
+    """Seconds since the epoch (UTC) for a datetime, date, ISO string or epoch number"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return int(ts.value // 10**9)
+
+
+def _iso(epoch: int) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat()
+
+
+class EloStore:
+    """
+    ELO ratings with per-team history
+
+    Matches are applied once each, identified by match ID; every update is
+    O(1) and appends the team's new rating to its history. rating(team, as_of)
+    is a binary search over that history and returns the rating before any
+    match on or after as_of, so training rows only see results that were
+    known at kick-off.
+
+    A finished match that arrives with a date before the latest applied one
+    is inserted into the match log and the ratings are replayed from it.
+    """
+
+    def __init__(self, k_factor: float = 20, initial_rating: float = 1500, home_advantage: float = 100):
+        """
+        Args:
+            k_factor: K-factor for rating changes
+            initial_rating: Rating of a team before its first match
+            home_advantage: ELO points added to the home side's expected score
+        """
+        self.k_factor = k_factor
+        self.initial_rating = initial_rating
+        self.home_advantage = home_advantage
+
+        self._lock = threading.RLock()
+        self._reset()
+        self.replays = 0
+
+    def _reset(self):
+        self.elo = ELOSystem(k_factor=self.k_factor, initial_rating=self.initial_rating)
+        # (date, match_id, home, away, home_score, away_score), sorted by (date, match_id)
+        self._log: List[Tuple] = []
+        self._applied = set()
+        self._dates: Dict[str, List[int]] = {}
+        self._ratings: Dict[str, List[float]] = {}
+
+    @property
+    def params(self) -> Dict[str, float]:
+        return {
+            'k_factor': self.k_factor,
+            'initial_rating': self.initial_rating,
+            'home_advantage': self.home_advantage
+        }
+
+    @property
+    def watermark(self) -> Optional[Tuple[int, str]]:
+        """(date, match_id) of the latest applied match, or None if empty"""
+        return self._log[-1][:2] if self._log else None
+
+    def __len__(self) -> int:
+        return len(self._log)
+
+    def __contains__(self, match_id) -> bool:
+        return str(match_id) in self._applied
+
+    def _update(self, date: int, home: str, away: str, home_score: float, away_score: float):
+        new_home, new_away = self.elo.update_ratings(home, away, home_score, away_score, self.home_advantage)
+        for team, rating in ((home, new_home), (away, new_away)):
+            self._dates.setdefault(team, []).append(date)
+            self._ratings.setdefault(team, []).append(rating)
+
+    def _replay(self):
+        log = self._log
+        self._reset()
+        self._log = log
+        self._applied = {entry[1] for entry in log}
+        for date, _, home, away, home_score, away_score in log:
+            self._update(date, home, away, home_score, away_score)
+        self.replays += 1
+
+    def apply_match(
+        self,
+        match_id,
+        date,
+        home_team: str,
+        away_team: str,
+        home_score: float,
+        away_score: float
+    ) -> bool:
+        """
+        Apply one finished match
+
+        Returns:
+            False if the match was already applied
+        """
+        return self.apply_matches([{
+            'match_id': match_id, 'date': date,
+            'home_team': home_team, 'away_team': away_team,
+            'home_score': home_score, 'away_score': away_score
+        }]) == 1
+
+    def apply_matches(self, matches: Iterable[Dict]) -> int:
+        """
+        Apply finished matches not seen before, in date order
+
+        Args:
+            matches: Dicts with match_id, date, home_team, away_team,
+                home_score and away_score
+
+        Returns:
+            Number of newly applied matches
+        """
+        new = []
+        seen = set()
+        for m in matches:
+            match_id = str(m['match_id'])
+            if match_id in self._applied or match_id in seen:
+                continue
+            seen.add(match_id)
+            new.append((to_epoch(m['date']), match_id, m['home_team'], m['away_team'],
+                        float(m['home_score']), float(m['away_score'])))
+        if not new:
+            return 0
+
+        new.sort(key=lambda entry: entry[:2])
+        with self._lock:
+            if self._log and new[0][:2] < self._log[-1][:2]:
+                # Late result: put it in its place and rebuild every history
+                for entry in new:
+                    insort(self._log, entry, key=lambda e: e[:2])
+                self._replay()
+            else:
+                for entry in new:
+                    self._log.append(entry)
+                    self._applied.add(entry[1])
+                    self._update(entry[0], entry[2], entry[3], entry[4], entry[5])
+        return len(new)
+
+    def rating(self, team: str, as_of=None) -> float:
+        """
+        Rating of a team, now or just before a point in time
+
+        Args:
+            team: Team name
+            as_of: Date; only matches strictly before it count (None = all)
+        """
+        when = None if as_of is None else to_epoch(as_of)
+        with self._lock:
+            ratings = self._ratings.get(team)
+            if not ratings:
+                return self.initial_rating
+            if when is None:
+                return ratings[-1]
+            i = bisect_left(self._dates[team], when)
+            return ratings[i - 1] if i else self.initial_rating
+
+    def match_log(self) -> List[Tuple]:
+        """Applied matches as (epoch date, match_id, home, away, home_score, away_score), oldest first"""
+        with self._lock:
+            return list(self._log)
+
+    def matches_played(self, team: str, as_of=None) -> int:
+        """Number of applied matches of a team (strictly before as_of, if given)"""
+        with self._lock:
+            dates = self._dates.get(team, [])
+            return len(dates) if as_of is None else bisect_left(dates, to_epoch(as_of))
+
+    def last_played(self, team: str, as_of=None) -> Optional[int]:
+        """Epoch date of a team's latest applied match (strictly before as_of, if given)"""
+        with self._lock:
+            dates = self._dates.get(team, [])
+            i = len(dates) if as_of is None else bisect_left(dates, to_epoch(as_of))
+            return dates[i - 1] if i else None
+
+    def ratings_as_of(self, as_of=None) -> Dict[str, float]:
+        """Rating of every known team at a point in time"""
+        with self._lock:
+            return {team: self.rating(team, as_of) for team in self._ratings}
+
+    def current_ratings(self) -> Dict[str, float]:
+        """Latest rating of every known team"""
+        return self.ratings_as_of(None)
+
+    def history(self, team: str) -> List[Tuple[str, float]]:
+        """(ISO date, rating after that match) pairs for one team, oldest first"""
+        with self._lock:
+            return [(_iso(d), r) for d, r in zip(self._dates.get(team, []), self._ratings.get(team, []))]
+
+    def save(self, path: str):
+        """Write a snapshot (atomically replaces an existing file)"""
+        with self._lock:
+            watermark = self.watermark
+            snapshot = {
+                'format': SNAPSHOT_FORMAT,
+                'format_version': SNAPSHOT_FORMAT_VERSION,
+                'created_at': datetime.now(timezone.utc).isoformat(),
+                'params': self.params,
+                'watermark': {'date': _iso(watermark[0]), 'match_id': watermark[1]} if watermark else None,
+                'matches': [list(entry) for entry in self._log],
+                'teams': {
+                    team: {'dates': self._dates[team], 'ratings': self._ratings[team]}
+                    for team in self._ratings
+                }
+            }
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.elo-', suffix='.json', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(snapshot, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> 'EloStore':
+        """Restore a store from a snapshot without replaying the matches"""
+        with open(path, 'r') as f:
+            snapshot = json.load(f)
+        if snapshot.get('format') != SNAPSHOT_FORMAT:
+            raise ValueError(f"{path} is not an ELO snapshot")
+        if snapshot.get('format_version', 0) > SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"{path} uses snapshot format v{snapshot['format_version']}")
+
+        store = cls(**snapshot['params'])
+        store._log = [tuple(entry) for entry in snapshot['matches']]
+        store._applied = {entry[1] for entry in store._log}
+        for team, series in snapshot['teams'].items():
+            store._dates[team] = series['dates']
+            store._ratings[team] = series['ratings']
+            store.elo.ratings[team] = series['ratings'][-1]
+        return store
+
+    def stats(self) -> Dict:
+        watermark = self.watermark
+        return {
+            **self.params,
+            'matches': len(self._log),
+            'teams': len(self._ratings),
+            'watermark': _iso(watermark[0]) if watermark else None,
+            'replays': self.replays
+        }
+
+
+def open_elo_store(path: str, **params) -> EloStore:
+    """
+    Load the snapshot at path, or start an empty store if there is none
+
+    If params (k_factor, initial_rating, home_advantage) differ from the
+    ones the snapshot was built with, every rating is replayed with the new
+    parameters from the stored match log.
+    """
+    if not os.path.exists(path):
+        return EloStore(**params)
+
+    store = EloStore.load(path)
+    if params and any(store.params[name] != value for name, value in params.items()):
+        rebuilt = EloStore(**{**store.params, **params})
+        rebuilt._log = store._log
+        rebuilt._replay()
+        return rebuilt
+    return store
+
+
+def create_elo_store() -> Optional[EloStore]:
+    """
+    Load the ratings snapshot used for serving
+
+    Environment:
+        ELO_SNAPSHOT_PATH: Snapshot written by data_extraction.py (unset or missing file: no store)
+    """
+    path = os.getenv('ELO_SNAPSHOT_PATH')
+    if not path or not os.path.exists(path):
+        return None
+    return EloStore.load(path)
+
+
+__all__ = ['EloStore', 'create_elo_store', 'open_elo_store', 'to_epoch']
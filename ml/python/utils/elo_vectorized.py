@@ -0,0 +1,190 @@
+"""
+Vectorized ELO Replay
+Replays a match history for many ELO parameter combinations at once over
+integer-encoded teams, and scores each combination with log-loss and Brier
+"""
+
+from itertools import product
+from typing import Dict, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class EncodedMatches(NamedTuple):
+    """Match history as parallel arrays, sorted by date"""
+    home: np.ndarray     # int32 team index
+    away: np.ndarray     # int32 team index
+    result: np.ndarray   # float64 home score: 1 win, 0.5 draw, 0 loss
+    dates: np.ndarray    # datetime64[s]
+    teams: np.ndarray    # team name per index
+
+    @property
+    def n_teams(self) -> int:
+        return len(self.teams)
+
+
+def encode_matches(
+    home_teams: Sequence[str],
+    away_teams: Sequence[str],
+    home_scores: Sequence[float],
+    away_scores: Sequence[float],
+    dates: Optional[Sequence] = None
+) -> EncodedMatches:
+    """
+    Integer-encode a match list
+
+    Teams are numbered in order of first appearance. Matches are stably
+    sorted by date when dates are given, so same-day matches keep their
+    input order.
+    """
+    home_scores = np.asarray(home_scores, dtype=np.float64)
+    away_scores = np.asarray(away_scores, dtype=np.float64)
+    n = len(home_scores)
+
+    codes, teams = pd.factorize(pd.Series(np.concatenate([np.asarray(home_teams, dtype=object),
+                                                          np.asarray(away_teams, dtype=object)])))
+    home, away = codes[:n].astype(np.int32), codes[n:].astype(np.int32)
+    result = np.sign(home_scores - away_scores) * 0.5 + 0.5
+
+    if dates is None:
+        when = np.zeros(n, dtype='datetime64[s]')
+    else:
+        when = pd.to_datetime(pd.Series(dates), utc=True).dt.tz_localize(None).to_numpy().astype('datetime64[s]')
+    order = np.argsort(when, kind='stable')
+    return EncodedMatches(home[order], away[order], result[order], when[order], np.asarray(teams, dtype=object))
+
+
+def replay_elo(
+    matches: EncodedMatches,
+    k_factors,
+    home_advantages,
+    initial_ratings=1500.0
+):
+    """
+    Replay the history for P parameter combinations simultaneously
+
+    The parameter arguments are broadcast to shape (P,). Ratings are held
+    in one preallocated rating table; each match is a handful of in-place
+    vector operations across all P combinations, with the same update
+    rule as ELOSystem.update_ratings.
+
+    Returns:
+        (ratings, expected): final ratings (P, n_teams) and the pre-match
+        expected home score of every match under every combination (P, n_matches)
+    """
+    k, hfa, init = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(k_factors, dtype=np.float64)),
+        np.atleast_1d(np.asarray(home_advantages, dtype=np.float64)),
+        np.atleast_1d(np.asarray(initial_ratings, dtype=np.float64))
+    )
+    n_params, n_matches = len(k), len(matches.home)
+
+    # Team-major so each team's ratings across all combinations are contiguous
+    ratings = np.repeat(init[np.newaxis, :], matches.n_teams, axis=0)
+    expected = np.empty((n_matches, n_params), dtype=np.float64)
+    delta = np.empty(n_params, dtype=np.float64)
+
+    home, away, result = matches.home, matches.away, matches.result
+    for i in range(n_matches):
+        rating_h = ratings[home[i]]
+        rating_a = ratings[away[i]]
+        # expected = 1 / (1 + 10 ** ((away - (home + hfa)) / 400))
+        e = expected[i]
+        np.subtract(rating_a, rating_h, out=e)
+        e -= hfa
+        e *= 1 / 400
+        np.power(10.0, e, out=e)
+        e += 1.0
+        np.reciprocal(e, out=e)
+
+        np.subtract(result[i], e, out=delta)
+        delta *= k
+        rating_h += delta  # views: updates the rating table in place
+        rating_a -= delta
+
+    return ratings.T, expected.T
+
+
+def elo_history(
+    matches: EncodedMatches,
+    k_factor: float = 20,
+    home_advantage: float = 100,
+    initial_rating: float = 1500
+):
+    """
+    Ratings of both sides after every match, for one parameter combination
+
+    Same update rule as ELOSystem.update_ratings, on plain lists (faster than
+    array operations for a single combination).
+
+    Returns:
+        (home_after, away_after): float64 arrays of length n_matches
+    """
+    ratings = [float(initial_rating)] * matches.n_teams
+    home_after = [0.0] * len(matches.home)
+    away_after = [0.0] * len(matches.home)
+    for i, (h, a, result) in enumerate(zip(matches.home.tolist(), matches.away.tolist(), matches.result.tolist())):
+        expected = 1 / (1 + 10 ** ((ratings[a] - ratings[h] - home_advantage) / 400))
+        delta = k_factor * (result - expected)
+        ratings[h] += delta
+        ratings[a] -= delta
+        home_after[i] = ratings[h]
+        away_after[i] = ratings[a]
+    return np.array(home_after), np.array(away_after)
+
+
+def score_predictions(expected: np.ndarray, result: np.ndarray, eps: float = 1e-12) -> Dict[str, np.ndarray]:
+    """
+    Log-loss and Brier score of expected scores against results, per row
+
+    A draw counts as half a win (target 0.5), the same target the ELO update uses.
+    """
+    p = np.clip(expected, eps, 1 - eps)
+    log_loss = -(result * np.log(p) + (1 - result) * np.log1p(-p)).mean(axis=-1)
+    brier = np.square(expected - result).mean(axis=-1)
+    return {'log_loss': log_loss, 'brier': brier}
+
+
+def elo_parameter_sweep(
+    matches: EncodedMatches,
+    k_factors: Sequence[float],
+    home_advantages: Sequence[float],
+    initial_ratings: Sequence[float] = (1500.0,),
+    burn_in: int = 0
+) -> pd.DataFrame:
+    """
+    Evaluate every combination of the given parameter values
+
+    All combinations are replayed together. Matches before burn_in are
+    replayed but not scored, so early noise from every team starting at
+    the same rating does not dominate the surface. With a common starting
+    rating only rating differences matter, so initial_rating alone does not
+    change the scores.
+
+    Returns:
+        One row per combination with k_factor, home_advantage,
+        initial_rating, log_loss and brier, best log-loss first
+    """
+    grid = np.array(list(product(k_factors, home_advantages, initial_ratings)), dtype=np.float64)
+    _, expected = replay_elo(matches, grid[:, 0], grid[:, 1], grid[:, 2])
+    scores = score_predictions(expected[:, burn_in:], matches.result[burn_in:])
+
+    surface = pd.DataFrame({
+        'k_factor': grid[:, 0],
+        'home_advantage': grid[:, 1],
+        'initial_rating': grid[:, 2],
+        'log_loss': scores['log_loss'],
+        'brier': scores['brier']
+    })
+    return surface.sort_values('log_loss', kind='stable').reset_index(drop=True)
+
+
+__all__ = [
+    'EncodedMatches',
+    'elo_history',
+    'elo_parameter_sweep',
+    'encode_matches',
+    'replay_elo',
+    'score_predictions'
+]
@@ -0,0 +1,89 @@
+"""
+Shared Match Feature Matrix
+Builds one float64 feature matrix per request and hands each match model
+a column view of the features it was trained on
+"""
+
+import numpy as np
+from typing import Dict, List, Sequence, Tuple, Union
+
+# Canonical order of the 23 match features (MatchFeatures in serve.py)
+MATCH_FEATURE_NAMES = [
+    'home_elo', 'away_elo', 'elo_diff',
+    'home_form_last5', 'away_form_last5',
+    'home_goals_last5', 'away_goals_last5',
+    'home_xg_last5', 'away_xg_last5',
+    'h2h_home_wins', 'h2h_draws', 'h2h_away_wins',
+    'home_possession_avg', 'away_possession_avg',
+    'venue_advantage', 'stage_importance',
+    'home_rest_days', 'away_rest_days',
+    'elo_gap_magnitude', 'underdog_factor',
+    'quality_tier_home', 'quality_tier_away',
+    'strength_adjusted_venue'
+]
+
+_FEATURE_INDEX = {name: i for i, name in enumerate(MATCH_FEATURE_NAMES)}
+
+# feature_names tuple -> slice (contiguous subset) or index array
+_column_cache: Dict[Tuple[str, ...], Union[slice, np.ndarray]] = {}
+
+
+def build_match_matrix(matches: Sequence) -> np.ndarray:
+    """
+    Convert match features to a (n_matches, 23) float64 matrix in canonical order
+
+    Values stay float64 so the models scale exactly what prepare_features
+    would have; rounding to float32 before scaling can move a value across
+    a split point.
+
+    Args:
+        matches: Feature dicts or objects with one attribute per feature
+            (e.g. pydantic MatchFeatures); missing dict keys count as 0
+
+    Returns:
+        C-contiguous float64 matrix
+    """
+    rows = [
+        [match.get(name, 0) for name in MATCH_FEATURE_NAMES]
+        if isinstance(match, dict)
+        else [getattr(match, name) for name in MATCH_FEATURE_NAMES]
+        for match in matches
+    ]
+    return np.array(rows, dtype=np.float64).reshape(len(rows), len(MATCH_FEATURE_NAMES))
+
+
+def _columns_for(feature_names: Sequence[str]) -> Union[slice, np.ndarray, None]:
+    """Locate a model's features in the canonical order (None if any is unknown)"""
+    key = tuple(feature_names)
+    if key not in _column_cache:
+        if any(name not in _FEATURE_INDEX for name in key):
+            return None
+        indices = np.array([_FEATURE_INDEX[name] for name in key], dtype=np.intp)
+        if len(indices) and np.array_equal(indices, np.arange(indices[0], indices[0] + len(indices))):
+            _column_cache[key] = slice(int(indices[0]), int(indices[0]) + len(indices))
+        else:
+            _column_cache[key] = indices
+    return _column_cache[key]
+
+
+def model_columns(X: np.ndarray, feature_names: List[str]) -> np.ndarray:
+    """
+    Select a model's feature columns from a canonical match matrix
+
+    Models whose features are a contiguous run of the canonical order (the
+    outcome model uses all 23, the xG models the first 12) get a zero-copy
+    view; other orders fall back to a gathered copy, and names outside the
+    canonical set are filled with 0 like prepare_features does.
+    """
+    columns = _columns_for(feature_names)
+    if columns is not None:
+        return X[:, columns]
+
+    out = np.zeros((X.shape[0], len(feature_names)), dtype=X.dtype)
+    for j, name in enumerate(feature_names):
+        if name in _FEATURE_INDEX:
+            out[:, j] = X[:, _FEATURE_INDEX[name]]
+    return out
+
+
+__all__ = ['MATCH_FEATURE_NAMES', 'build_match_matrix', 'model_columns']
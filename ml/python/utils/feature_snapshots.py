@@ -0,0 +1,209 @@
+"""
+Point-in-Time Feature Snapshots
+Each team's ELO / form / xG / possession state after every match it played,
+and each pairing's head-to-head counts after every meeting, as sorted
+columns that training rows are as-of joined against
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from utils.elo_vectorized import elo_history
+from utils.match_features import (
+    AWAY_POSSESSION, DEFAULT_FORM, HOME_POSSESSION, TRAINING_FEATURES, add_strength_features, goals_proxy
+)
+from utils.match_store import MatchStore
+
+# Snapshot keys pack (entity ID, epoch day) into one sortable int64
+_DAY_BITS = 32
+
+
+def _keys(entity: np.ndarray, day: np.ndarray) -> np.ndarray:
+    return (entity.astype(np.int64) << _DAY_BITS) | (day.astype(np.int64) & ((1 << _DAY_BITS) - 1))
+
+
+def _as_of(keys: np.ndarray, entity: np.ndarray, query_entity: np.ndarray, query_day: np.ndarray):
+    """
+    Row of the latest snapshot of each queried entity strictly before the queried day
+
+    Returns:
+        (rows, found): snapshot row per query (clipped to 0 where none) and a mask of queries that have one
+    """
+    rows = np.searchsorted(keys, _keys(query_entity, query_day), side='left') - 1
+    found = rows >= 0
+    rows = np.where(found, rows, 0)
+    found &= entity[rows] == query_entity
+    return rows, found
+
+
+class FeatureSnapshots:
+    """
+    Time-travel feature table built from a MatchStore in one vectorized pass
+
+    Team rows follow the store's CSR order (team, then chronological), so
+    they are already sorted by (team_id, day); pair rows are sorted by
+    (pair_id, day). A lookup "state of team t before day d" is a binary
+    search for the last row before (t, d); rows for many (team, day) keys
+    are resolved at once with a single searchsorted. Nothing a row returns
+    can depend on a match played on or after the queried day.
+    """
+
+    def __init__(
+        self,
+        store: MatchStore,
+        window: int = 5,
+        k_factor: float = 20,
+        initial_rating: float = 1500,
+        home_advantage: float = 100
+    ):
+        """
+        Args:
+            store: Finished matches
+            window: Number of recent matches in the form features
+            k_factor, initial_rating, home_advantage: ELO parameters
+        """
+        self.store = store
+        self.window = window
+        self.initial_rating = initial_rating
+        self._build_team_rows(k_factor, home_advantage)
+        self._build_pair_rows()
+
+    def _build_team_rows(self, k_factor: float, home_advantage: float):
+        store = self.store
+        match = store.team_index.astype(np.int64)
+        counts = np.diff(store.team_offsets)
+        self.team = np.repeat(np.arange(store.n_teams, dtype=np.int32), counts)
+        self.team_day = store.days[match]
+        self.team_keys = _keys(self.team, self.team_day)
+
+        is_home = store.home[match] == self.team
+        own_prob = np.where(is_home, store.home_win_prob[match], store.away_win_prob[match])
+        opp_prob = np.where(is_home, store.away_win_prob[match], store.home_win_prob[match])
+        points = np.where(own_prob > opp_prob, 3.0, np.where(own_prob < opp_prob, 0.0, 1.0))
+        xg = np.where(is_home, store.home_xg[match], store.away_xg[match]).astype(np.float64)
+        possession = np.where(is_home, HOME_POSSESSION, AWAY_POSSESSION).astype(np.float64)
+
+        # Rolling window within each team: add the previous window-1 rows of the
+        # same team, oldest first (the order the per-match features sum in)
+        position = np.arange(len(match)) - np.repeat(store.team_offsets[:-1], counts)
+        n_recent = np.minimum(position + 1, self.window)
+        points_sum = np.zeros(len(match))
+        xg_sum = np.zeros(len(match))
+        possession_sum = np.zeros(len(match))
+        for lag in range(self.window - 1, -1, -1):
+            valid = position >= lag
+            rows = np.arange(len(match)) - lag
+            points_sum += np.where(valid, points[np.maximum(rows, 0)], 0)
+            xg_sum += np.where(valid, xg[np.maximum(rows, 0)], 0)
+            possession_sum += np.where(valid, possession[np.maximum(rows, 0)], 0)
+
+        home_after, away_after = elo_history(store.encoded(), k_factor, home_advantage, self.initial_rating)
+        self.elo = np.where(is_home, home_after[match], away_after[match])
+        self.form = points_sum / n_recent
+        self.xg = xg_sum
+        self.goals = goals_proxy(xg_sum)
+        self.possession = possession_sum / n_recent
+
+    def _build_pair_rows(self):
+        store = self.store
+        low = np.minimum(store.home, store.away).astype(np.int64)
+        high = np.maximum(store.home, store.away).astype(np.int64)
+        pair = low * store.n_teams + high
+        order = np.argsort(pair, kind='stable')  # matches are chronological, so each pair stays in date order
+
+        # Outcome of every meeting from the lower team ID's side
+        home_outcome = np.where(store.home_win_prob > store.away_win_prob, 0,
+                                np.where(store.home_win_prob < store.away_win_prob, 2, 1))
+        low_outcome = np.where(store.home == low, home_outcome, 2 - home_outcome)[order]
+
+        self.pair = pair[order]
+        self.pair_day = store.days[order]
+        self.pair_keys = _keys(self.pair, self.pair_day)
+
+        starts = np.flatnonzero(np.r_[True, self.pair[1:] != self.pair[:-1]])
+        group_start = np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        self.pair_counts = np.empty((len(order), 3), dtype=np.int32)
+        for outcome in range(3):
+            running = np.cumsum(low_outcome == outcome)
+            before_group = np.where(group_start > 0, running[group_start - 1], 0)
+            self.pair_counts[:, outcome] = running - before_group
+
+    def team_state(self, team_ids: np.ndarray, days: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        As-of join: each team's state after its last match before the given day
+
+        Args:
+            team_ids: Team ID per query
+            days: Epoch day per query
+
+        Returns:
+            Columns elo, form, goals, xg and possession, one value per query
+            (initial rating / DEFAULT_FORM for teams with no earlier match)
+        """
+        team_ids = np.asarray(team_ids, dtype=np.int32)
+        rows, found = _as_of(self.team_keys, self.team, team_ids, np.asarray(days))
+        return {
+            'elo': np.where(found, self.elo[rows], self.initial_rating),
+            'form': np.where(found, self.form[rows], DEFAULT_FORM['form']),
+            'goals': np.where(found, self.goals[rows], DEFAULT_FORM['goals']),
+            'xg': np.where(found, self.xg[rows], DEFAULT_FORM['xg']),
+            'possession': np.where(found, self.possession[rows], DEFAULT_FORM['possession'])
+        }
+
+    def h2h(self, home_ids: np.ndarray, away_ids: np.ndarray, days: np.ndarray) -> Dict[str, np.ndarray]:
+        """As-of join of head-to-head counts before the given day, from the home side's view"""
+        home_ids = np.asarray(home_ids, dtype=np.int64)
+        away_ids = np.asarray(away_ids, dtype=np.int64)
+        low = np.minimum(home_ids, away_ids)
+        pair = low * self.store.n_teams + np.maximum(home_ids, away_ids)
+        rows, found = _as_of(self.pair_keys, self.pair, pair, np.asarray(days))
+
+        counts = np.where(found[:, np.newaxis], self.pair_counts[rows], 0)
+        home_is_low = home_ids == low
+        return {
+            'home_wins': np.where(home_is_low, counts[:, 0], counts[:, 2]),
+            'draws': counts[:, 1],
+            'away_wins': np.where(home_is_low, counts[:, 2], counts[:, 0])
+        }
+
+    def training_features(self) -> np.ndarray:
+        """
+        Leak-free training matrix for every match in the store
+
+        Returns:
+            Feature matrix (n_matches, 23) in TRAINING_FEATURES order, rows in store order
+        """
+        store = self.store
+        home = self.team_state(store.home, store.days)
+        away = self.team_state(store.away, store.days)
+        h2h = self.h2h(store.home, store.away, store.days)
+
+        columns = {
+            'home_elo': home['elo'], 'away_elo': away['elo'],
+            'elo_diff': home['elo'] - away['elo'],
+            'home_form_last5': home['form'], 'away_form_last5': away['form'],
+            'home_goals_last5': home['goals'], 'away_goals_last5': away['goals'],
+            'home_xg_last5': home['xg'], 'away_xg_last5': away['xg'],
+            'h2h_home_wins': h2h['home_wins'], 'h2h_draws': h2h['draws'], 'h2h_away_wins': h2h['away_wins'],
+            'home_possession_avg': home['possession'], 'away_possession_avg': away['possession'],
+            # Not in the matches table yet: every row is a home-venue Champions League match
+            'venue_advantage': 1, 'stage_importance': 8,
+            'home_rest_days': 4, 'away_rest_days': 4
+        }
+        add_strength_features(columns)
+        X = np.empty((len(store), len(TRAINING_FEATURES)), dtype=np.float32)
+        for position, name in enumerate(TRAINING_FEATURES):
+            X[:, position] = columns[name]
+        return X
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the snapshot columns"""
+        return sum(getattr(self, name).nbytes for name in (
+            'team', 'team_day', 'team_keys', 'elo', 'form', 'goals', 'xg', 'possession',
+            'pair', 'pair_day', 'pair_keys', 'pair_counts'
+        ))
+
+
+__all__ = ['FeatureSnapshots']
@@ -0,0 +1,383 @@
+"""
+Fixture Feature Store
+In-memory team state (ELO, last-5 form, head-to-head, last match date)
+that resolves the 23 match features for a fixture from team names
+"""
+
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from utils.elo_store import EloStore, to_epoch
+from utils.feature_engineering import FormCalculator, calculate_h2h_stats
+from utils.feature_matrix import MATCH_FEATURE_NAMES
+from utils.match_features import quality_tier
+
+logger = logging.getLogger('ucl_ml.feature_store')
+
+# Same scales as the client-side feature engineering the models were trained with
+STAGE_IMPORTANCE = {
+    'group stage': 5,
+    'round of 16': 7,
+    'quarter-finals': 8,
+    'semi-finals': 9,
+    'final': 10
+}
+DEFAULT_STAGE_IMPORTANCE = 6
+DEFAULT_REST_DAYS = 4
+STRONG_HOME_VENUES = ('Bernabeu', 'Camp Nou', 'Allianz', 'Anfield')
+
+# Column names in the results file (the matches table's own names)
+RESULT_COLUMNS = ['id', 'date', 'homeTeam', 'awayTeam', 'homeGoals', 'awayGoals', 'homeXg', 'awayXg']
+
+SECONDS_PER_DAY = 86_400
+
+
+def stage_importance(stage: str) -> int:
+    """Importance of a competition stage (5 group stage ... 10 final)"""
+    stage = (stage or '').lower()
+    for name, importance in STAGE_IMPORTANCE.items():
+        if name in stage:
+            return importance
+    return DEFAULT_STAGE_IMPORTANCE
+
+
+def venue_advantage(home_elo: float, away_elo: float, venue: str = '') -> float:
+    """Small home bonus that shrinks when either side is clearly stronger"""
+    elo_diff = home_elo - away_elo
+    if elo_diff < -80:
+        return 0.05
+    if elo_diff > 80:
+        return 0.10
+    advantage = 0.15
+    if venue and any(name in venue for name in STRONG_HOME_VENUES):
+        advantage += 0.05
+    return advantage
+
+
+class FixtureFeatureStore:
+    """
+    Team state for resolving fixture features on the server
+
+    Finished results are applied once each (by match ID). ELO lives in an
+    EloStore, so a late result is replayed into the ratings; every team also
+    keeps its last `window` results in date order and every pairing its
+    meetings. Resolving a fixture reads that state only, with no scan of
+    the history.
+    """
+
+    def __init__(
+        self,
+        window: int = 5,
+        k_factor: float = 20,
+        initial_rating: float = 1500,
+        home_advantage: float = 100,
+        source_path: Optional[str] = None,
+        watch_interval: float = 0
+    ):
+        """
+        Args:
+            window: Number of recent matches in the form features
+            k_factor, initial_rating, home_advantage: ELO parameters
+            source_path: Results CSV read by refresh()
+            watch_interval: Seconds between refresh() calls once watch() starts, 0 disables
+        """
+        self.window = window
+        self.elo = EloStore(k_factor=k_factor, initial_rating=initial_rating, home_advantage=home_advantage)
+
+        self._lock = threading.RLock()
+        # team -> every applied result as (date, result, goals for, goals against, xG, xGA), oldest
+        # first; kept in full so form can be taken as of any date
+        self._recent: Dict[str, List[Tuple]] = {}
+        # (team_a, team_b) with team_a < team_b -> [(date, team_a goals, team_b goals), ...], oldest first
+        self._meetings: Dict[Tuple[str, str], List[Tuple[int, float, float]]] = {}
+
+        self.source_path = source_path
+        self.watch_interval = watch_interval
+        self._source_mtime: Optional[float] = None
+        self.refreshes = 0
+        self.updated_at: Optional[float] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self.elo)
+
+    def apply_results(self, results: Iterable[Dict]) -> int:
+        """
+        Apply finished results not seen before
+
+        Args:
+            results: Dicts with match_id, date, home_team, away_team,
+                home_goals, away_goals and optionally home_xg, away_xg
+
+        Returns:
+            Number of newly applied results
+        """
+        with self._lock:
+            new = []
+            seen = set()
+            for r in results:
+                match_id = str(r['match_id'])
+                if match_id in self.elo or match_id in seen:
+                    continue
+                seen.add(match_id)
+                new.append(r)
+            if not new:
+                return 0
+
+            self.elo.apply_matches({
+                'match_id': r['match_id'], 'date': r['date'],
+                'home_team': r['home_team'], 'away_team': r['away_team'],
+                'home_score': r['home_goals'], 'away_score': r['away_goals']
+            } for r in new)
+
+            for r in new:
+                date = to_epoch(r['date'])
+                home_team, away_team = r['home_team'], r['away_team']
+                home_goals, away_goals = float(r['home_goals']), float(r['away_goals'])
+                home_xg, away_xg = _xg(r.get('home_xg')), _xg(r.get('away_xg'))
+                home_result = 'W' if home_goals > away_goals else 'L' if home_goals < away_goals else 'D'
+                away_result = {'W': 'L', 'L': 'W', 'D': 'D'}[home_result]
+
+                self._remember(home_team, (date, home_result, home_goals, away_goals, home_xg, away_xg))
+                self._remember(away_team, (date, away_result, away_goals, home_goals, away_xg, home_xg))
+
+                if home_team <= away_team:
+                    meeting, key = (date, home_goals, away_goals), (home_team, away_team)
+                else:
+                    meeting, key = (date, away_goals, home_goals), (away_team, home_team)
+                insort(self._meetings.setdefault(key, []), meeting, key=lambda m: m[0])
+
+            self.updated_at = time.time()
+            return len(new)
+
+    def _remember(self, team: str, entry: Tuple):
+        # A late result lands in date order
+        insort(self._recent.setdefault(team, []), entry, key=lambda e: e[0])
+
+    @staticmethod
+    def _before(entries: List[Tuple], when: Optional[int]) -> List[Tuple]:
+        """Date-ordered entries strictly before epoch `when` (all of them for None)"""
+        if when is None:
+            return list(entries)
+        return entries[:bisect_left(entries, when, key=lambda e: e[0])]
+
+    def team_form(self, team: str, as_of=None) -> Dict[str, float]:
+        """
+        Form over a team's last `window` results
+
+        Args:
+            team: Team name
+            as_of: Date; only results strictly before it count (None = all)
+
+        Returns:
+            Dict with form (points per game), goals, goals_conceded, xg and
+            xga (totals) and matches; all 0 for a team with no results
+        """
+        when = None if as_of is None else to_epoch(as_of)
+        with self._lock:
+            recent = self._before(self._recent.get(team, []), when)[-self.window:]
+        if not recent:
+            return {'form': 0.0, 'goals': 0, 'goals_conceded': 0, 'xg': 0.0, 'xga': 0.0, 'matches': 0}
+
+        _, results, goals, conceded, xg, xga = zip(*recent)
+        return {
+            'form': FormCalculator.calculate_points_form(list(results), self.window),
+            'goals': int(sum(goals)),
+            'goals_conceded': int(sum(conceded)),
+            'xg': float(sum(xg)),
+            'xga': float(sum(xga)),
+            'matches': len(recent)
+        }
+
+    def h2h(self, home_team: str, away_team: str, as_of=None) -> Dict[str, int]:
+        """Earlier meetings (strictly before as_of, if given) counted from the home side's view"""
+        when = None if as_of is None else to_epoch(as_of)
+        swapped = home_team > away_team
+        key = (away_team, home_team) if swapped else (home_team, away_team)
+        with self._lock:
+            earlier = self._before(self._meetings.get(key, []), when)
+        meetings = [(b, a) if swapped else (a, b) for _, a, b in earlier]
+        stats = calculate_h2h_stats(meetings, [(b, a) for a, b in meetings])
+        return {'home_wins': stats['wins'], 'draws': stats['draws'], 'away_wins': stats['losses']}
+
+    def rest_days(self, team: str, date=None) -> int:
+        """Whole days since the team's previous match (DEFAULT_REST_DAYS if none)"""
+        when = to_epoch(date if date is not None else pd.Timestamp.now(tz='UTC'))
+        last = self.elo.last_played(team, as_of=when)
+        if last is None:
+            return DEFAULT_REST_DAYS
+        return int((when - last) // SECONDS_PER_DAY)
+
+    def fixture_features(
+        self,
+        home_team: str,
+        away_team: str,
+        date=None,
+        stage: str = '',
+        venue: str = ''
+    ) -> Dict[str, float]:
+        """
+        The 23 match features for a fixture
+
+        Every feature is point-in-time: ELO ratings, form, head-to-head and
+        rest days only use results dated strictly before the fixture date
+        (default now: every result applied so far), so a past fixture never
+        sees its own result or later ones.
+
+        Returns:
+            Dict keyed by MATCH_FEATURE_NAMES
+        """
+        when = None if date is None else to_epoch(date)
+        home_elo = self.elo.rating(home_team, as_of=when)
+        away_elo = self.elo.rating(away_team, as_of=when)
+        elo_diff = home_elo - away_elo
+        home_form = self.team_form(home_team, as_of=when)
+        away_form = self.team_form(away_team, as_of=when)
+        h2h = self.h2h(home_team, away_team, as_of=when)
+        venue_bonus = venue_advantage(home_elo, away_elo, venue)
+        elo_gap = abs(elo_diff)
+
+        features = {
+            'home_elo': home_elo,
+            'away_elo': away_elo,
+            'elo_diff': elo_diff,
+            'home_form_last5': home_form['form'],
+            'away_form_last5': away_form['form'],
+            'home_goals_last5': home_form['goals'],
+            'away_goals_last5': away_form['goals'],
+            'home_xg_last5': home_form['xg'],
+            'away_xg_last5': away_form['xg'],
+            'h2h_home_wins': h2h['home_wins'],
+            'h2h_draws': h2h['draws'],
+            'h2h_away_wins': h2h['away_wins'],
+            'home_possession_avg': 52 + (home_elo - 1700) / 50,
+            'away_possession_avg': 48 + (away_elo - 1700) / 50,
+            'venue_advantage': venue_bonus,
+            'stage_importance': stage_importance(stage),
+            'home_rest_days': self.rest_days(home_team, when),
+            'away_rest_days': self.rest_days(away_team, when),
+            'elo_gap_magnitude': elo_gap,
+            'underdog_factor': 1 if away_elo > home_elo else 0,
+            'quality_tier_home': quality_tier(home_elo),
+            'quality_tier_away': quality_tier(away_elo),
+            'strength_adjusted_venue': venue_bonus * (1 - min(elo_gap / 200, 0.8))
+        }
+        return {name: features[name] for name in MATCH_FEATURE_NAMES}
+
+    def load_results(self, path: str) -> int:
+        """
+        Apply the finished results in a CSV file (RESULT_COLUMNS; extra columns ignored)
+
+        Rows with a status other than FINISHED or without goals are skipped.
+        """
+        df = pd.read_csv(path)
+        if 'status' in df:
+            df = df[df['status'] == 'FINISHED']
+        df = df.dropna(subset=['homeGoals', 'awayGoals'])
+        for column in ('homeXg', 'awayXg'):
+            if column not in df:
+                df[column] = None
+
+        return self.apply_results(
+            {
+                'match_id': match_id, 'date': date,
+                'home_team': home_team, 'away_team': away_team,
+                'home_goals': home_goals, 'away_goals': away_goals,
+                'home_xg': home_xg, 'away_xg': away_xg
+            }
+            for match_id, date, home_team, away_team, home_goals, away_goals, home_xg, away_xg in zip(
+                *(df[column] for column in RESULT_COLUMNS)
+            )
+        )
+
+    def refresh(self) -> int:
+        """Apply new results from source_path if the file changed since the last read"""
+        if not self.source_path:
+            return 0
+        try:
+            mtime = os.stat(self.source_path).st_mtime
+        except FileNotFoundError:
+            return 0
+        if mtime == self._source_mtime:
+            return 0
+        applied = self.load_results(self.source_path)
+        self._source_mtime = mtime
+        self.refreshes += 1
+        return applied
+
+    def watch(self):
+        """Poll source_path every watch_interval seconds and apply new results"""
+        interval = self.watch_interval
+        if interval <= 0 or not self.source_path or self._watcher is not None:
+            return
+
+        def poll():
+            while not self._stop.wait(interval):
+                try:
+                    applied = self.refresh()
+                    if applied:
+                        logger.info("feature store: applied %d new results", applied)
+                except Exception:
+                    logger.exception("feature store refresh failed")
+
+        self._watcher = threading.Thread(target=poll, name='feature-store-watch', daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict:
+        return {
+            'results': len(self.elo),
+            'teams': len(self._recent),
+            'source_path': self.source_path,
+            'refreshes': self.refreshes,
+            'updated_at': self.updated_at,
+            'watching': self._watcher is not None
+        }
+
+
+def _xg(value) -> float:
+    """xG of a result; 0 when not recorded"""
+    if value is None or value != value:
+        return 0.0
+    return float(value)
+
+
+def create_feature_store() -> Optional[FixtureFeatureStore]:
+    """
+    Build the fixture feature store from a results file
+
+    Environment:
+        FEATURE_RESULTS_PATH: CSV of finished results (unset: no store, /predict/fixture disabled)
+        FEATURE_REFRESH_INTERVAL: Seconds between checks of the file for new results, 0 disables (default 60)
+    """
+    path = os.getenv('FEATURE_RESULTS_PATH')
+    if not path:
+        return None
+
+    store = FixtureFeatureStore(
+        source_path=path,
+        watch_interval=float(os.getenv('FEATURE_REFRESH_INTERVAL', '60'))
+    )
+    try:
+        store.refresh()
+    except Exception:
+        logger.exception("feature store: could not load %s", path)
+    return store
+
+
+__all__ = [
+    'FixtureFeatureStore',
+    'create_feature_store',
+    'quality_tier',
+    'stage_importance',
+    'venue_advantage'
+]
@@ -0,0 +1,129 @@
+"""
+Inference Executor
+Bounded thread pool that keeps CPU-bound model calls off the event loop
+and rejects work instead of queueing it without limit
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+class ExecutorSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Inference capacity exhausted, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """
+    Thread pool for model inference with a hard cap on outstanding work
+
+    XGBoost and SHAP release the GIL while predicting, so several calls can
+    run in parallel while the event loop keeps serving other requests. At
+    most max_workers calls run and max_queue more wait; beyond that run()
+    raises ExecutorSaturated straight away so latency stays bounded.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 32, retry_after: int = 1):
+        """
+        Args:
+            max_workers: Threads running inference
+            max_queue: Calls allowed to wait for a free thread
+            retry_after: Seconds suggested to rejected clients
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='inference')
+        self._lock = threading.Lock()
+        self._outstanding = 0
+
+        self.submitted = 0
+        self.rejected = 0
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            if self._outstanding >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                return False
+            self._outstanding += 1
+            self.submitted += 1
+            return True
+
+    def _release(self):
+        with self._lock:
+            self._outstanding -= 1
+
+    def _call(self, fn: Callable, context: contextvars.Context):
+        # Released when the work finishes, even if the awaiting request was cancelled
+        try:
+            return context.run(fn)
+        finally:
+            self._release()
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the pool and await its result
+
+        Context variables (e.g. the request ID used for logging) are carried
+        into the worker thread.
+
+        Raises:
+            ExecutorSaturated: No worker or queue slot is free
+        """
+        if not self._acquire():
+            raise ExecutorSaturated(self.retry_after)
+
+        call = functools.partial(fn, *args, **kwargs)
+        try:
+            future = self._pool.submit(self._call, call, contextvars.copy_context())
+        except RuntimeError:
+            # Pool already shut down: the slot was never handed to a worker
+            self._release()
+            raise
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict:
+        """Pool size, queue limit and current load"""
+        with self._lock:
+            outstanding = self._outstanding
+            return {
+                'workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'running': min(outstanding, self.max_workers),
+                'queued': max(0, outstanding - self.max_workers),
+                'submitted': self.submitted,
+                'rejected': self.rejected
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+
+def create_inference_executor(max_workers: Optional[int] = None) -> InferenceExecutor:
+    """
+    Build an executor from environment settings
+
+    Environment:
+        INFERENCE_WORKERS: Inference threads per server process (default min(4, CPUs))
+        INFERENCE_QUEUE_DEPTH: Calls allowed to wait for a thread (default 32)
+        INFERENCE_RETRY_AFTER: Retry-After seconds sent with 429 responses (default 1)
+    """
+    if max_workers is None:
+        max_workers = int(os.getenv('INFERENCE_WORKERS', str(min(4, os.cpu_count() or 1))))
+    return InferenceExecutor(
+        max_workers=max(1, max_workers),
+        max_queue=max(0, int(os.getenv('INFERENCE_QUEUE_DEPTH', '32'))),
+        retry_after=max(1, int(os.getenv('INFERENCE_RETRY_AFTER', '1')))
+    )
+
+
+__all__ = ['ExecutorSaturated', 'InferenceExecutor', 'create_inference_executor']
@@ -0,0 +1,349 @@
+"""
+Streaming Match Feature Builder
+Form, xG, possession and head-to-head features for a whole match history
+in one chronological pass
+"""
+
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Training feature layout (23 features, the MatchOutcomePredictor order),
+# shared by extraction and the saved dataset
+TRAINING_FEATURES = [
+    'home_elo', 'away_elo', 'elo_diff',
+    'home_form_last5', 'away_form_last5',
+    'home_goals_last5', 'away_goals_last5',
+    'home_xg_last5', 'away_xg_last5',
+    'h2h_home_wins', 'h2h_draws', 'h2h_away_wins',
+    'home_possession_avg', 'away_possession_avg',
+    'venue_advantage', 'stage_importance',
+    'home_rest_days', 'away_rest_days',
+    'elo_gap_magnitude', 'underdog_factor',
+    'quality_tier_home', 'quality_tier_away',
+    'strength_adjusted_venue'
+]
+
+# Features of a team with no finished match yet
+DEFAULT_FORM = {'form': 1.5, 'goals': 5, 'xg': 5.0, 'possession': 50}
+
+# Stand-ins while the matches table has no per-match possession
+HOME_POSSESSION = 55
+AWAY_POSSESSION = 45
+
+# xG used when a finished match has none recorded
+DEFAULT_XG = 1.5
+
+
+def goals_proxy(xg_total):
+    """
+    Whole xG total, the goals proxy of the form features (scalar or array)
+
+    Rounded to 4 decimals before flooring so float32 storage error cannot
+    drop a total like 5.0 (stored as 4.9999999) to 4. Every feature path
+    goes through this, so served and training features agree.
+    """
+    goals = np.floor(np.round(xg_total, 4))
+    return int(goals) if np.ndim(goals) == 0 else goals
+
+
+def quality_tier(elo):
+    """1 = elite (>1850), 2 = strong (>1750), 3 = mid (scalar or array)"""
+    tier = np.where(np.greater(elo, 1850), 1, np.where(np.greater(elo, 1750), 2, 3))
+    return int(tier) if np.ndim(tier) == 0 else tier
+
+
+def add_strength_features(columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Add the five strength-gap features (elo_gap_magnitude ... strength_adjusted_venue)
+
+    Computed from the home_elo, away_elo and venue_advantage columns with the
+    definitions the server's FixtureFeatureStore and the TypeScript feature
+    engineering use, so extracted rows match served and exported ones.
+    """
+    home_elo = np.asarray(columns['home_elo'], dtype=np.float64)
+    away_elo = np.asarray(columns['away_elo'], dtype=np.float64)
+    elo_gap = np.abs(home_elo - away_elo)
+    columns['elo_gap_magnitude'] = elo_gap
+    columns['underdog_factor'] = (away_elo > home_elo).astype(np.float64)
+    columns['quality_tier_home'] = quality_tier(home_elo)
+    columns['quality_tier_away'] = quality_tier(away_elo)
+    columns['strength_adjusted_venue'] = columns['venue_advantage'] * (1 - np.minimum(elo_gap / 200, 0.8))
+    return columns
+
+
+def kickoff_ns(dates: pd.Series) -> np.ndarray:
+    """Kick-off times as int64 nanoseconds since the epoch (UTC)"""
+    utc = pd.to_datetime(dates, utc=True).dt.tz_convert(None)
+    return utc.to_numpy().astype('datetime64[ns]').view(np.int64)
+
+
+def match_points(win_prob: float, opponent_win_prob: float) -> int:
+    """League points for a side, taking the likelier side as the winner (3 win, 1 draw, 0 loss)"""
+    if win_prob > opponent_win_prob:
+        return 3
+    if win_prob < opponent_win_prob:
+        return 0
+    return 1
+
+
+class MatchFeatureBuilder:
+    """
+    Rolling per-team and per-pair state, updated one finished match at a time
+
+    Each team keeps a ring buffer of its last `window` matches (points, xG,
+    possession) and each pairing keeps win/draw counters, so looking up or
+    updating a match is O(window) regardless of history length. Features
+    computed by team_form() and h2h() reflect only the matches applied so
+    far, i.e. the state before the next match.
+    """
+
+    def __init__(self, window: int = 5):
+        """
+        Args:
+            window: Number of recent matches in the form features
+        """
+        self.window = window
+        self._recent: Dict[str, Deque[Tuple[int, float, int]]] = {}
+        # (team_a, team_b) with team_a < team_b -> [team_a wins, draws, team_b wins]
+        self._h2h: Dict[Tuple[str, str], List[int]] = {}
+        self.matches_applied = 0
+        # Last kick-off group seen by build(flush=False), applied once a later kick-off arrives
+        self._pending: List[Tuple] = []
+        self._pending_kickoff: Optional[int] = None
+
+    def team_form(self, team: str) -> Dict:
+        """
+        Form over the team's last `window` matches
+
+        Returns:
+            Dict with form (points per game), goals (whole xG total, the
+            goals proxy), xg (total) and possession (average)
+        """
+        recent = self._recent.get(team)
+        if not recent:
+            return dict(DEFAULT_FORM)
+
+        xg = 0
+        points = possession = 0
+        for entry_points, entry_xg, entry_possession in recent:
+            points += entry_points
+            xg += entry_xg
+            possession += entry_possession
+        return {
+            'form': points / len(recent),
+            'goals': goals_proxy(xg),
+            'xg': xg,
+            'possession': possession / len(recent)
+        }
+
+    def h2h(self, home_team: str, away_team: str) -> Dict[str, int]:
+        """Wins of each side and draws in earlier meetings, from the home side's view"""
+        if home_team <= away_team:
+            counts = self._h2h.get((home_team, away_team))
+            if counts is None:
+                return {'home_wins': 0, 'draws': 0, 'away_wins': 0}
+            return {'home_wins': counts[0], 'draws': counts[1], 'away_wins': counts[2]}
+
+        counts = self._h2h.get((away_team, home_team))
+        if counts is None:
+            return {'home_wins': 0, 'draws': 0, 'away_wins': 0}
+        return {'home_wins': counts[2], 'draws': counts[1], 'away_wins': counts[0]}
+
+    def update(
+        self,
+        home_team: str,
+        away_team: str,
+        home_win_prob: float,
+        away_win_prob: float,
+        home_xg: float,
+        away_xg: float
+    ):
+        """Apply one finished match to the rolling state"""
+        if home_xg is None or home_xg != home_xg:
+            home_xg = DEFAULT_XG
+        if away_xg is None or away_xg != away_xg:
+            away_xg = DEFAULT_XG
+
+        home_points = match_points(home_win_prob, away_win_prob)
+        away_points = match_points(away_win_prob, home_win_prob)
+
+        for team, entry in ((home_team, (home_points, home_xg, HOME_POSSESSION)),
+                            (away_team, (away_points, away_xg, AWAY_POSSESSION))):
+            recent = self._recent.get(team)
+            if recent is None:
+                recent = self._recent[team] = deque(maxlen=self.window)
+            recent.append(entry)
+
+        # 0 home win, 1 draw, 2 away win
+        outcome = 0 if home_points == 3 else 1 if home_points == 1 else 2
+        if home_team <= away_team:
+            self._h2h.setdefault((home_team, away_team), [0, 0, 0])[outcome] += 1
+        else:
+            self._h2h.setdefault((away_team, home_team), [0, 0, 0])[2 - outcome] += 1
+        self.matches_applied += 1
+
+    def state(self) -> Dict:
+        """JSON-serializable rolling state, including the pending kick-off group"""
+        return {
+            'window': self.window,
+            'matches_applied': self.matches_applied,
+            'recent': {team: [list(entry) for entry in recent] for team, recent in self._recent.items()},
+            'h2h': [[team_a, team_b, *counts] for (team_a, team_b), counts in self._h2h.items()],
+            'pending': [list(match) for match in self._pending],
+            'pending_kickoff': self._pending_kickoff
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'MatchFeatureBuilder':
+        """Restore a builder saved with state(); the next build() continues where it stopped"""
+        builder = cls(state['window'])
+        builder.matches_applied = state['matches_applied']
+        for team, entries in state['recent'].items():
+            builder._recent[team] = deque((tuple(entry) for entry in entries), maxlen=builder.window)
+        for team_a, team_b, *counts in state['h2h']:
+            builder._h2h[(team_a, team_b)] = counts
+        builder._pending = [tuple(match) for match in state['pending']]
+        builder._pending_kickoff = state['pending_kickoff']
+        return builder
+
+    def flush(self):
+        """Apply the kick-off group held back by build(flush=False)"""
+        for match in self._pending:
+            self.update(*match)
+        self._pending = []
+        self._pending_kickoff = None
+
+    def build(self, matches_df: pd.DataFrame, flush: bool = True) -> Dict[str, np.ndarray]:
+        """
+        Pre-match form and head-to-head features for every match, then apply them all
+
+        Matches are walked in date order. All matches sharing a kick-off time
+        are featurized before any of them is applied, so a row never sees its
+        own result or one from the same moment.
+
+        Successive calls continue from the state left by earlier ones, so a
+        history can be fed in chronological batches. With flush=False the
+        last kick-off group stays pending, in case the next batch starts with
+        more matches from the same kick-off; call flush() after the last batch.
+
+        Args:
+            matches_df: Finished matches with homeTeam, awayTeam, date,
+                homeWinProb, awayWinProb, homeXg and awayXg
+            flush: Apply the last kick-off group before returning
+
+        Returns:
+            Feature columns (TRAINING_FEATURES names) aligned with the rows of matches_df
+        """
+        # Plain lists: per-element access is far cheaper than indexing arrays
+        home_teams = np.asarray(matches_df['homeTeam'], dtype=object).tolist()
+        away_teams = np.asarray(matches_df['awayTeam'], dtype=object).tolist()
+        home_probs = np.asarray(matches_df['homeWinProb'], dtype=np.float64).tolist()
+        away_probs = np.asarray(matches_df['awayWinProb'], dtype=np.float64).tolist()
+        home_xgs = np.asarray(matches_df['homeXg'], dtype=np.float64).tolist()
+        away_xgs = np.asarray(matches_df['awayXg'], dtype=np.float64).tolist()
+        n = len(home_teams)
+        kickoff = kickoff_ns(matches_df['date'])
+        order = np.argsort(kickoff, kind='stable').tolist()
+        kickoff = kickoff.tolist()
+
+        names = [
+            'home_form_last5', 'away_form_last5',
+            'home_goals_last5', 'away_goals_last5',
+            'home_xg_last5', 'away_xg_last5',
+            'h2h_home_wins', 'h2h_draws', 'h2h_away_wins',
+            'home_possession_avg', 'away_possession_avg'
+        ]
+        columns = {name: np.empty(n, dtype=np.float64) for name in names}
+        (home_form_col, away_form_col, home_goals_col, away_goals_col, home_xg_col, away_xg_col,
+         h2h_home_col, h2h_draw_col, h2h_away_col, home_poss_col, away_poss_col) = columns.values()
+
+        for i in order:
+            if kickoff[i] != self._pending_kickoff:
+                self.flush()
+                self._pending_kickoff = kickoff[i]
+
+            home_form = self.team_form(home_teams[i])
+            away_form = self.team_form(away_teams[i])
+            h2h = self.h2h(home_teams[i], away_teams[i])
+
+            home_form_col[i] = home_form['form']
+            away_form_col[i] = away_form['form']
+            home_goals_col[i] = home_form['goals']
+            away_goals_col[i] = away_form['goals']
+            home_xg_col[i] = home_form['xg']
+            away_xg_col[i] = away_form['xg']
+            h2h_home_col[i] = h2h['home_wins']
+            h2h_draw_col[i] = h2h['draws']
+            h2h_away_col[i] = h2h['away_wins']
+            home_poss_col[i] = home_form['possession']
+            away_poss_col[i] = away_form['possession']
+            self._pending.append((home_teams[i], away_teams[i], home_probs[i], away_probs[i],
+                                  home_xgs[i], away_xgs[i]))
+
+        if flush:
+            self.flush()
+        return columns
+
+
+def build_training_features(
+    matches_df: pd.DataFrame,
+    elo_store,
+    window: int = 5,
+    builder: Optional[MatchFeatureBuilder] = None,
+    flush: bool = True
+) -> np.ndarray:
+    """
+    Training feature matrix for a finished-match history
+
+    Args:
+        matches_df: Finished matches (see MatchFeatureBuilder.build)
+        elo_store: EloStore holding these matches; each row uses the ratings from before kick-off
+        window: Number of recent matches in the form features
+        builder: Builder holding the state of earlier batches (None = start from an empty history)
+        flush: Passed to MatchFeatureBuilder.build
+
+    Returns:
+        Feature matrix (n_matches, 23) in TRAINING_FEATURES order
+    """
+    if builder is None:
+        builder = MatchFeatureBuilder(window)
+    columns = builder.build(matches_df, flush=flush)
+
+    kickoff = kickoff_ns(matches_df['date']) // 10**9
+    columns['home_elo'] = np.array([
+        elo_store.rating(team, as_of=int(when))
+        for team, when in zip(matches_df['homeTeam'], kickoff)
+    ])
+    columns['away_elo'] = np.array([
+        elo_store.rating(team, as_of=int(when))
+        for team, when in zip(matches_df['awayTeam'], kickoff)
+    ])
+    columns['elo_diff'] = columns['home_elo'] - columns['away_elo']
+
+    # Not in the matches table yet: every row is a home-venue Champions League match
+    columns['venue_advantage'] = 1
+    columns['stage_importance'] = 8
+    columns['home_rest_days'] = 4
+    columns['away_rest_days'] = 4
+    add_strength_features(columns)
+
+    X = np.empty((len(matches_df), len(TRAINING_FEATURES)), dtype=np.float32)
+    for position, name in enumerate(TRAINING_FEATURES):
+        X[:, position] = columns[name]
+    return X
+
+
+__all__ = [
+    'DEFAULT_FORM',
+    'MatchFeatureBuilder',
+    'TRAINING_FEATURES',
+    'add_strength_features',
+    'build_training_features',
+    'goals_proxy',
+    'kickoff_ns',
+    'match_points',
+    'quality_tier'
+]
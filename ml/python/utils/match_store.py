@@ -0,0 +1,244 @@
+"""
+Columnar Match Store
+Finished matches as typed NumPy columns with teams interned to int32 IDs
+and a CSR index of each team's matches, for point-in-time lookups by slicing
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.elo_vectorized import EncodedMatches, replay_elo
+from utils.match_features import (
+    AWAY_POSSESSION, DEFAULT_FORM, DEFAULT_XG, HOME_POSSESSION, goals_proxy, kickoff_ns
+)
+
+NS_PER_DAY = 86_400 * 10**9
+
+
+def infer_match_scores(matches_df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Stand-in scores derived from the stored outcome probabilities
+
+    The matches table has no final score, so the most likely outcome is
+    taken as the result: 2-1 home win, 1-2 away win, otherwise 1-1.
+    """
+    home = matches_df['homeWinProb'].fillna(0).to_numpy()
+    draw = matches_df['drawProb'].fillna(0).to_numpy()
+    away = matches_df['awayWinProb'].fillna(0).to_numpy()
+    home_win = (home > away) & (home > draw)
+    away_win = (away > home) & (away > draw)
+    home_score = np.where(home_win, 2, 1)
+    away_score = np.where(away_win, 2, 1)
+    return home_score, away_score
+
+
+def epoch_day(value) -> int:
+    """Days since 1970-01-01 (UTC) for a datetime, date or ISO string"""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert('UTC').tz_localize(None)
+    return int(ts.value // NS_PER_DAY)
+
+
+class MatchStore:
+    """
+    Chronological, integer-encoded match list
+
+    Columns are parallel arrays over matches sorted by kick-off: int32 team
+    IDs, int64 epoch days and float32 scores, xG and outcome probabilities.
+    team_offsets / team_index form a CSR index: the matches of team t are
+    team_index[team_offsets[t]:team_offsets[t + 1]], oldest first, with
+    their days alongside in team_days, so a team's history up to a date is
+    one binary search and one slice.
+
+    Dates have day resolution: "before a date" excludes every match played
+    on that day.
+    """
+
+    def __init__(
+        self,
+        teams: np.ndarray,
+        home: np.ndarray,
+        away: np.ndarray,
+        days: np.ndarray,
+        home_score: np.ndarray,
+        away_score: np.ndarray,
+        home_xg: np.ndarray,
+        away_xg: np.ndarray,
+        home_win_prob: np.ndarray,
+        draw_prob: np.ndarray,
+        away_win_prob: np.ndarray,
+        match_ids: Optional[np.ndarray] = None,
+        source_rows: Optional[np.ndarray] = None
+    ):
+        """
+        Args:
+            teams: Team name per ID
+            home, away: Team IDs per match, matches in chronological order
+            days: Epoch day per match (non-decreasing)
+            home_score, away_score, home_xg, away_xg: Per-match results
+            home_win_prob, draw_prob, away_win_prob: Stored outcome probabilities
+            match_ids: Source match ID per match
+            source_rows: Row position of each match in the frame it was built from
+        """
+        self.teams = np.asarray(teams, dtype=object)
+        self.team_ids: Dict[str, int] = {name: i for i, name in enumerate(self.teams)}
+        self.home = np.asarray(home, dtype=np.int32)
+        self.away = np.asarray(away, dtype=np.int32)
+        self.days = np.asarray(days, dtype=np.int64)
+        self.home_score = np.asarray(home_score, dtype=np.float32)
+        self.away_score = np.asarray(away_score, dtype=np.float32)
+        self.home_xg = np.asarray(home_xg, dtype=np.float32)
+        self.away_xg = np.asarray(away_xg, dtype=np.float32)
+        self.home_win_prob = np.asarray(home_win_prob, dtype=np.float32)
+        self.draw_prob = np.asarray(draw_prob, dtype=np.float32)
+        self.away_win_prob = np.asarray(away_win_prob, dtype=np.float32)
+        self.match_ids = match_ids
+        self.source_rows = source_rows
+        self._build_index()
+
+    def _build_index(self):
+        n = len(self.home)
+        team = np.concatenate([self.home, self.away])
+        match = np.concatenate([np.arange(n, dtype=np.int32)] * 2)
+        # Group by team; within a team keep chronological (= index) order
+        order = np.lexsort((match, team))
+        self.team_index = match[order]
+        self.team_days = self.days[self.team_index]
+        self.team_offsets = np.zeros(self.n_teams + 1, dtype=np.int64)
+        np.cumsum(np.bincount(team, minlength=self.n_teams), out=self.team_offsets[1:])
+
+    @classmethod
+    def from_frame(cls, matches_df: pd.DataFrame) -> 'MatchStore':
+        """
+        Build from finished matches as returned by UCLDataExtractor.fetch_matches
+
+        Scores come from homeScore/awayScore columns when present, otherwise
+        from infer_match_scores.
+        """
+        order = np.argsort(kickoff_ns(matches_df['date']), kind='stable')
+        df = matches_df.iloc[order]
+        n = len(df)
+
+        codes, teams = pd.factorize(pd.concat([df['homeTeam'], df['awayTeam']], ignore_index=True))
+        if 'homeScore' in df and 'awayScore' in df:
+            home_score, away_score = df['homeScore'].to_numpy(), df['awayScore'].to_numpy()
+        else:
+            home_score, away_score = infer_match_scores(df)
+
+        return cls(
+            teams=np.asarray(teams, dtype=object),
+            home=codes[:n],
+            away=codes[n:],
+            days=kickoff_ns(df['date']) // NS_PER_DAY,
+            home_score=home_score,
+            away_score=away_score,
+            home_xg=df['homeXg'].fillna(DEFAULT_XG).to_numpy(),
+            away_xg=df['awayXg'].fillna(DEFAULT_XG).to_numpy(),
+            home_win_prob=df['homeWinProb'].to_numpy(),
+            draw_prob=df['drawProb'].to_numpy(),
+            away_win_prob=df['awayWinProb'].to_numpy(),
+            match_ids=df['id'].to_numpy() if 'id' in df else None,
+            source_rows=order
+        )
+
+    @property
+    def n_teams(self) -> int:
+        return len(self.teams)
+
+    def __len__(self) -> int:
+        return len(self.home)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the numeric columns and the CSR index"""
+        return sum(getattr(self, name).nbytes for name in (
+            'home', 'away', 'days', 'home_score', 'away_score', 'home_xg', 'away_xg',
+            'home_win_prob', 'draw_prob', 'away_win_prob', 'team_index', 'team_days', 'team_offsets'
+        ))
+
+    def team_id(self, team) -> int:
+        """ID of a team name (IDs pass through); -1 if unknown"""
+        if isinstance(team, (int, np.integer)):
+            return int(team)
+        return self.team_ids.get(team, -1)
+
+    def team_matches(self, team, before=None) -> np.ndarray:
+        """
+        Indices of a team's matches, oldest first
+
+        Args:
+            team: Team name or ID
+            before: Date or epoch day; only matches on earlier days (None = all)
+        """
+        tid = self.team_id(team)
+        if tid < 0:
+            return np.empty(0, dtype=np.int32)
+        start, end = self.team_offsets[tid], self.team_offsets[tid + 1]
+        if before is not None:
+            day = before if isinstance(before, (int, np.integer)) else epoch_day(before)
+            end = start + np.searchsorted(self.team_days[start:end], day, side='left')
+        return self.team_index[start:end]
+
+    def team_form(self, team, before=None, n_matches: int = 5) -> Dict:
+        """
+        Form over a team's last n matches before a date
+
+        Same metrics as UCLDataExtractor.calculate_team_form: points per game
+        (likelier side wins), xG total as goals proxy, xG total, possession.
+        """
+        recent = self.team_matches(team, before)[-n_matches:]
+        if len(recent) == 0:
+            return dict(DEFAULT_FORM)
+
+        is_home = self.home[recent] == self.team_id(team)
+        own_prob = np.where(is_home, self.home_win_prob[recent], self.away_win_prob[recent])
+        opp_prob = np.where(is_home, self.away_win_prob[recent], self.home_win_prob[recent])
+        points = np.where(own_prob > opp_prob, 3, np.where(own_prob < opp_prob, 0, 1))
+        xg = float(np.where(is_home, self.home_xg[recent], self.away_xg[recent]).sum(dtype=np.float64))
+
+        return {
+            'form': float(points.mean()),
+            'goals': goals_proxy(xg),
+            'xg': xg,
+            'possession': float(np.where(is_home, HOME_POSSESSION, AWAY_POSSESSION).mean())
+        }
+
+    def h2h(self, home_team, away_team, before=None) -> Dict[str, int]:
+        """Earlier meetings of two teams, counted from home_team's view"""
+        home_id, away_id = self.team_id(home_team), self.team_id(away_team)
+        if home_id < 0 or away_id < 0:
+            return {'home_wins': 0, 'draws': 0, 'away_wins': 0}
+
+        # Scan the shorter of the two histories for matches against the other team
+        scanned, other = home_id, away_id
+        matches = self.team_matches(home_id, before)
+        if self.team_offsets[away_id + 1] - self.team_offsets[away_id] < len(matches):
+            scanned, other = away_id, home_id
+            matches = self.team_matches(away_id, before)
+        opponent = self.home[matches] + self.away[matches] - scanned
+        meetings = matches[opponent == other]
+
+        is_home = self.home[meetings] == home_id
+        own_prob = np.where(is_home, self.home_win_prob[meetings], self.away_win_prob[meetings])
+        opp_prob = np.where(is_home, self.away_win_prob[meetings], self.home_win_prob[meetings])
+        home_wins = int((own_prob > opp_prob).sum())
+        away_wins = int((own_prob < opp_prob).sum())
+        return {'home_wins': home_wins, 'draws': len(meetings) - home_wins - away_wins, 'away_wins': away_wins}
+
+    def encoded(self) -> EncodedMatches:
+        """The history as EncodedMatches for the vectorized ELO replay (no copies of team columns)"""
+        result = np.sign(self.home_score.astype(np.float64) - self.away_score) * 0.5 + 0.5
+        dates = (self.days * 86_400).astype('datetime64[s]')
+        return EncodedMatches(self.home, self.away, result, dates, self.teams)
+
+    def elo_ratings(self, k_factor: float = 20, home_advantage: float = 100,
+                    initial_rating: float = 1500) -> Dict[str, float]:
+        """Final ELO rating of every team after replaying the whole history"""
+        ratings, _ = replay_elo(self.encoded(), k_factor, home_advantage, initial_rating)
+        return dict(zip(self.teams, ratings[0].tolist()))
+
+
+__all__ = ['MatchStore', 'epoch_day', 'infer_match_scores']
@@ -0,0 +1,168 @@
+"""
+Micro-Batching
+Coalesces concurrent single-item requests into one vectorized model call
+and fans the results back out to the waiting requests
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+
+class MicroBatcher:
+    """
+    Dynamic batching for one model pipeline
+
+    The first request to arrive opens a window of max_wait_ms. Requests
+    arriving within the window join the batch; the batch is flushed when
+    the window closes or max_batch_size items are waiting, whichever comes
+    first. process_batch runs once per batch on the inference executor and
+    returns one result per item; an Exception instance in the result list
+    is raised to that item's caller only.
+
+    Must be used from a single event loop (one per server worker).
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Any]],
+        executor,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        window: int = 1024
+    ):
+        """
+        Args:
+            process_batch: Vectorized function from a list of items to a list of results
+            executor: InferenceExecutor the batches run on
+            max_batch_size: Flush as soon as this many items are waiting
+            max_wait_ms: Longest time the first item of a batch waits
+            window: Number of recent batch sizes and item delays kept for percentiles
+        """
+        self.process_batch = process_batch
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+
+        self._pending: List[tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+        self.batches = 0
+        self.items = 0
+        self.size_histogram: Dict[int, int] = {}
+        self._recent_sizes = deque(maxlen=window)
+        self._recent_delays = deque(maxlen=window)
+        self.max_queue_delay = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_batch_size > 1 and self.max_wait > 0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result"""
+        if not self.enabled:
+            result = (await self.executor.run(self.process_batch, [item]))[0]
+            self._record(1, [0.0])
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[tuple]):
+        start = time.perf_counter()
+        self._record(len(batch), [start - enqueued for _, _, enqueued in batch])
+
+        try:
+            results = await self.executor.run(self.process_batch, [item for item, _, _ in batch])
+        except Exception as e:
+            # Whole batch failed (e.g. executor saturated): every caller sees the error
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue  # caller went away
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _record(self, size: int, delays: List[float]):
+        self.batches += 1
+        self.items += size
+        bucket = 1 << (size - 1).bit_length()
+        self.size_histogram[bucket] = self.size_histogram.get(bucket, 0) + 1
+        self._recent_sizes.append(size)
+        self._recent_delays.extend(delays)
+        self.max_queue_delay = max(self.max_queue_delay, max(delays))
+
+    def stats(self) -> Dict:
+        """Batch size and queueing delay metrics (delays in milliseconds)"""
+        sizes = np.asarray(self._recent_sizes, dtype=np.float64)
+        delays = np.asarray(self._recent_delays, dtype=np.float64) * 1000
+        return {
+            'enabled': self.enabled,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'batches': self.batches,
+            'items': self.items,
+            'mean_batch_size': self.items / self.batches if self.batches else 0.0,
+            'batch_size_histogram': {
+                f'<={bucket}': count for bucket, count in sorted(self.size_histogram.items())
+            },
+            'recent_batch_size_p50': float(np.percentile(sizes, 50)) if len(sizes) else 0.0,
+            'recent_batch_size_p95': float(np.percentile(sizes, 95)) if len(sizes) else 0.0,
+            'queue_delay_ms_p50': float(np.percentile(delays, 50)) if len(delays) else 0.0,
+            'queue_delay_ms_p95': float(np.percentile(delays, 95)) if len(delays) else 0.0,
+            'queue_delay_ms_p99': float(np.percentile(delays, 99)) if len(delays) else 0.0,
+            'queue_delay_ms_max': self.max_queue_delay * 1000,
+            'pending': len(self._pending)
+        }
+
+
+def create_micro_batcher(process_batch: Callable[[List[Any]], List[Any]], executor) -> MicroBatcher:
+    """
+    Build a batcher from environment settings
+
+    Environment:
+        MICRO_BATCH_MAX_SIZE: Items per batch before an early flush (default 32)
+        MICRO_BATCH_WAIT_MS: Batching window in milliseconds, 0 disables (default 2)
+    """
+    return MicroBatcher(
+        process_batch,
+        executor,
+        max_batch_size=int(os.getenv('MICRO_BATCH_MAX_SIZE', '32')),
+        max_wait_ms=float(os.getenv('MICRO_BATCH_WAIT_MS', '2'))
+    )
+
+
+__all__ = ['MicroBatcher', 'create_micro_batcher']
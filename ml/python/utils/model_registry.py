@@ -0,0 +1,341 @@
+"""
+Model Registry
+Holds the generation of models being served and replaces it with a freshly
+loaded and warmed one without restarting the server
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+import numpy as np
+
+from models.match_predictor import MatchOutcomePredictor, ExpectedGoalsPredictor
+from models.model_bundle import resolve_model_path
+from models.player_predictor import PlayerPerformancePredictor
+from explainability.explainer import MatchExplainer
+from explainability.global_importance import create_global_importance
+from utils.feature_matrix import model_columns
+from utils.prediction_cache import model_fingerprint
+
+logger = logging.getLogger('ucl_ml.model_registry')
+
+# Match models by status key and file stem (<stem>.bundle preferred over <stem>.pkl)
+MATCH_MODELS = {
+    'match_outcome': 'match_outcome_model',
+    'xg_home': 'xg_home_model',
+    'xg_away': 'xg_away_model'
+}
+
+
+class ModelReloadError(Exception):
+    """Raised when newly loaded models are incomplete and the current ones are kept"""
+
+
+class ReloadInProgress(ModelReloadError):
+    """Raised when a reload is requested while another one is running"""
+
+
+class ModelSet:
+    """
+    One generation of every served model
+
+    A set is never modified after it is published: a reload builds a new
+    set next to it. Request handlers read registry.current once and use that
+    set throughout, so a request that started before a swap finishes on the
+    models it started with.
+    """
+
+    def __init__(self):
+        self.version: Optional[str] = None
+        self.outcome_model = MatchOutcomePredictor()
+        self.xg_home = ExpectedGoalsPredictor()
+        self.xg_away = ExpectedGoalsPredictor()
+        self.player_predictor: Optional[PlayerPerformancePredictor] = None
+        # TreeExplainer is built on the first explain request unless the set is warmed
+        self.explainer = MatchExplainer(self.outcome_model, lazy=True)
+        self.global_importance = None
+        self.status = {name: False for name in (*MATCH_MODELS, 'player_predictor')}
+        self.loaded_at: Optional[str] = None
+        self.load_seconds = 0.0
+
+    @property
+    def ready(self) -> bool:
+        """True if every model needed for prediction is loaded"""
+        return all(self.status.values())
+
+    def info(self) -> Dict:
+        return {
+            'version': self.version,
+            'loaded_at': self.loaded_at,
+            'load_seconds': round(self.load_seconds, 3),
+            'models': dict(self.status)
+        }
+
+
+def set_version(model_set: ModelSet, model_path: str) -> str:
+    """
+    Model version of a loaded set
+
+    The bundle manifest version of the match models (joined with '+' if they
+    differ); a fingerprint of the model directory when any of them was loaded
+    from a legacy pickle, which carries no version.
+    """
+    versions = {m.model_version for m in (model_set.outcome_model, model_set.xg_home, model_set.xg_away)}
+    if None in versions:
+        return model_fingerprint(model_path)
+    return '+'.join(sorted(versions))
+
+
+def load_model_set(model_path: str, max_workers: int = 4) -> ModelSet:
+    """
+    Load every model from model_path into a new set, in parallel
+
+    The match models load concurrently with the player boosters, which are
+    themselves spread over the same pool. Failures are logged and reported
+    in the set's status rather than raised.
+    """
+    started = time.perf_counter()
+    model_set = ModelSet()
+    models = {
+        'match_outcome': model_set.outcome_model,
+        'xg_home': model_set.xg_home,
+        'xg_away': model_set.xg_away
+    }
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='model-load') as pool:
+        futures = {
+            name: pool.submit(models[name].load_model, resolve_model_path(model_path, stem))
+            for name, stem in MATCH_MODELS.items()
+        }
+
+        # Submitted from this thread (not a pool worker) so waiting on the map cannot deadlock
+        try:
+            model_set.player_predictor = PlayerPerformancePredictor(model_path=model_path, executor=pool)
+            model_set.status['player_predictor'] = True
+        except Exception:
+            logger.exception("player model loading failed")
+
+        for name, future in futures.items():
+            try:
+                future.result()
+                model_set.status[name] = True
+            except Exception:
+                logger.exception("model loading failed", extra={'fields': {'model': name}})
+
+    # Global importances are computed once per set and served pre-serialized
+    if model_set.status['match_outcome']:
+        try:
+            model_set.global_importance = create_global_importance(model_set.outcome_model, model_set.explainer)
+        except Exception:
+            logger.warning("global feature importance unavailable", exc_info=True)
+
+    model_set.version = set_version(model_set, model_path)
+    model_set.loaded_at = datetime.now(timezone.utc).isoformat()
+    model_set.load_seconds = time.perf_counter() - started
+    return model_set
+
+
+def warm_model_set(model_set: ModelSet):
+    """
+    Run one prediction through every model of a loaded set
+
+    Builds the lazily created pieces (fast-inference boosters, TreeExplainer)
+    so the first requests after a swap do not pay for them.
+    """
+    outcome = model_set.outcome_model
+    X = np.zeros((1, len(outcome.feature_names)))
+    outcome.predict_proba_batch(model_columns(X, outcome.feature_names))
+    for xg in (model_set.xg_home, model_set.xg_away):
+        xg.predict_batch(model_columns(X, xg.feature_names))
+
+    model_set.explainer._ensure_explainer()
+    if model_set.explainer.explainer is not None:
+        model_set.explainer.explain_batch(model_columns(X, outcome.feature_names), top_k=1)
+
+    # Player models are optional: a deployment without them (no player_features.json
+    # or no player_*.json boosters) has nothing to warm, and a failure here must not
+    # keep a good match model set from being published
+    player = model_set.player_predictor
+    if player is not None and player.feature_config and player.models:
+        positions = ['FWD', 'MID', 'DEF', 'GK']
+        try:
+            player.predict_batch(positions, [{} for _ in positions])
+        except Exception:
+            logger.warning("player model warm-up failed", exc_info=True)
+
+
+class ModelRegistry:
+    """
+    Current model set plus background reloading
+
+    reload() loads a complete new set, warms it and publishes it with a
+    single reference assignment. Only one reload runs at a time, and a set
+    with missing models never replaces a working one.
+    """
+
+    def __init__(self, model_path: str, max_workers: int = 4, watch_interval: float = 0):
+        """
+        Args:
+            model_path: Directory with the model bundles / pickles and player models
+            max_workers: Threads used to load one set
+            watch_interval: Seconds between checks of model_path by watch() (0 disables)
+        """
+        self.model_path = model_path
+        self.max_workers = max_workers
+        self.watch_interval = watch_interval
+        self.ready = threading.Event()
+
+        self._current = ModelSet()
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.reloads = 0
+        self.failed_reloads = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def current(self) -> ModelSet:
+        """The set new requests should use (read it once per request)"""
+        return self._current
+
+    def reload(self, warm: bool = True) -> ModelSet:
+        """
+        Load, warm and publish a new model set
+
+        Args:
+            warm: Run warm-up predictions (and build the TreeExplainer) before publishing
+
+        Returns:
+            The published set
+
+        Raises:
+            ReloadInProgress: Another reload is running
+            ModelReloadError: The new set is incomplete (or failed warm-up)
+                while the current one is serving
+        """
+        if not self._reload_lock.acquire(blocking=False):
+            raise ReloadInProgress("A model reload is already in progress")
+        try:
+            previous = self._current
+            candidate = load_model_set(self.model_path, self.max_workers)
+
+            error = None
+            if not candidate.ready:
+                failed = [name for name, ok in candidate.status.items() if not ok]
+                error = f"models failed to load: {', '.join(failed)}"
+            elif warm:
+                try:
+                    warm_model_set(candidate)
+                except Exception as e:
+                    logger.exception("model warm-up failed")
+                    error = f"warm-up failed: {e}"
+
+            if error is not None and previous.ready:
+                self.failed_reloads += 1
+                self.last_error = error
+                raise ModelReloadError(f"Keeping version {previous.version}: {error}")
+
+            # Publish: requests already holding the previous set keep using it
+            self._current = candidate
+            if candidate.ready:
+                self.ready.set()
+            if previous.ready:
+                self.reloads += 1
+            self.last_error = None
+
+            logger.info(
+                "model set published",
+                extra={'fields': {
+                    'version': candidate.version,
+                    'previous_version': previous.version,
+                    'ready': candidate.ready,
+                    'models': dict(candidate.status),
+                    'seconds': round(candidate.load_seconds, 3)
+                }}
+            )
+            return candidate
+        finally:
+            self._reload_lock.release()
+
+    def watch(self):
+        """
+        Reload whenever the files under model_path change
+
+        Polls a fingerprint of the directory every watch_interval seconds and
+        reloads once it has stayed the same for a full interval, so a
+        training run that writes several files is picked up once, complete.
+        """
+        interval = self.watch_interval
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def poll():
+            seen = model_fingerprint(self.model_path)
+            loaded = seen
+            while not self._stop.wait(interval):
+                fingerprint = model_fingerprint(self.model_path)
+                if fingerprint != seen:
+                    seen = fingerprint  # still changing: wait for it to settle
+                    continue
+                if fingerprint == loaded:
+                    continue
+                try:
+                    self.reload()
+                    loaded = fingerprint
+                except ModelReloadError as e:
+                    loaded = fingerprint  # do not retry the same broken files
+                    logger.warning("model reload skipped: %s", e)
+                except Exception:
+                    loaded = fingerprint
+                    self.failed_reloads += 1
+                    logger.exception("model reload failed")
+
+        self._watcher = threading.Thread(target=poll, name='model-watch', daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self) -> Dict:
+        """Current set plus reload counters"""
+        return {
+            **self._current.info(),
+            'model_path': self.model_path,
+            'reloading': self._reload_lock.locked(),
+            'reloads': self.reloads,
+            'failed_reloads': self.failed_reloads,
+            'last_error': self.last_error,
+            'watching': self._watcher is not None
+        }
+
+
+def create_model_registry(model_path: str) -> ModelRegistry:
+    """
+    Build a registry from environment settings
+
+    Environment:
+        MODEL_LOAD_WORKERS: Threads used to load the models (default 4)
+        MODEL_WATCH_INTERVAL: Seconds between checks of model_path for new models, 0 disables (default 0)
+    """
+    return ModelRegistry(
+        model_path,
+        max_workers=int(os.getenv('MODEL_LOAD_WORKERS', '4')),
+        watch_interval=float(os.getenv('MODEL_WATCH_INTERVAL', '0'))
+    )
+
+
+__all__ = [
+    'ModelRegistry',
+    'ModelReloadError',
+    'ModelSet',
+    'ReloadInProgress',
+    'create_model_registry',
+    'load_model_set',
+    'warm_model_set'
+]
@@ -0,0 +1,413 @@
+"""
+Prediction Cache
+In-process LRU/TTL cache for model outputs, keyed on model version plus a
+canonical hash of the ordered feature vector, with an optional shared
+sqlite backend for multi-worker deployments
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger('ucl_ml.prediction_cache')
+
+
+def model_fingerprint(model_path: str) -> str:
+    """
+    Fingerprint every file under a model directory
+
+    Any added, removed, resized or rewritten file changes the result.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for root, dirs, files in os.walk(model_path):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            rel = os.path.relpath(path, model_path)
+            digest.update(f"{rel}:{stat.st_size}:{stat.st_mtime_ns};".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def feature_hash(vector: Sequence[float]) -> str:
+    """Canonical hash of an ordered feature vector (values compared as float64)"""
+    data = np.ascontiguousarray(vector, dtype=np.float64)
+    return hashlib.blake2b(data.tobytes(), digest_size=16).hexdigest()
+
+
+class SqliteCacheBackend:
+    """
+    Shared cache backend on a local sqlite file
+
+    Lets several uvicorn workers on one host reuse each other's predictions.
+    Values are stored as JSON.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=1.0)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS predictions '
+            '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)'
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict]:
+        # A busy or broken shared file degrades to a miss, never a failed request
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT value, expires FROM predictions WHERE key = ?', (key,)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict, ttl: float):
+        try:
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO predictions (key, value, expires) VALUES (?, ?, ?)',
+                    (key, json.dumps(value), time.time() + ttl)
+                )
+                self._conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict]:
+        """Unexpired values for the keys that have one (one query per 500 keys)"""
+        found = {}
+        now = time.time()
+        try:
+            with self._lock:
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    rows = self._conn.execute(
+                        'SELECT key, value FROM predictions WHERE expires >= ? AND key IN '
+                        f"({','.join('?' * len(chunk))})",
+                        (now, *chunk)
+                    ).fetchall()
+                    found.update((key, json.loads(value)) for key, value in rows)
+        except sqlite3.Error:
+            return {}
+        return found
+
+    def set_many(self, items: List[tuple], ttl: float):
+        """Store (key, value) pairs in one transaction"""
+        expires = time.time() + ttl
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO predictions (key, value, expires) VALUES (?, ?, ?)',
+                    [(key, json.dumps(value), expires) for key, value in items]
+                )
+                self._conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def clear(self):
+        """Drop every entry (all versions)"""
+        with self._lock:
+            self._conn.execute('DELETE FROM predictions')
+            self._conn.commit()
+
+    def _delete(self, where: str, params: tuple) -> int:
+        try:
+            with self._lock:
+                deleted = self._conn.execute(f'DELETE FROM predictions WHERE {where}', params).rowcount
+                self._conn.commit()
+        except sqlite3.Error:
+            return 0
+        return deleted
+
+    def purge_expired(self) -> int:
+        """Delete expired entries; returns the number deleted"""
+        return self._delete('expires < ?', (time.time(),))
+
+    def purge_versions(self, version: str) -> int:
+        """Delete entries written for any model version other than this one"""
+        return self._delete('instr(key, ?) = 0', (f':{version}:',))
+
+
+class PredictionCache:
+    """
+    LRU/TTL cache for predictions
+
+    Keys combine a namespace (e.g. 'match'), the current model version and a
+    hash of the feature vector. The model version is a fingerprint of the
+    files under model_path, re-checked every check_interval seconds; when it
+    changes every local entry is dropped and shared entries for other
+    versions are deleted. Expired shared entries are deleted every
+    purge_interval seconds.
+
+    watch() runs those checks on a background thread, so lookups never walk
+    the model directory; without it they run lazily inside lookups.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        ttl_seconds: float = 3600,
+        model_path: Optional[str] = None,
+        backend: Optional[SqliteCacheBackend] = None,
+        check_interval: float = 5.0,
+        purge_interval: float = 300.0
+    ):
+        """
+        Args:
+            max_entries: Local LRU capacity (0 disables caching)
+            ttl_seconds: Entry lifetime
+            model_path: Directory whose files define the model version
+            backend: Optional shared backend consulted on local misses
+            check_interval: Seconds between model directory checks
+            purge_interval: Seconds between purges of expired shared entries
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.model_path = model_path
+        self.backend = backend
+        self.check_interval = check_interval
+        self.purge_interval = purge_interval
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = model_fingerprint(model_path) if model_path else 'static'
+        self._next_check = time.monotonic() + check_interval
+        self._next_purge = time.monotonic() + purge_interval
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.purged = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @property
+    def version(self) -> str:
+        """Current model version (refreshed from disk here only when not watching)"""
+        if self._watcher is None and time.monotonic() >= self._next_check:
+            self.refresh()
+        return self._version
+
+    def refresh(self):
+        """Re-fingerprint model_path and purge stale shared entries when due"""
+        now = time.monotonic()
+        self._next_check = now + self.check_interval
+        if self.model_path:
+            version = model_fingerprint(self.model_path)
+            if version != self._version:
+                self.invalidate(version)
+                if self.backend is not None:
+                    self.purged += self.backend.purge_versions(version)
+        if self.backend is not None and now >= self._next_purge:
+            self._next_purge = now + self.purge_interval
+            self.purged += self.backend.purge_expired()
+
+    def watch(self):
+        """Run refresh() every check_interval seconds on a background thread"""
+        if self._watcher is not None or not (self.model_path or self.backend is not None):
+            return
+        if self.backend is not None:
+            # Entries left in the shared file by earlier runs
+            self.purged += self.backend.purge_versions(self._version) + self.backend.purge_expired()
+
+        def poll():
+            while not self._stop.wait(self.check_interval):
+                try:
+                    self.refresh()
+                except Exception:
+                    logger.exception("prediction cache refresh failed")
+
+        self._watcher = threading.Thread(target=poll, name='prediction-cache-watch', daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def invalidate(self, version: Optional[str] = None):
+        """Drop every local entry and optionally move to a new model version"""
+        with self._lock:
+            self._entries.clear()
+            if version is not None:
+                self._version = version
+            self.invalidations += 1
+
+    def _key(self, namespace: str, vector: Sequence[float]) -> str:
+        return f"{namespace}:{self.version}:{feature_hash(vector)}"
+
+    def get(self, namespace: str, vector: Sequence[float]) -> Optional[Dict]:
+        """Look up a cached prediction for this feature vector"""
+        if not self.enabled:
+            return None
+
+        key = self._key(namespace, vector)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires >= now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        if self.backend is not None:
+            value = self.backend.get(key)
+            if value is not None:
+                self._store(key, value, now)
+                with self._lock:
+                    self.hits += 1
+                    self.shared_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, namespace: str, vector: Sequence[float], value: Dict):
+        """Cache a prediction (a JSON-serializable dict) for this feature vector"""
+        if not self.enabled:
+            return
+
+        key = self._key(namespace, vector)
+        self._store(key, value, time.monotonic())
+        if self.backend is not None:
+            self.backend.set(key, value, self.ttl_seconds)
+
+    def get_many(self, namespace: str, rows: Sequence[Sequence[float]]) -> List[Optional[Dict]]:
+        """get() for many feature vectors, with one shared-backend query for the local misses"""
+        if not self.enabled:
+            return [None] * len(rows)
+
+        keys = [self._key(namespace, row) for row in rows]
+        now = time.monotonic()
+        values: List[Optional[Dict]] = [None] * len(keys)
+        with self._lock:
+            for k, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if entry[0] >= now:
+                        self._entries.move_to_end(key)
+                        values[k] = entry[1]
+                    else:
+                        del self._entries[key]
+
+        shared = 0
+        missing = [k for k, value in enumerate(values) if value is None]
+        if self.backend is not None and missing:
+            found = self.backend.get_many([keys[k] for k in missing])
+            for k in missing:
+                value = found.get(keys[k])
+                if value is not None:
+                    self._store(keys[k], value, now)
+                    values[k] = value
+                    shared += 1
+
+        with self._lock:
+            n_hits = sum(value is not None for value in values)
+            self.hits += n_hits
+            self.shared_hits += shared
+            self.misses += len(values) - n_hits
+        return values
+
+    def set_many(self, namespace: str, rows: Sequence[Sequence[float]], values: List[Dict]):
+        """set() for many feature vectors, in one shared-backend transaction"""
+        if not self.enabled or not values:
+            return
+
+        now = time.monotonic()
+        items = [(self._key(namespace, row), value) for row, value in zip(rows, values)]
+        for key, value in items:
+            self._store(key, value, now)
+        if self.backend is not None:
+            self.backend.set_many(items, self.ttl_seconds)
+
+    def _store(self, key: str, value: Dict, now: float):
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'backend': 'sqlite' if self.backend is not None else 'memory',
+                'model_version': self._version,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'shared_hits': self.shared_hits,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'purged': self.purged,
+                'watching': self._watcher is not None
+            }
+
+
+def create_prediction_cache(model_path: Optional[str] = None) -> PredictionCache:
+    """
+    Build a cache from environment settings
+
+    Environment:
+        PREDICTION_CACHE_SIZE: Local LRU capacity, 0 disables (default 4096)
+        PREDICTION_CACHE_TTL: Entry lifetime in seconds (default 3600)
+        PREDICTION_CACHE_BACKEND: 'memory' or 'sqlite' (default memory)
+        PREDICTION_CACHE_PATH: sqlite file for the shared backend (outside MODEL_PATH)
+        PREDICTION_CACHE_CHECK_INTERVAL: Seconds between model file checks (default 5)
+        PREDICTION_CACHE_PURGE_INTERVAL: Seconds between purges of expired shared entries (default 300)
+    """
+    backend = None
+    if os.getenv('PREDICTION_CACHE_BACKEND', 'memory').lower() == 'sqlite':
+        # Keep the file outside MODEL_PATH, or every write would look like a model change
+        backend = SqliteCacheBackend(
+            os.getenv('PREDICTION_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'ucl_prediction_cache.sqlite'))
+        )
+
+    return PredictionCache(
+        max_entries=int(os.getenv('PREDICTION_CACHE_SIZE', '4096')),
+        ttl_seconds=float(os.getenv('PREDICTION_CACHE_TTL', '3600')),
+        model_path=model_path,
+        backend=backend,
+        check_interval=float(os.getenv('PREDICTION_CACHE_CHECK_INTERVAL', '5')),
+        purge_interval=float(os.getenv('PREDICTION_CACHE_PURGE_INTERVAL', '300'))
+    )
+
+
+__all__ = [
+    'PredictionCache',
+    'SqliteCacheBackend',
+    'create_prediction_cache',
+    'feature_hash',
+    'model_fingerprint'
+]
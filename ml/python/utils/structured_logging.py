@@ -0,0 +1,144 @@
+"""
+Structured Logging Utilities
+JSON log records with per-request IDs and sampled hot-path logging
+"""
+
+import json
+import logging
+import os
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+# Request ID of the HTTP request currently being handled ('-' outside requests)
+request_id_var: ContextVar[str] = ContextVar('request_id', default='-')
+
+LOGGER_NAME = 'ucl_ml'
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Format log records as single-line JSON objects
+
+    Structured fields passed via ``extra={'fields': {...}}`` are merged into
+    the top-level object.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'request_id': getattr(record, 'request_id', request_id_var.get()),
+        }
+
+        fields = getattr(record, 'fields', None)
+        if fields:
+            payload.update(fields)
+
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+
+        return json.dumps(payload, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    """Attach the current request ID to every record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SampledLogger:
+    """
+    Wrapper that lets hot paths skip log formatting entirely
+
+    Callers check ``enabled(level)`` before building any log payload. The check
+    is a cached level lookup plus, when sampling, one random draw.
+    """
+
+    def __init__(self, logger: logging.Logger, sample_rate: float = 1.0):
+        """
+        Args:
+            logger: Underlying logger
+            sample_rate: Fraction of enabled events to emit (0 to 1)
+        """
+        self.logger = logger
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+
+    def enabled(self, level: int) -> bool:
+        """Return True if an event at this level should be logged"""
+        if not self.logger.isEnabledFor(level):
+            return False
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def log(self, level: int, msg: str, **fields):
+        """Emit a structured record (call only after enabled() returned True)"""
+        self.logger.log(level, msg, extra={'fields': fields})
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    fmt: Optional[str] = None
+) -> logging.Logger:
+    """
+    Configure the package logger from arguments or environment
+
+    Environment:
+        LOG_LEVEL: DEBUG, INFO, WARNING, ERROR (default INFO)
+        LOG_FORMAT: 'json' or 'text' (default json)
+
+    Returns:
+        The configured package logger
+    """
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    fmt = (fmt or os.getenv('LOG_FORMAT', 'json')).lower()
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level)
+    logger.propagate = False
+
+    handler = logging.StreamHandler(sys.stdout)
+    if fmt == 'json':
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s'
+        ))
+    handler.addFilter(RequestIdFilter())
+
+    logger.handlers = [handler]
+    return logger
+
+
+def get_sampled_logger(name: str, sample_rate: Optional[float] = None) -> SampledLogger:
+    """
+    Get a sampled child logger of the package logger
+
+    Args:
+        name: Child logger name (e.g. 'serve')
+        sample_rate: Overrides LOG_SAMPLE_RATE (default 1.0)
+    """
+    if sample_rate is None:
+        sample_rate = float(os.getenv('LOG_SAMPLE_RATE', '1.0'))
+    return SampledLogger(logging.getLogger(f'{LOGGER_NAME}.{name}'), sample_rate)
+
+
+def new_request_id() -> str:
+    """Generate a compact random request ID"""
+    return uuid.uuid4().hex
+
+
+__all__ = [
+    'request_id_var',
+    'JSONFormatter',
+    'RequestIdFilter',
+    'SampledLogger',
+    'configure_logging',
+    'get_sampled_logger',
+    'new_request_id',
+]
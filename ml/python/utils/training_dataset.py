@@ -0,0 +1,253 @@
+"""
+Training Data Files
+Training rows as columnar bundles (float32 feature matrix, int8 outcome,
+float32 xG), and a partitioned dataset of such bundles with a manifest
+holding the extraction watermark and the rolling feature state, so each
+run only featurizes matches finished since the last one
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.columnar import ColumnarWriter, is_bundle, read_columns, read_schema
+from utils.match_features import TRAINING_FEATURES, MatchFeatureBuilder
+
+DATASET_FORMAT = 'ucl-training-dataset'
+DATASET_FORMAT_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+# Label columns after the features, as in real_training_data.csv
+LABEL_COLUMNS = ['outcome', 'home_xg', 'away_xg']
+
+# Bundle layout of a training data file
+TRAINING_COLUMNS = {
+    'features': ('float32', (len(TRAINING_FEATURES),)),
+    'outcome': ('int8', ()),
+    'home_xg': ('float32', ()),
+    'away_xg': ('float32', ())
+}
+
+
+def _write_atomic(path: str, write):
+    """Write through a temporary file in the same directory, then rename over path"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', dir=directory)
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def training_writer(path: str, feature_names: List[str] = TRAINING_FEATURES) -> ColumnarWriter:
+    """Bundle writer for training rows; append(features=X, outcome=..., home_xg=..., away_xg=...)"""
+    columns = dict(TRAINING_COLUMNS, features=('float32', (len(feature_names),)))
+    return ColumnarWriter(path, columns, {'features': list(feature_names)})
+
+
+def write_training_data(path: str, X: np.ndarray, y_outcome: np.ndarray,
+                        y_xg_home: np.ndarray, y_xg_away: np.ndarray) -> int:
+    """Write training rows as one bundle; returns the number of rows"""
+    with training_writer(path) as writer:
+        writer.append(features=X, outcome=y_outcome, home_xg=y_xg_home, away_xg=y_xg_away)
+    return writer.rows
+
+
+def write_training_csv(path: str, X: np.ndarray, y_outcome: np.ndarray,
+                       y_xg_home: np.ndarray, y_xg_away: np.ndarray, append: bool = False):
+    """Training rows as real_training_data.csv-style CSV (features, then labels)"""
+    df = pd.DataFrame(X, columns=TRAINING_FEATURES)
+    df['outcome'] = y_outcome
+    df['home_xg'] = y_xg_home
+    df['away_xg'] = y_xg_away
+    df.to_csv(path, mode='a' if append else 'w', header=not append, index=False)
+
+
+def load_training_data(path: str, mmap: bool = True
+                       ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    """
+    Load a training bundle or a partitioned training dataset
+
+    Args:
+        path: Bundle directory (schema.json) or dataset directory (manifest.json)
+        mmap: Map bundle files instead of reading them (a dataset of several
+            partitions is always concatenated in memory)
+
+    Returns:
+        X (n, n_features) float32, y_outcome int8, y_xg_home, y_xg_away, feature names
+    """
+    if is_bundle(path):
+        columns, metadata = read_columns(path, mmap=mmap)
+        return (columns['features'], columns['outcome'], columns['home_xg'], columns['away_xg'],
+                metadata['features'])
+    if os.path.isfile(os.path.join(path, MANIFEST_NAME)):
+        return (*TrainingDataset(path).load(mmap=mmap), list(TRAINING_FEATURES))
+    raise FileNotFoundError(f"{path} is neither a training bundle nor a training dataset")
+
+
+def training_feature_names(path: str) -> List[str]:
+    """
+    Feature names stored in a training bundle or dataset, without loading any rows
+
+    Raises:
+        FileNotFoundError: path is neither a training bundle nor a training dataset
+    """
+    if is_bundle(path):
+        return list(read_schema(path)['metadata']['features'])
+    manifest_path = os.path.join(path, MANIFEST_NAME)
+    if os.path.isfile(manifest_path):
+        with open(manifest_path, 'r') as f:
+            return list(json.load(f)['features'])
+    raise FileNotFoundError(f"{path} is neither a training bundle nor a training dataset")
+
+
+class TrainingDataset:
+    """
+    Directory of training row partitions (bundles) plus manifest.json
+
+    Each append() writes one new partition; nothing becomes visible
+    until commit() rewrites the manifest with the new partitions, the
+    watermark (date, match ID) of the newest match they cover and the
+    MatchFeatureBuilder state after it. A run that fails before commit()
+    leaves the dataset as it was; its partition files are overwritten by the
+    next run.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Dataset directory (created on first commit)
+        """
+        self.path = path
+        manifest_path = os.path.join(path, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+            if self.manifest.get('format') != DATASET_FORMAT:
+                raise ValueError(f"{path} is not a training dataset")
+            if self.manifest.get('format_version', 0) > DATASET_FORMAT_VERSION:
+                raise ValueError(f"{path} uses dataset format v{self.manifest['format_version']}")
+            if self.manifest['features'] != TRAINING_FEATURES:
+                raise ValueError(f"{path} was built with a different feature layout; rebuild it")
+        else:
+            self.manifest = {
+                'format': DATASET_FORMAT,
+                'format_version': DATASET_FORMAT_VERSION,
+                'features': TRAINING_FEATURES,
+                'labels': LABEL_COLUMNS,
+                'watermark': None,
+                'rows': 0,
+                'partitions': [],
+                'builder': None
+            }
+        self._new: List[Dict] = []
+
+    @property
+    def watermark(self) -> Optional[Tuple[str, str]]:
+        """(date, match_id) of the newest committed match, as stored in the matches table; None if empty"""
+        watermark = self.manifest['watermark']
+        return (watermark['date'], watermark['match_id']) if watermark else None
+
+    @property
+    def rows(self) -> int:
+        return self.manifest['rows']
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def builder(self, window: int = 5) -> MatchFeatureBuilder:
+        """Feature state after the last committed match (an empty builder for a new dataset)"""
+        state = self.manifest['builder']
+        return MatchFeatureBuilder.from_state(state) if state else MatchFeatureBuilder(window)
+
+    def append(self, X: np.ndarray, y_outcome: np.ndarray, y_xg_home: np.ndarray, y_xg_away: np.ndarray):
+        """Write one batch of rows as a new partition (visible after commit)"""
+        if len(X) == 0:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        name = f"part-{len(self.manifest['partitions']) + len(self._new):05d}"
+        rows = write_training_data(os.path.join(self.path, name), X, y_outcome, y_xg_home, y_xg_away)
+        self._new.append({'name': name, 'rows': rows})
+
+    def commit(self, watermark: Tuple[str, str], builder: MatchFeatureBuilder):
+        """
+        Publish the appended partitions
+
+        Args:
+            watermark: (date, match_id) of the newest match now in the dataset
+            builder: Feature state after that match
+        """
+        os.makedirs(self.path, exist_ok=True)
+        self.manifest['partitions'] += self._new
+        self.manifest['rows'] += sum(part['rows'] for part in self._new)
+        self.manifest['watermark'] = {'date': watermark[0], 'match_id': watermark[1]}
+        self.manifest['builder'] = builder.state()
+        self.manifest['updated_at'] = datetime.now(timezone.utc).isoformat()
+        self._new = []
+
+        def write_manifest(tmp_path: str):
+            with open(tmp_path, 'w') as f:
+                json.dump(self.manifest, f, separators=(',', ':'))
+
+        _write_atomic(os.path.join(self.path, MANIFEST_NAME), write_manifest)
+
+    def _load_partition(self, name: str, mmap: bool) -> Tuple[np.ndarray, ...]:
+        path = os.path.join(self.path, name)
+        if name.endswith('.csv'):
+            # Partitions written before the columnar format
+            df = pd.read_csv(path)
+            return (df[TRAINING_FEATURES].to_numpy(dtype=np.float32), df['outcome'].to_numpy(dtype=np.int8),
+                    df['home_xg'].to_numpy(dtype=np.float32), df['away_xg'].to_numpy(dtype=np.float32))
+        columns, _ = read_columns(path, mmap=mmap)
+        return columns['features'], columns['outcome'], columns['home_xg'], columns['away_xg']
+
+    def load(self, mmap: bool = True) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        All committed rows, oldest partition first
+
+        Args:
+            mmap: Map the partition files; only a single-partition dataset
+                stays mapped, several are concatenated
+
+        Returns:
+            X (n, 23) float32, y_outcome int8, y_xg_home, y_xg_away
+        """
+        parts = [self._load_partition(part['name'], mmap) for part in self.manifest['partitions']]
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return (np.empty((0, len(TRAINING_FEATURES)), dtype=np.float32), np.empty(0, dtype=np.int8),
+                    np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32))
+        return tuple(np.concatenate(column) for column in zip(*parts))
+
+    def reset(self):
+        """Delete the manifest and every partition file, leaving an empty dataset"""
+        if os.path.isdir(self.path):
+            for name in os.listdir(self.path):
+                path = os.path.join(self.path, name)
+                if os.path.isdir(path) and name.startswith('part-'):
+                    shutil.rmtree(path)
+                elif name == MANIFEST_NAME or name.startswith('part-'):
+                    os.unlink(path)
+        self.__init__(self.path)
+
+
+__all__ = [
+    'LABEL_COLUMNS',
+    'TRAINING_COLUMNS',
+    'TrainingDataset',
+    'load_training_data',
+    'training_feature_names',
+    'training_writer',
+    'write_training_csv',
+    'write_training_data'
+]
@@ -36,6 +36,14 @@ export interface MatchPredictionOutput {
   confidence: number;
 }
 
+export interface MatchBatchItem {
+  index: number;
+  home_team: string | null;
+  away_team: string | null;
+  prediction: MatchPredictionOutput | null;
+  error: string | null;
+}
+
 export interface ExplanationOutput extends MatchPredictionOutput {
   feature_importance: Array<{ feature: string; importance: number }>;
   shap_values: Record<string, number>;
@@ -199,6 +207,40 @@ export class PythonMLBridge {
     }
   }
 
+  /**
+   * Predict many fixtures in a single round trip (results keep input order)
+   */
+  async predictMatches(inputs: MatchPredictionInput[]): Promise<MatchBatchItem[] | null> {
+    // If server was previously unavailable, try to reconnect
+    if (!this.isAvailable && !this.checkInProgress) {
+      await this.checkAvailability();
+    }
+
+    // If still not available, return null
+    if (!this.isAvailable) {
+      return null;
+    }
+
+    try {
+      const response = await this.client.post<{ results: MatchBatchItem[] }>(
+        '/predict/matches',
+        {
+          matches: inputs.map((input) => ({
+            home_team: input.homeTeam,
+            away_team: input.awayTeam,
+            features: input.features
+          }))
+        }
+      );
+      return response.data.results;
+    } catch (error: any) {
+      // Mark as unavailable if connection fails
+      this.isAvailable = false;
+      console.error('Failed to get batch ML predictions:', error.message);
+      return null;
+    }
+  }
+
   /**
    * Get match prediction with SHAP explanation
    */